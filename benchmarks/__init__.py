@@ -0,0 +1 @@
+"""Offline benchmarks for Medical AI Service."""
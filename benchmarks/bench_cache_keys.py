@@ -0,0 +1,130 @@
+"""Replay a corpus and compare cache hit rates of cache key strategies.
+
+Usage:
+    python -m benchmarks.bench_cache_keys requests.jsonl --variants 3
+    python -m benchmarks.bench_cache_keys --json results.json
+
+Each JSONL line must contain a "text", "body" or "title" field. With
+--variants every text is replayed with extra rephrasings (case, punctuation,
+spacing, word order, repeated words, typos) to model real user traffic.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from src.services.cache_keys import NearDuplicateIndex, normalize_cache_key
+
+SAMPLE_CORPUS = [
+    "У меня болит голова",
+    "Болит голова и температура",
+    "Сильный кашель уже неделю",
+    "Болит зуб",
+    "Болит живот после еды",
+    "Высокая температура и кашель",
+    "Болит горло",
+    "Болят глаза от компьютера",
+    "Плохо себя чувствую",
+    "thank you!",
+]
+
+
+def load_corpus(path: str) -> list:
+    """Read texts from a JSONL corpus."""
+    texts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            text = item.get("text") or item.get("body") or item.get("title")
+            if text:
+                texts.append(text)
+    return texts
+
+
+def rephrase(text: str, rng: random.Random) -> str:
+    """Return a trivial rephrasing of text."""
+    words = text.split()
+    choice = rng.randrange(6)
+    if choice == 0:
+        return text.upper() if rng.random() < 0.5 else text.lower()
+    if choice == 1:
+        return text.rstrip(".!?") + rng.choice(["!", "?", "...", " !!"])
+    if choice == 2:
+        return "  ".join(words)
+    if choice == 3 and len(words) > 1:
+        i = rng.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+        return " ".join(words)
+    if choice == 4 and len(text) > 5:
+        i = rng.randrange(1, len(text) - 1)
+        return text[:i] + text[i + 1:]
+    if words:
+        i = rng.randrange(len(words))
+        words.insert(i, words[i])
+    return " ".join(words)
+
+
+def replay(texts: list, key_fn, threshold: float = 0) -> dict:
+    """Replay texts against an empty cache and count hits."""
+    seen = set()
+    index = NearDuplicateIndex(threshold=threshold) if threshold > 0 else None
+    hits = 0
+    start = time.perf_counter()
+    for text in texts:
+        key = key_fn(text)
+        if key in seen or (index is not None and index.find(key) is not None):
+            hits += 1
+            continue
+        seen.add(key)
+        if index is not None:
+            index.add(key)
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(texts),
+        "hits": hits,
+        "hit_rate": round(hits / len(texts), 4) if texts else 0.0,
+        "mean_lookup_us": round(elapsed / len(texts) * 1e6, 2) if texts else 0.0,
+    }
+
+
+STRATEGIES = {
+    "exact": (lambda t: t.strip().lower(), 0),
+    "normalized": (normalize_cache_key, 0),
+    "normalized_sorted": (lambda t: normalize_cache_key(t, sort_tokens=True), 0),
+    "near_duplicate_0.8": (normalize_cache_key, 0.8),
+    "near_duplicate_0.6": (normalize_cache_key, 0.6),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", nargs="?", help="JSONL corpus, built-in sample if omitted")
+    parser.add_argument("--variants", type=int, default=3, help="Rephrasings per text")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    base = load_corpus(args.corpus) if args.corpus else SAMPLE_CORPUS
+    rng = random.Random(args.seed)
+    texts = []
+    for text in base:
+        texts.append(text)
+        texts.extend(rephrase(text, rng) for _ in range(args.variants))
+    rng.shuffle(texts)
+
+    results = {name: replay(texts, key_fn, threshold) for name, (key_fn, threshold) in STRATEGIES.items()}
+
+    print(f"{'strategy':<22}{'hit rate':>10}{'lookup, us':>12}")
+    for name, result in results.items():
+        print(f"{name:<22}{result['hit_rate']:>10.2%}{result['mean_lookup_us']:>12.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"requests": len(texts), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
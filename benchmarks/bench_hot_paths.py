@@ -0,0 +1,271 @@
+"""Micro-benchmarks of the in-process request hot paths.
+
+Usage:
+    python -m benchmarks.bench_hot_paths
+    python -m benchmarks.bench_hot_paths --save benchmarks/baselines/hot_paths.json
+    python -m benchmarks.bench_hot_paths --compare benchmarks/baselines/hot_paths.json
+    python -m benchmarks.bench_hot_paths --diff old.json new.json --threshold 0.1
+
+Covers input validation, language and symptom detection, doctor
+recommendation, fast-mode triage, cache lookup, rate limiting across many clients and
+`analyze_and_respond` end to end with an instant stub model. Inputs are
+parameterized by length up to the 1000-character limit and by keyword
+table size. Results are saved as JSON keyed by case name, so two runs,
+for example on two commits, can be diffed; --fail-on-regression makes the
+script exit non-zero when a case got slower than the threshold.
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from contextlib import contextmanager
+
+from benchmarks.bench_matcher import synthetic_words
+from src.config.settings import SYMPTOM_KEYWORDS, URGENT_INDICATORS, RATE_LIMIT_REQUESTS, RATE_LIMIT_PERIOD
+from src.models.symptom_data import SYMPTOM_DOCTOR_MAP
+from src.services import matcher as matcher_module
+from src.services.ai_service import AIService
+from src.services.cache_service import ResponseCache
+from src.services.doctor_service import recommend_doctor
+from src.services.matcher import KeywordMatcher
+from src.services.model_client import ModelResponse
+from src.services.rate_limiter import GCRARateLimiter
+
+SENTENCE = "У меня третий день болит голова, температура 38, болит горло и кашель. "
+TEXT_LENGTHS = [10, 100, 1000]
+TABLE_SIZES = [0, 1000, 5000]  # Extra synthetic keywords on top of the real tables
+CACHE_SIZES = [100, 10000]
+CLIENT_COUNTS = [1, 1000, 100000]
+
+
+class InstantModel:
+    """Model stub that answers immediately."""
+
+    def invoke(self, messages):
+        return ModelResponse("Рекомендую обратиться к терапевту.")
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+    def with_options(self, **options):
+        return self
+
+
+def text_of(length: int) -> str:
+    return (SENTENCE * (length // len(SENTENCE) + 1))[:length].strip() or SENTENCE[:length]
+
+
+@contextmanager
+def keyword_tables(extra: int):
+    """Use a default matcher built with `extra` synthetic keywords."""
+    previous = matcher_module._default_matcher
+    if extra:
+        words = synthetic_words(extra, random.Random(42))
+        doctor_map = dict(SYMPTOM_DOCTOR_MAP)
+        doctor_map.update({word: ["терапевт"] for word in words[extra // 2:]})
+        matcher_module._default_matcher = KeywordMatcher(
+            list(SYMPTOM_KEYWORDS) + words[:extra // 2], URGENT_INDICATORS, doctor_map
+        )
+    try:
+        yield
+    finally:
+        matcher_module._default_matcher = previous
+
+
+def measure(fn, min_time: float, repeat: int) -> dict:
+    """Time fn, calibrating the loop count so one run takes at least min_time."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+    per_op = sorted(t / number for t in timer.repeat(repeat=repeat, number=number))
+    return {
+        "ns_per_op": round(statistics.median(per_op) * 1e9, 1),
+        "min_ns": round(per_op[0] * 1e9, 1),
+        "number": number,
+        "repeat": repeat
+    }
+
+
+def cases(service: AIService):
+    """Yield (name, setup context, callable) for every benchmark case."""
+    for length in TEXT_LENGTHS:
+        text = text_of(length)
+        yield f"validate_input[chars={length}]", None, lambda t=text: service._validate_input(t)
+        yield f"detect_language[chars={length}]", None, lambda t=text: service._detect_language(t)
+        yield f"triage[chars={length}]", None, lambda t=text: service.triage(t)
+        for extra in TABLE_SIZES:
+            params = f"chars={length},extra_keywords={extra}"
+            yield f"has_symptoms[{params}]", keyword_tables(extra), lambda t=text: service._has_symptoms(t)
+            yield f"recommend_doctor[{params}]", keyword_tables(extra), lambda t=text: recommend_doctor(t)
+
+    for entries in CACHE_SIZES:
+        cache = ResponseCache(max_bytes=1 << 30, ttl=0)
+        keys = [service._cache_key(f"Болит голова {i}") for i in range(entries)]
+        for key in keys:
+            cache.set(key, "Рекомендую обратиться к неврологу.")
+
+        @contextmanager
+        def use_cache(cache=cache):
+            previous = service.response_cache
+            service.response_cache = cache
+            try:
+                yield
+            finally:
+                service.response_cache = previous
+
+        hit_key = keys[len(keys) // 2]
+        yield f"cache_lookup[entries={entries},hit]", use_cache(), lambda k=hit_key: service._cache_lookup(k)
+        yield f"cache_lookup[entries={entries},miss]", use_cache(), lambda: service._cache_lookup("нет такого ключа")
+
+    for clients in CLIENT_COUNTS:
+        limiter = GCRARateLimiter(RATE_LIMIT_REQUESTS, RATE_LIMIT_PERIOD, max_clients=max(clients, 100000))
+        users = itertools.cycle([f"ip:10.0.{i // 256}.{i % 256}" for i in range(clients)])
+
+        @contextmanager
+        def use_limiter(limiter=limiter):
+            previous = service.rate_limiter
+            service.rate_limiter = limiter
+            try:
+                yield
+            finally:
+                service.rate_limiter = previous
+
+        yield f"check_rate_limit[clients={clients}]", use_limiter(), lambda u=users: service._check_rate_limit(next(u))
+
+    @contextmanager
+    def stubbed_service(max_bytes: int):
+        previous = service.model, service.response_cache, service.rate_limiter
+        service.model = InstantModel()
+        service.response_cache = ResponseCache(max_bytes=max_bytes, ttl=0)
+        service.rate_limiter = GCRARateLimiter(rate=10 ** 9, period=1, max_clients=10)
+        try:
+            yield
+        finally:
+            service.model, service.response_cache, service.rate_limiter = previous
+
+    for length in TEXT_LENGTHS:
+        text = text_of(length)
+        counter = itertools.count()
+        yield (f"analyze_and_respond[chars={length},miss]", stubbed_service(256 * 1024),
+               lambda t=text, c=counter: service.analyze_and_respond(f"{next(c)} {t}"[:1000]))
+        yield (f"analyze_and_respond[chars={length},hit]", stubbed_service(256 * 1024),
+               lambda t=text: service.analyze_and_respond(t))
+
+
+def run(min_time: float, repeat: int, only: str = None) -> dict:
+    service = AIService()
+    results = {}
+    for name, context, fn in cases(service):
+        if only and only not in name:
+            continue
+        with context if context is not None else _nothing():
+            fn()  # First call builds automata, fills caches
+            results[name] = measure(fn, min_time, repeat)
+    return results
+
+
+@contextmanager
+def _nothing():
+    yield
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Compare two result sets case by case.
+
+    Returns:
+        Rows of (case, baseline ns, current ns, ratio, verdict)
+    """
+    rows = []
+    for name in sorted(set(baseline) | set(current)):
+        old, new = baseline.get(name), current.get(name)
+        if old is None or new is None:
+            rows.append((name, old and old["ns_per_op"], new and new["ns_per_op"], None,
+                         "new" if old is None else "removed"))
+            continue
+        ratio = new["ns_per_op"] / old["ns_per_op"] if old["ns_per_op"] else float("inf")
+        verdict = "slower" if ratio > 1 + threshold else "faster" if ratio < 1 - threshold else "same"
+        rows.append((name, old["ns_per_op"], new["ns_per_op"], ratio, verdict))
+    return rows
+
+
+def _load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def print_results(results: dict):
+    print(f"{'case':<55}{'ns/op':>14}{'min ns':>14}")
+    for name, r in results.items():
+        print(f"{name:<55}{r['ns_per_op']:>14,.0f}{r['min_ns']:>14,.0f}")
+
+
+def print_comparison(rows: list):
+    print(f"{'case':<55}{'baseline':>12}{'current':>12}{'ratio':>8}  verdict")
+    for name, old, new, ratio, verdict in rows:
+        old_text = f"{old:,.0f}" if old is not None else "-"
+        new_text = f"{new:,.0f}" if new is not None else "-"
+        ratio_text = f"{ratio:.2f}" if ratio is not None else "-"
+        print(f"{name:<55}{old_text:>12}{new_text:>12}{ratio_text:>8}  {verdict}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-time", type=float, default=0.05, help="Seconds per timed run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="Run cases whose name contains this text")
+    parser.add_argument("--save", help="Write results as a baseline JSON file")
+    parser.add_argument("--compare", help="Compare this run against a baseline JSON file")
+    parser.add_argument("--diff", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two saved result files without running")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative change reported")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    if args.diff:
+        baseline, current = (_load(path)["results"] for path in args.diff)
+    else:
+        current = run(args.min_time, args.repeat, args.only)
+        print_results(current)
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as f:
+                json.dump({"meta": metadata(), "results": current}, f, indent=2, ensure_ascii=False)
+        if not args.compare:
+            return
+        baseline = _load(args.compare)["results"]
+        if args.only:
+            baseline = {name: r for name, r in baseline.items() if args.only in name}
+        print()
+
+    rows = compare(baseline, current, args.threshold)
+    print_comparison(rows)
+    if args.fail_on_regression and any(verdict == "slower" for *_, verdict in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
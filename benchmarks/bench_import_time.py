@@ -0,0 +1,93 @@
+"""Startup import cost of the API app and the CLI entry point.
+
+Usage:
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --repeat 10 --budget-ms 400 --json results.json
+
+Each target is imported in a fresh interpreter with `-X importtime`; the
+best of several runs is reported together with the modules that cost the
+most themselves. Heavy modules that must stay off the startup path are
+flagged, and with --budget-ms the script exits non-zero when a target is
+over budget, so it can guard against regressions in CI.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+TARGETS = ["src.api.app", "main"]
+
+# Loaded lazily, on first model call or with MODEL_BACKEND=langchain
+LAZY_MODULES = ["langchain_core", "langchain_ollama", "httpx"]
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Parse `-X importtime` output into total and per-module self time in microseconds."""
+    total = 0
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            # Top-level import: its cumulative time covers its whole subtree
+            total += int(cumulative_us)
+        modules[name.strip()] = int(self_us)
+    return {"total_us": total, "modules": modules}
+
+
+def measure(target: str) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, check=True
+    )
+    return parse_importtime(completed.stderr)
+
+
+def run(targets: list, repeat: int, top: int) -> dict:
+    results = {}
+    for target in targets:
+        measure(target)  # Warm bytecode and OS file caches
+        best = min((measure(target) for _ in range(repeat)), key=lambda r: r["total_us"])
+        heaviest = sorted(best["modules"].items(), key=lambda item: item[1], reverse=True)[:top]
+        results[target] = {
+            "total_ms": round(best["total_us"] / 1000, 1),
+            "modules": len(best["modules"]),
+            "lazy_modules_loaded": [m for m in LAZY_MODULES if m in best["modules"]],
+            "heaviest": [{"module": name, "self_ms": round(us / 1000, 1)} for name, us in heaviest]
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--targets", nargs="+", default=TARGETS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Heaviest modules to list")
+    parser.add_argument("--budget-ms", type=float, help="Fail if a target takes longer")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.targets, args.repeat, args.top)
+
+    failed = False
+    for target, result in results.items():
+        print(f"{target}: {result['total_ms']:.1f} ms, {result['modules']} modules")
+        for entry in result["heaviest"]:
+            print(f"    {entry['self_ms']:>8.1f} ms  {entry['module']}")
+        if result["lazy_modules_loaded"]:
+            failed = True
+            print(f"  ! loaded at import time: {', '.join(result['lazy_modules_loaded'])}")
+        if args.budget_ms is not None and result["total_ms"] > args.budget_ms:
+            failed = True
+            print(f"  ! over budget of {args.budget_ms:.0f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
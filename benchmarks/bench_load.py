@@ -0,0 +1,227 @@
+"""Open-loop HTTP load test of /api/v1/analyze.
+
+Usage:
+    # Against a running service, e.g. one started with OLLAMA_BASE_URL pointing at
+    # `python -m benchmarks.stub_ollama --ttft 0.3 --token-rate 40 --tokens 120 --parallel 2`
+    python -m benchmarks.bench_load requests.jsonl --url http://127.0.0.1:8000 --rate 20 --duration 30
+
+    # Self-contained: start a stub Ollama and the API in this process
+    python -m benchmarks.bench_load --in-process --ttft 0.2 --token-rate 50 --rate 10 --json load.json
+
+Requests are sent at a fixed arrival rate (or Poisson arrivals with
+--poisson) no matter how fast the service answers, so a saturated service
+shows up as growing latency and errors instead of a lower send rate.
+Latency is measured from the scheduled send time. Texts come from a JSONL
+corpus with a "text", "body" or "title" field and are sent round-robin;
+--users spreads requests over distinct API keys for the rate limiter (the
+service only honours keys listed in RATE_LIMIT_API_KEYS; --in-process lists
+them, otherwise every request counts against the driver's IP) and
+--unique numbers every text so that no request is served from the cache.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from benchmarks.bench_cache_keys import SAMPLE_CORPUS, load_corpus
+from benchmarks.stub_ollama import StubOllamaServer, add_arguments, stub_options
+
+ANALYZE_PATH = "/api/v1/analyze"
+MAX_TEXT_LENGTH = 1000
+
+
+def _percentile(samples: list, q: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def _latency_summary(samples: list) -> dict:
+    if not samples:
+        return {}
+    samples = sorted(samples)
+    return {
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 1),
+        "p50_ms": round(_percentile(samples, 0.50) * 1000, 1),
+        "p90_ms": round(_percentile(samples, 0.90) * 1000, 1),
+        "p95_ms": round(_percentile(samples, 0.95) * 1000, 1),
+        "p99_ms": round(_percentile(samples, 0.99) * 1000, 1),
+        "max_ms": round(samples[-1] * 1000, 1)
+    }
+
+
+async def _send(client: httpx.AsyncClient, text: str, headers: dict, scheduled: float) -> dict:
+    loop = asyncio.get_running_loop()
+    outcome = {"lag": loop.time() - scheduled}
+    try:
+        response = await client.post(ANALYZE_PATH, json={"text": text}, headers=headers)
+        outcome["status"] = str(response.status_code)
+        if response.status_code in (200, 429):
+            outcome["source"] = response.json().get("source")
+    except httpx.TimeoutException:
+        outcome["status"] = "timeout"
+    except httpx.HTTPError:
+        outcome["status"] = "connection_error"
+    outcome["latency"] = loop.time() - scheduled
+    return outcome
+
+
+def load_api_keys(users: int) -> list:
+    """API keys the load driver sends, one per simulated user."""
+    return [f"load-{user}" for user in range(users)]
+
+
+async def drive(url: str, texts: list, rate: float, duration: float, users: int = 1,
+                timeout: float = 60.0, poisson: bool = False, seed: Optional[int] = None,
+                client_header: str = "X-API-Key", unique: bool = False, transport=None) -> dict:
+    """Send requests at a fixed rate for `duration` seconds and wait for all answers.
+
+    Returns:
+        Summary with latency distribution, throughput and error rates
+    """
+    rng = random.Random(seed)
+    texts = itertools.cycle([text[:MAX_TEXT_LENGTH] for text in texts])
+    api_keys = itertools.cycle(load_api_keys(users))
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=1000)
+    loop = asyncio.get_running_loop()
+    tasks = []
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits, transport=transport) as client:
+        started = loop.time()
+        offset = 0.0
+        while offset < duration:
+            delay = started + offset - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            headers = {client_header: next(api_keys)}
+            text = next(texts)
+            if unique:
+                text = f"{text} ({len(tasks)})"[-MAX_TEXT_LENGTH:]
+            tasks.append(asyncio.create_task(_send(client, text, headers, started + offset)))
+            offset = offset + rng.expovariate(rate) if poisson else len(tasks) / rate
+        outcomes = await asyncio.gather(*tasks)
+        elapsed = loop.time() - started
+    return summarize(outcomes, elapsed, rate)
+
+
+def summarize(outcomes: list, elapsed: float, rate: float) -> dict:
+    """Aggregate per-request outcomes of a load run."""
+    statuses, sources = {}, {}
+    for outcome in outcomes:
+        statuses[outcome["status"]] = statuses.get(outcome["status"], 0) + 1
+        if outcome.get("source"):
+            sources[outcome["source"]] = sources.get(outcome["source"], 0) + 1
+    total = len(outcomes)
+    ok = statuses.get("200", 0)
+    return {
+        "requests": total,
+        "offered_rps": rate,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(ok / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round((total - ok) / total, 4) if total else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "sources": dict(sorted(sources.items())),
+        "latency": _latency_summary([o["latency"] for o in outcomes if o["status"] == "200"]),
+        "latency_all": _latency_summary([o["latency"] for o in outcomes]),
+        "max_send_lag_ms": round(max((o["lag"] for o in outcomes), default=0.0) * 1000, 1)
+    }
+
+
+def _free_port(host: str) -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class InProcessService:
+    """Stub Ollama plus the API served by uvicorn in background threads."""
+
+    def __init__(self, host: str = "127.0.0.1", users: int = 0, **stub):
+        self.host = host
+        self.users = users
+        self.stub = StubOllamaServer(host, **stub)
+        self.server = None
+        self._thread = None
+
+    def __enter__(self) -> str:
+        import uvicorn
+
+        self.stub.start()
+        # Settings are read on import, so the app is imported after the environment is set
+        os.environ["OLLAMA_BASE_URL"] = self.stub.url
+        os.environ.setdefault("MODEL_NAME", self.stub.model_name)
+        os.environ.setdefault("RATE_LIMIT_API_KEYS", ",".join(load_api_keys(self.users)))
+        from src.api.app import app
+
+        port = _free_port(self.host)
+        self.server = uvicorn.Server(uvicorn.Config(app, host=self.host, port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 30
+        while not self.server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("API server did not start")
+            time.sleep(0.05)
+        return f"http://{self.host}:{port}"
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self._thread.join(timeout=10)
+        self.stub.stop()
+
+
+def print_summary(summary: dict):
+    print(f"Requests: {summary['requests']} in {summary['elapsed_seconds']:.1f}s "
+          f"(offered {summary['offered_rps']}/s, throughput {summary['throughput_rps']}/s)")
+    print(f"Error rate: {summary['error_rate']:.2%}  statuses: {summary['statuses']}")
+    print(f"Sources: {summary['sources']}")
+    for title, key in (("200 latency", "latency"), ("All latency", "latency_all")):
+        latency = summary[key]
+        if latency:
+            print(f"{title}: " + "  ".join(f"{name[:-3]} {value:.1f}ms" for name, value in latency.items()))
+    if summary["max_send_lag_ms"] > 50:
+        print(f"Warning: driver fell behind schedule by up to {summary['max_send_lag_ms']:.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", nargs="?", help="JSONL corpus, default is a built-in sample")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Service base URL")
+    parser.add_argument("--rate", type=float, default=5.0, help="Requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of sending")
+    parser.add_argument("--users", type=int, default=1000, help="Distinct API keys")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--poisson", action="store_true", help="Exponential inter-arrival times")
+    parser.add_argument("--unique", action="store_true", help="Number every text so none hits the cache")
+    parser.add_argument("--in-process", action="store_true", help="Start stub Ollama and the API here")
+    parser.add_argument("--json", help="Write summary to this JSON file")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    texts = load_corpus(args.corpus) if args.corpus else SAMPLE_CORPUS
+    client_header = os.getenv("RATE_LIMIT_CLIENT_HEADER", "X-API-Key")
+
+    def run(url):
+        return asyncio.run(drive(url, texts, args.rate, args.duration, args.users, args.timeout,
+                                 args.poisson, args.seed, client_header, args.unique))
+
+    if args.in_process:
+        with InProcessService(users=args.users, **stub_options(args)) as url:
+            summary = run(url)
+    else:
+        summary = run(args.url)
+
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
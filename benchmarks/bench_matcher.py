@@ -0,0 +1,92 @@
+"""Compare per-keyword scanning with the compiled single-pass matcher.
+
+Usage:
+    python -m benchmarks.bench_matcher
+    python -m benchmarks.bench_matcher --sizes 10 100 1000 5000 --json results.json
+
+The naive strategy mirrors the previous request path: language detection
+by a character scan, `_has_symptoms` twice, the urgency scan and one
+`symptoms.lower()` plus substring check per doctor-map entry.
+"""
+
+import argparse
+import json
+import random
+import timeit
+
+from src.config.settings import SYMPTOM_KEYWORDS, URGENT_INDICATORS
+from src.services.matcher import KeywordMatcher
+
+TEXT = ("У меня третий день сильно болит голова, температура 38, "
+        "болит горло и появился кашель. Что делать и к какому врачу идти?")
+
+
+def synthetic_words(count: int, rng: random.Random) -> list:
+    """Generate distinct cyrillic pseudo-words."""
+    alphabet = "абвгдежзиклмнопрстуфхцчшщыэюя"
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(alphabet) for _ in range(rng.randint(4, 10))))
+    return sorted(words)
+
+
+def naive_scan(text: str, keywords: list, urgent: list, doctor_map: dict):
+    stripped = text.strip()
+    cyrillic = sum(1 for char in stripped if '\u0400' <= char <= '\u04FF')
+    language = 'ru' if cyrillic > len(stripped) * 0.3 else 'en'
+    for _ in range(2):
+        lowered = text.lower().strip()
+        has_symptoms = any(keyword in lowered for keyword in keywords)
+    is_urgent = any(indicator in text.lower() for indicator in urgent)
+    doctors = []
+    for word, profiles in doctor_map.items():
+        if word in text.lower():
+            doctors.extend(profiles)
+    return language, has_symptoms, is_urgent, doctors
+
+
+def run(sizes: list, text_length: int, number: int) -> list:
+    rng = random.Random(42)
+    text = (TEXT * (text_length // len(TEXT) + 1))[:text_length]
+    results = []
+    for size in sizes:
+        extra = synthetic_words(size, rng)
+        keywords = list(SYMPTOM_KEYWORDS) + extra[: size // 2]
+        doctor_map = {word: ["терапевт"] for word in extra[size // 2:]}
+        doctor_map["голова"] = ["невролог", "терапевт"]
+        matcher = KeywordMatcher(keywords, URGENT_INDICATORS, doctor_map)
+
+        naive = min(timeit.repeat(lambda: naive_scan(text, keywords, URGENT_INDICATORS, doctor_map),
+                                  number=number, repeat=3)) / number
+        compiled = min(timeit.repeat(lambda: matcher.prepare(text), number=number, repeat=3)) / number
+        results.append({
+            "keywords": size,
+            "text_length": len(text),
+            "naive_us": round(naive * 1e6, 2),
+            "compiled_us": round(compiled * 1e6, 2),
+            "speedup": round(naive / compiled, 2),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--text-length", type=int, default=len(TEXT))
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.text_length, args.number)
+
+    print(f"{'keywords':>9}{'naive, us':>12}{'compiled, us':>15}{'speedup':>9}")
+    for r in results:
+        print(f"{r['keywords']:>9}{r['naive_us']:>12.1f}{r['compiled_us']:>15.1f}{r['speedup']:>8.1f}x")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
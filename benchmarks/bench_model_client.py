@@ -0,0 +1,109 @@
+"""Per-call overhead of each model client backend.
+
+Usage:
+    python -m benchmarks.bench_model_client
+    python -m benchmarks.bench_model_client --calls 2000 --json results.json
+
+Both backends call the same stub Ollama server, which answers instantly,
+so the measured latency is client overhead plus a loopback round trip.
+Sync, async and streaming calls are timed separately.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.stub_ollama import StubOllamaServer
+from src.services.model_client import LangChainClient, Message, OllamaClient
+
+MESSAGES = [
+    Message("system", "Ты медицинский помощник. Отвечай кратко."),
+    Message("user", "У меня болит голова и температура")
+]
+
+
+def make_client(backend: str, url: str):
+    options = {"temperature": 0, "num_ctx": 512, "num_predict": 16}
+    if backend == "langchain":
+        return LangChainClient(model="stub", base_url=url, **options)
+    return OllamaClient(url, "stub", options=options)
+
+
+def _summary(samples: list) -> dict:
+    samples = sorted(samples)
+    return {
+        "mean_us": round(sum(samples) / len(samples) * 1e6, 1),
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 1),
+        "p99_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6, 1)
+    }
+
+
+def bench_sync(client, calls: int) -> dict:
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        client.invoke(MESSAGES)
+        samples.append(time.perf_counter() - started)
+    return _summary(samples)
+
+
+async def bench_async(client, calls: int) -> dict:
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await client.ainvoke(MESSAGES)
+        samples.append(time.perf_counter() - started)
+    return _summary(samples)
+
+
+async def bench_stream(client, calls: int) -> dict:
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        async for _chunk in client.astream(MESSAGES):
+            pass
+        samples.append(time.perf_counter() - started)
+    return _summary(samples)
+
+
+async def bench_event_loop(client, calls: int, warmup: int) -> dict:
+    # ChatOllama's async client is bound to one event loop
+    await bench_async(client, warmup)
+    return {"async": await bench_async(client, calls), "stream": await bench_stream(client, calls)}
+
+
+def run(calls: int, warmup: int, backends: list) -> dict:
+    results = {}
+    with StubOllamaServer() as server:
+        for backend in backends:
+            client = make_client(backend, server.url)
+            bench_sync(client, warmup)
+            results[backend] = {"sync": bench_sync(client, calls)}
+            results[backend].update(asyncio.run(bench_event_loop(client, calls, warmup)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--backends", nargs="+", default=["ollama", "langchain"],
+                        choices=["ollama", "langchain"])
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.calls, args.warmup, args.backends)
+
+    print(f"{'backend':<12}{'call':<8}{'mean, us':>10}{'p50, us':>10}{'p99, us':>10}")
+    for backend, calls in results.items():
+        for call, stats in calls.items():
+            print(f"{backend:<12}{call:<8}{stats['mean_us']:>10.0f}{stats['p50_us']:>10.0f}{stats['p99_us']:>10.0f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""Minimal Ollama-compatible server for benchmarks.
+
+Usage:
+    python -m benchmarks.stub_ollama --port 11435
+    python -m benchmarks.stub_ollama --ttft 0.3 --token-rate 40 --tokens 120 --parallel 2 --error-rate 0.02
+
+Answers /api/chat (streamed and not) and /api/tags over HTTP/1.1
+keep-alive connections. By default the reply is fixed and instant, so
+client-side overhead can be measured without a model. For load tests it
+can imitate a GPU: wait `ttft` seconds before the first token, emit tokens
+at `token_rate` per second, generate at most `parallel` replies at a time
+(others wait, like OLLAMA_NUM_PARALLEL) and fail a share of requests with
+HTTP 500.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+REPLY_TOKENS = ["Рекомендую", " обратиться", " к", " терапевту", "."]
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, data: dict):
+        body = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": self.server.model_name}]})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.path != "/api/chat":
+            self._send_json(404, {"error": "not found"})
+            return
+        self.server.requests += 1
+        if self.server.should_fail():
+            self.server.errors += 1
+            self._send_json(500, {"error": "stub injected error"})
+            return
+        model = request.get("model", self.server.model_name)
+        tokens = self.server.reply(request.get("options", {}).get("num_predict"))
+
+        with self.server.generation_slot():
+            self.server.sleep(self.server.ttft)
+            if not request.get("stream", True):
+                self.server.sleep(self.server.token_delay * len(tokens))
+                self._send_json(200, {
+                    "model": model,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "done": True,
+                    "eval_count": len(tokens)
+                })
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i, token in enumerate(tokens):
+                if i:
+                    self.server.sleep(self.server.token_delay)
+                self._write_chunk({"model": model, "message": {"role": "assistant", "content": token},
+                                   "done": False})
+            self._write_chunk({"model": model, "message": {"role": "assistant", "content": ""},
+                               "done": True, "eval_count": len(tokens)})
+            self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data: dict):
+        line = json.dumps(data, ensure_ascii=False).encode() + b"\n"
+        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        self.wfile.flush()
+
+
+class StubOllamaServer(ThreadingHTTPServer):
+    """Stub server running in a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, model_name: str = "stub",
+                 ttft: float = 0.0, token_rate: float = 0.0, tokens: Optional[int] = None,
+                 parallel: int = 0, error_rate: float = 0.0, seed: Optional[int] = None):
+        """Initialize server.
+
+        Args:
+            host: Listen address
+            port: Listen port, 0 picks a free one
+            model_name: Model reported by /api/tags
+            ttft: Seconds before the first token
+            token_rate: Tokens per second after the first, 0 for instant
+            tokens: Reply length in tokens, default is the fixed reply; capped by num_predict
+            parallel: Replies generated at the same time, 0 for unlimited
+            error_rate: Share of chat requests answered with HTTP 500
+            seed: Random seed for error injection
+        """
+        super().__init__((host, port), StubOllamaHandler)
+        self.model_name = model_name
+        self.ttft = ttft
+        self.token_delay = 1.0 / token_rate if token_rate > 0 else 0.0
+        self.tokens = tokens
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self.connections = 0  # Accepted TCP connections
+        self._slots = threading.BoundedSemaphore(parallel) if parallel > 0 else None
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def should_fail(self) -> bool:
+        if self.error_rate <= 0:
+            return False
+        with self._random_lock:
+            return self._random.random() < self.error_rate
+
+    def reply(self, num_predict: Optional[int] = None) -> list:
+        """Tokens of one reply."""
+        count = self.tokens if self.tokens is not None else len(REPLY_TOKENS)
+        if num_predict is not None and num_predict > 0:
+            count = min(count, num_predict)
+        return [REPLY_TOKENS[i % len(REPLY_TOKENS)] for i in range(count)]
+
+    def generation_slot(self):
+        """Context manager holding one of the `parallel` generation slots."""
+        return self._slots if self._slots is not None else nullcontext()
+
+    @staticmethod
+    def sleep(seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def verify_request(self, request, client_address) -> bool:
+        self.connections += 1
+        return True
+
+    def handle_error(self, request, client_address):
+        # Clients that give up on a slow reply (timeouts, hedged calls) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def start(self) -> "StubOllamaServer":
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05},
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add stub behaviour options to a command line parser."""
+    parser.add_argument("--ttft", type=float, default=0.0, help="Seconds before the first token")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Tokens per second, 0 for instant")
+    parser.add_argument("--tokens", type=int, help="Reply length in tokens")
+    parser.add_argument("--parallel", type=int, default=0, help="Concurrent generations, 0 for unlimited")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with 500")
+    parser.add_argument("--seed", type=int)
+
+
+def stub_options(args: argparse.Namespace) -> dict:
+    """StubOllamaServer arguments from options added by `add_arguments`."""
+    return {
+        "ttft": args.ttft,
+        "token_rate": args.token_rate,
+        "tokens": args.tokens,
+        "parallel": args.parallel,
+        "error_rate": args.error_rate,
+        "seed": args.seed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = StubOllamaServer(args.host, args.port, **stub_options(args))
+    print(f"Stub Ollama listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,226 @@
 """FastAPI application for Medical AI Service."""
 
+import asyncio
+import json
+import math
 import time
-from fastapi import FastAPI, HTTPException, APIRouter
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator, Literal
 
-from src.api.models import SymptomRequest, AnalysisResponse, HealthResponse
-from src.services.ai_service import AIService
+from fastapi import FastAPI, HTTPException, APIRouter, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from src.api.models import (
+    SymptomRequest, AnalysisResponse, HealthResponse,
+    BatchAnalysisRequest, BatchAnalysisResponse, BatchItemResult
+)
+from src.config.settings import (
+    RATE_LIMIT_API_KEYS, RATE_LIMIT_CLIENT_HEADER, MODEL_WARMUP, METRICS_SQLITE_PATH, METRICS_SYNC_INTERVAL
+)
+from src.services.admission import AdmissionRejected
+from src.services.ai_service import AIService, StreamInterrupted
+from src.services.analysis import AnalysisResult, SOURCE_TRIAGE
+from src.services.backend_pool import BackendPool
+from src.services.circuit_breaker import STATE_VALUES
+from src.services.rate_limiter import RateLimitExceeded
+from src.utils import metrics
+from src.utils.health import create_health_prober
 from src import __version__, __description__
 
 
+_ai_service = None
+
+
+def get_ai_service() -> AIService:
+    """Return the AI service, creating it on first use.
+
+    Construction is deferred so importing the app stays cheap; the lifespan
+    hook creates the service before the first request is served.
+    """
+    global _ai_service
+    if _ai_service is None:
+        _ai_service = AIService()
+        metrics.MODEL_IN_FLIGHT.set_function(lambda: _ai_service.admission.in_flight)
+        metrics.MODEL_QUEUE_DEPTH.set_function(lambda: _ai_service.scheduler.queue_depth())
+        metrics.MODEL_SLOTS_ACTIVE.set_function(lambda: _ai_service.scheduler.active)
+        metrics.MODEL_READY.set_function(lambda: int(_ai_service.warmer.ready))
+        metrics.CIRCUIT_STATE.set_function(lambda: STATE_VALUES[_ai_service.breaker.state])
+    return _ai_service
+
+
+health_prober = create_health_prober()
+metrics.OLLAMA_UP.set_function(lambda: int(health_prober.enabled and health_prober.healthy()))
+
+
+def _create_shared_metrics():
+    """Return metrics shared with the other workers of this host, None if not configured."""
+    if not METRICS_SQLITE_PATH:
+        return None
+    from src.utils.shared_metrics import SharedMetrics
+    return SharedMetrics(METRICS_SQLITE_PATH, interval=METRICS_SYNC_INTERVAL)
+
+
+shared_metrics = _create_shared_metrics()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the AI service and start warm-up, health probing and, with
+    several workers, metrics publishing in the background. On shutdown,
+    answer prefetches still running are given a few seconds to finish and
+    connections to the model are closed."""
+    ai_service = get_ai_service()
+    tasks = []
+    if shared_metrics is not None:
+        tasks.append(asyncio.create_task(shared_metrics.run()))
+    if MODEL_WARMUP:
+        tasks.append(asyncio.create_task(ai_service.warmer.run()))
+    else:
+        ai_service.warmer.ready = True
+    if health_prober.enabled:
+        tasks.append(asyncio.create_task(health_prober.run()))
+    try:
+        yield
+    finally:
+        await ai_service.drain_prefetches()
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        await ai_service.model.aclose()
+
+
+class MetricsMiddleware:
+    """Count in-flight HTTP requests and time them per route.
+
+    Requests are labelled with the route template rather than the raw path,
+    so the number of series stays bounded; unmatched paths share "other".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics.HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            metrics.HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "other"
+            metrics.HTTP_REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - started)
+
+
 app = FastAPI(
     title="Medical AI Service API",
     description="REST API for symptom analysis and doctor recommendation",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
+app.add_middleware(MetricsMiddleware)
+
 # API v1 Router
 api_v1_router = APIRouter(prefix="/api/v1", tags=["v1"])
 
-ai_service = AIService()
 
+def _overloaded(error: AdmissionRejected) -> HTTPException:
+    """Build 503 response for a request refused by admission control."""
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+    )
+
+
+def _client_id(http_request: Request) -> str:
+    """Identify client for rate limiting: known API key header, else client IP.
+
+    Keys outside RATE_LIMIT_API_KEYS are ignored, so a client cannot get a
+    fresh limit by sending a new key with every request.
+    """
+    api_key = http_request.headers.get(RATE_LIMIT_CLIENT_HEADER)
+    if api_key and api_key in RATE_LIMIT_API_KEYS:
+        return f"key:{api_key}"
+    if http_request.client is not None:
+        return f"ip:{http_request.client.host}"
+    return "default"
 
-@api_v1_router.post("/analyze", response_model=AnalysisResponse)
-async def analyze_symptoms(request: SymptomRequest):
+
+def _analysis_response(result: AnalysisResult, processing_time: float = None,
+                       include_timings: bool = False) -> AnalysisResponse:
+    """Convert service result to API response."""
+    return AnalysisResponse(
+        response=result.response,
+        language=result.language,
+        processing_time=processing_time,
+        source=result.source,
+        doctors=list(result.doctors),
+        is_urgent=result.is_urgent,
+        timings={stage: round(seconds, 6) for stage, seconds in result.timings.items()}
+        if include_timings else None
+    )
+
+
+@api_v1_router.post(
+    "/analyze",
+    response_model=AnalysisResponse,
+    responses={
+        429: {"model": AnalysisResponse, "description": "Rate limit exceeded, degraded response"},
+        503: {"description": "Model queue saturated, retry later"}
+    }
+)
+async def analyze_symptoms(request: SymptomRequest, http_request: Request,
+                           include_timings: bool = Query(False, alias="timings"),
+                           mode: Literal["full", "fast"] = Query("full"),
+                           upgrade: bool = Query(False)):
     """Analyze symptoms and get doctor recommendations.
     - **text**: Symptom description (3-1000 characters)
-    Return AI-generated response with doctor recommendations."""
+    - **timings**: Include seconds spent per stage in the response
+    - **mode**: `full` asks the model; `fast` returns matched doctors,
+      urgency and a templated recommendation without a model call
+    - **upgrade**: In fast mode, return the model answer if it is cached,
+      otherwise generate it in the background (`upgrade_pending`) so a
+      repeated request gets it
+    Return AI-generated response with doctor recommendations and where it
+    came from (cache/llm/fallback/validation/triage).
+    Over the rate limit return 429 with `Retry-After` and a basic
+    recommendation without AI. When the model queue is saturated return
+    503 with `Retry-After`."""
+    start_time = time.time()
+    if mode == "fast":
+        result = get_ai_service().triage(request.text, use_cache=upgrade)
+        response = _analysis_response(result, round(time.time() - start_time, 2), include_timings)
+        if upgrade and result.source == SOURCE_TRIAGE:
+            # Own task rather than a background task, so the response and its metrics do not wait for the model
+            get_ai_service().schedule_prefetch(request.text, _client_id(http_request))
+            response.upgrade_pending = True
+        return response
+
     try:
-        start_time = time.time()
-        response = ai_service.analyze_and_respond(request.text)
-        language = ai_service._detect_language(request.text)
-        processing_time = round(time.time() - start_time, 2)
-        return AnalysisResponse(
-            response=response,
-            language=language,
-            processing_time=processing_time
+        result = await get_ai_service().analyze_async(
+            request.text,
+            user_id=_client_id(http_request),
+            raise_on_rate_limit=True
         )
+        return _analysis_response(result, round(time.time() - start_time, 2), include_timings)
+    except RateLimitExceeded as e:
+        degraded = _analysis_response(e.result, round(time.time() - start_time, 2), include_timings)
+        return JSONResponse(
+            status_code=429,
+            content=degraded.model_dump(),
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+        )
+    except AdmissionRejected as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -44,21 +228,187 @@ async def analyze_symptoms(request: SymptomRequest):
         )
 
 
+@api_v1_router.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_symptoms_batch(request: BatchAnalysisRequest, http_request: Request,
+                                 include_timings: bool = Query(False, alias="timings")):
+    """Analyze several symptom descriptions in one call.
+    - **items**: List of symptom descriptions
+    - **timings**: Include seconds spent per stage for each item
+    Duplicates and cached answers skip the model; the rest run with bounded
+    concurrency under an overall deadline. Failed items carry `error`."""
+    start_time = time.time()
+    texts = [item.text for item in request.items]
+    outcomes = await get_ai_service().analyze_batch_async(texts, user_id=_client_id(http_request))
+
+    results = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, Exception):
+            error = str(outcome) or type(outcome).__name__
+            results.append(BatchItemResult(index=index, error=f"Error processing request: {error}"))
+        else:
+            results.append(BatchItemResult(
+                index=index,
+                result=_analysis_response(outcome, include_timings=include_timings)
+            ))
+
+    return BatchAnalysisResponse(
+        results=results,
+        processing_time=round(time.time() - start_time, 2)
+    )
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format a single Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_analysis(language: str, tokens: AsyncIterator[str], start_time: float) -> AsyncIterator[str]:
+    """Yield SSE events for a streamed analysis, ending with a 'done' event."""
+    first_token_time = None
+    truncated = False
+    try:
+        async for token in tokens:
+            if first_token_time is None:
+                first_token_time = time.perf_counter() - start_time
+            yield _sse_event("token", {"text": token})
+    except StreamInterrupted as e:
+        truncated = True
+        yield _sse_event("error", {"detail": str(e)})
+    except Exception as e:
+        yield _sse_event("error", {"detail": f"Error processing request: {str(e)}"})
+
+    yield _sse_event("done", {
+        "language": language,
+        "truncated": truncated,
+        "time_to_first_token": round(first_token_time, 3) if first_token_time is not None else None,
+        "processing_time": round(time.perf_counter() - start_time, 2)
+    })
+
+
+@api_v1_router.post("/analyze/stream")
+async def analyze_symptoms_stream(request: SymptomRequest, http_request: Request):
+    """Analyze symptoms and stream the answer as Server-Sent Events.
+    - **text**: Symptom description (3-1000 characters)
+    Emit `token` events as the model generates and a final `done` event
+    with the detected language and timing. If the model fails after the
+    first token, an `error` event precedes `done` and `done` has
+    `truncated: true`.
+    Over the rate limit return 429 with `Retry-After` and a basic
+    recommendation without AI, as `/analyze` does."""
+    start_time = time.perf_counter()
+    ai_service = get_ai_service()
+    try:
+        tokens, language = ai_service.open_stream(
+            request.text, user_id=_client_id(http_request), raise_on_rate_limit=True
+        )
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    except RateLimitExceeded as e:
+        degraded = _analysis_response(e.result, round(time.perf_counter() - start_time, 2))
+        return JSONResponse(
+            status_code=429,
+            content=degraded.model_dump(),
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+        )
+    return StreamingResponse(
+        _stream_analysis(language, tokens, start_time),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@api_v1_router.get("/load")
+async def load_status():
+    """Report in-flight requests, queue depth and estimated wait.
+    Return 503 while saturated so load balancers can route around."""
+    snapshot = get_ai_service().admission.snapshot()
+    return JSONResponse(status_code=503 if snapshot["saturated"] else 200, content=snapshot)
+
+
+@api_v1_router.get("/stats")
+async def service_stats():
+    """Return model scheduler, response cache and answer catalog statistics.
+    Queue-wait percentiles are reported per priority class."""
+    ai_service = get_ai_service()
+    return {
+        "scheduler": ai_service.scheduler.stats(),
+        "cache": ai_service.response_cache.stats(),
+        "catalog": ai_service.catalog.status() if ai_service.catalog is not None else None
+    }
+
+
+@api_v1_router.get("/live")
+async def liveness():
+    """Report that the process is up and the event loop is responsive.
+    Does no I/O, so it can be polled as often as needed."""
+    return {"status": "alive"}
+
+
+@api_v1_router.get("/ready")
+async def readiness():
+    """Report whether the service should receive traffic.
+    Ready once the model is warmed up and the last background probe found
+    Ollama with the model installed (with several servers, at least one of
+    them); otherwise 503. Reads stored state only."""
+    warmer = get_ai_service().warmer
+    ready = warmer.ready and health_prober.healthy()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "warmed_up": warmer.ready, "ollama": health_prober.snapshot()}
+    )
+
+
 @api_v1_router.get("/health", response_model=HealthResponse)
 async def health_check():
     """Check service health status.
-    Return basic service information and status."""
+    Return service information, the status of the last Ollama probe
+    (healthy, degraded, unhealthy or unknown) and the model circuit state."""
     return HealthResponse(
-        status="healthy",
+        status=health_prober.snapshot()["status"] if health_prober.enabled else "healthy",
         service=__description__,
-        version=__version__
+        version=__version__,
+        circuit_breaker=get_ai_service().breaker.state
     )
 
 
+@api_v1_router.get("/health/deep")
+async def deep_health_check():
+    """Detailed health view for dashboards and debugging.
+    Include the last probe, probe latency history, warm-up state, load,
+    current generation budgets, the loaded answer catalog and, with several
+    Ollama servers, per-backend probes and routing state."""
+    ai_service = get_ai_service()
+    return {
+        "service": __description__,
+        "version": __version__,
+        "ollama": health_prober.snapshot(),
+        "probe_interval": health_prober.interval,
+        "probes": health_prober.latency_summary(),
+        "warmup": ai_service.warmer.status(),
+        "circuit_breaker": ai_service.breaker.status(),
+        "load": ai_service.admission.snapshot(),
+        "generation_budget": ai_service.budget_status(),
+        "catalog": ai_service.catalog.status() if ai_service.catalog is not None else None,
+        "backends": ai_service.model.status() if isinstance(ai_service.model, BackendPool) else None
+    }
+
+
 # Include v1 router
 app.include_router(api_v1_router)
 
 
+@app.get("/metrics", tags=["monitoring"], include_in_schema=False)
+async def prometheus_metrics():
+    """Expose service metrics in Prometheus text format.
+    With METRICS_SQLITE_PATH set, report the totals of all workers."""
+    if shared_metrics is not None:
+        # Reads the other workers' snapshots, which may wait for the database lock
+        body = await asyncio.to_thread(shared_metrics.render)
+    else:
+        body = metrics.REGISTRY.render()
+    return Response(body, media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/", tags=["root"])
 async def root():
     """Root endpoint with API information."""
@@ -71,3 +421,9 @@ async def root():
         "docs": "/docs",
         "health": "/api/v1/health"
     }
+
+
+# Known endpoints are exported from the first scrape
+for _route in app.routes:
+    metrics.HTTP_REQUEST_SECONDS.labels(_route.path)
+metrics.HTTP_REQUEST_SECONDS.labels("other")
@@ -1,7 +1,9 @@
 """Pydantic models for API requests and responses."""
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
+
+from src.config.settings import BATCH_MAX_ITEMS
 
 
 class SymptomRequest(BaseModel):
@@ -29,6 +31,64 @@ class AnalysisResponse(BaseModel):
         None,
         description="Processing time in seconds"
     )
+    source: Optional[str] = Field(
+        None,
+        description="Where the response came from (cache/llm/fallback/validation/triage)"
+    )
+    doctors: List[str] = Field(
+        default_factory=list,
+        description="Doctors matched from the described symptoms"
+    )
+    is_urgent: bool = Field(
+        False,
+        description="Whether urgent symptoms were detected"
+    )
+    timings: Optional[Dict[str, float]] = Field(
+        None,
+        description="Seconds spent per stage, returned when requested with ?timings=true"
+    )
+    upgrade_pending: Optional[bool] = Field(
+        None,
+        description="Fast mode with ?upgrade=true: the model answer is being generated, repeat the request to get it"
+    )
+
+
+class BatchAnalysisRequest(BaseModel):
+    """Request model for batch symptom analysis."""
+    items: List[SymptomRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=BATCH_MAX_ITEMS,
+        description="Symptom descriptions to analyze"
+    )
+
+
+class BatchItemResult(BaseModel):
+    """Result of one item in a batch analysis."""
+    index: int = Field(
+        ...,
+        description="Position of the item in the request"
+    )
+    result: Optional[AnalysisResponse] = Field(
+        None,
+        description="Analysis result, absent if the item failed"
+    )
+    error: Optional[str] = Field(
+        None,
+        description="Error message if the item failed"
+    )
+
+
+class BatchAnalysisResponse(BaseModel):
+    """Response model for batch symptom analysis."""
+    results: List[BatchItemResult] = Field(
+        ...,
+        description="Per-item results in request order"
+    )
+    processing_time: Optional[float] = Field(
+        None,
+        description="Processing time of the whole batch in seconds"
+    )
 
 
 class HealthResponse(BaseModel):
@@ -45,3 +105,7 @@ class HealthResponse(BaseModel):
         ...,
         description="Service version"
     )
+    circuit_breaker: Optional[str] = Field(
+        None,
+        description="Model circuit breaker state (closed/half_open/open)"
+    )
@@ -0,0 +1,183 @@
+"""Multi-process API server.
+
+Usage:
+    python -m src.api.serve --workers 4
+    WORKERS=4 python -m src.api.serve --host 0.0.0.0 --port 8000
+
+The parent process loads the application once (settings, keyword matcher,
+answer catalog, shared SQLite stores), binds the listening socket and then
+forks the workers, which inherit all of it and accept connections from
+the same socket. With more than one worker, rate limits and metrics
+default to SQLite files shared by the workers (RATE_LIMIT_BACKEND=sqlite,
+METRICS_SQLITE_PATH=data/metrics.sqlite3), so limits hold per host and
+/metrics reports host totals whichever worker is scraped. Each worker has
+its own model scheduler, so MODEL_CONCURRENCY applies per worker.
+
+Workers that die are restarted; SIGTERM or SIGINT stops all of them.
+Forking needs a POSIX system.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import time
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+SHARED_DEFAULTS = {
+    "RATE_LIMIT_BACKEND": "sqlite",
+    "METRICS_SQLITE_PATH": "data/metrics.sqlite3",
+}
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Create the listening socket shared by all workers."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(config, sock: socket.socket):
+    """Serve in a forked worker until it is told to stop, then exit."""
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    code = 0
+    try:
+        uvicorn.Server(config).run(sockets=[sock])
+    except BaseException:
+        logger.exception("Worker failed")
+        code = 1
+    finally:
+        os._exit(code)
+
+
+class Supervisor:
+    """Forks workers, restarts the ones that die and stops all on a signal."""
+
+    def __init__(self, config, sock: socket.socket, workers: int, graceful_timeout: float = 30.0):
+        """Initialize supervisor.
+
+        Args:
+            config: uvicorn.Config for the workers
+            sock: Listening socket
+            workers: Number of worker processes
+            graceful_timeout: Seconds to wait for workers to finish before killing them
+        """
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.children = {}  # pid -> start time
+        self.stopping = False
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(self.config, self.sock)
+        self.children[pid] = time.monotonic()
+        logger.info(f"Started worker {pid}")
+        return pid
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+    def _reap(self) -> list:
+        """Collect exited workers without blocking."""
+        exited = []
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            started = self.children.pop(pid, None)
+            if started is not None:
+                exited.append((pid, status, time.monotonic() - started))
+        return exited
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.workers):
+            self.spawn()
+
+        while not self.stopping:
+            for pid, status, lifetime in self._reap():
+                logger.warning(f"Worker {pid} exited with status {status}, restarting")
+                if lifetime < 1.0:
+                    time.sleep(1.0)  # Do not spin on a worker that fails at startup
+                if not self.stopping:
+                    self.spawn()
+            time.sleep(0.1)
+        self.shutdown()
+
+    def shutdown(self):
+        """Ask workers to finish their requests, kill the ones that do not."""
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+        for pid in self.children:
+            logger.warning(f"Worker {pid} did not stop in time, killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.children.clear()
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WORKERS", "1")),
+                        help="Worker processes (default: WORKERS)")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                        help="Seconds workers get to finish requests on shutdown")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info").lower())
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s:     %(message)s")
+
+    if args.workers > 1:
+        # Settings are read on import, so shared defaults must be in place first
+        for name, value in SHARED_DEFAULTS.items():
+            os.environ.setdefault(name, value)
+
+    import uvicorn
+
+    from src.api.app import app, get_ai_service, shared_metrics
+    from src.config.settings import RATE_LIMIT_BACKEND
+
+    if args.workers > 1 and RATE_LIMIT_BACKEND != "sqlite":
+        logger.warning(f"RATE_LIMIT_BACKEND={RATE_LIMIT_BACKEND}: each of {args.workers} workers limits separately")
+    # Preload: built once here, inherited by every worker
+    get_ai_service()
+    if shared_metrics is not None:
+        shared_metrics.clear()
+
+    sock = bind_socket(args.host, args.port)
+    config = uvicorn.Config(app, host=args.host, port=args.port, log_level=args.log_level)
+    logger.info(f"Serving on http://{args.host}:{args.port} with {args.workers} worker(s)")
+    if args.workers <= 1:
+        uvicorn.Server(config).run(sockets=[sock])
+        return
+    Supervisor(config, sock, args.workers, args.graceful_timeout).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,12 +10,95 @@ load_dotenv()
 MODEL_NAME = os.getenv("MODEL_NAME", "llama3.2:3b-instruct-q4_0")
 MODEL_PROVIDER = os.getenv("MODEL_PROVIDER", "ollama")
 MODEL_TEMPERATURE = int(os.getenv("MODEL_TEMPERATURE", "0"))
-OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+# Несколько серверов через запятую
+OLLAMA_BASE_URLS = [url.strip() for url in os.getenv("OLLAMA_BASE_URLS", "").split(",") if url.strip()]
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", OLLAMA_BASE_URLS[0] if OLLAMA_BASE_URLS else "http://localhost:11434")
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "ollama")  # ollama (нативный /api/chat) | langchain (ChatOllama)
+MODEL_TIMEOUT = float(os.getenv("MODEL_TIMEOUT", "120"))  # Секунды на ответ модели
 
 # Оптимизация производительности
 MODEL_NUM_CTX = int(os.getenv("MODEL_NUM_CTX", "512"))  # Уменьшен контекст для скорости
 MODEL_NUM_PREDICT = int(os.getenv("MODEL_NUM_PREDICT", "192"))  # Развернутые ответы
 
+# Generation budget per request (num_predict by intent and load, prompt trimmed to num_ctx)
+BUDGET_ADAPTIVE = os.getenv("BUDGET_ADAPTIVE", "True").lower() == "true"  # Сокращать ответы под нагрузкой
+BUDGET_GENERAL_NUM_PREDICT = int(os.getenv("BUDGET_GENERAL_NUM_PREDICT", "96"))  # Общий чат короче
+BUDGET_MIN_NUM_PREDICT = int(os.getenv("BUDGET_MIN_NUM_PREDICT", "48"))  # При полной нагрузке
+BUDGET_QUEUE_HIGH = int(os.getenv("BUDGET_QUEUE_HIGH", "16"))  # Очередь, при которой бюджет минимален
+BUDGET_WAIT_HIGH_SECONDS = float(os.getenv("BUDGET_WAIT_HIGH_SECONDS", "10"))  # Ожидание, при котором бюджет минимален
+BUDGET_LATENCY_TARGET_SECONDS = float(os.getenv("BUDGET_LATENCY_TARGET_SECONDS", "8"))  # Выше - бюджет сокращается
+
+# Backend pool (used when OLLAMA_BASE_URLS lists several servers)
+POOL_EJECT_FAILURES = int(os.getenv("POOL_EJECT_FAILURES", "3"))  # Ошибок подряд до исключения сервера
+POOL_EJECT_SECONDS = float(os.getenv("POOL_EJECT_SECONDS", "30"))  # Удваивается при повторных исключениях
+POOL_MAX_EJECT_SECONDS = float(os.getenv("POOL_MAX_EJECT_SECONDS", "300"))
+POOL_HEDGE = os.getenv("POOL_HEDGE", "False").lower() == "true"  # Дублировать медленные запросы на второй сервер
+# Задержка дублирования - этот квантиль латентности
+POOL_HEDGE_QUANTILE = float(os.getenv("POOL_HEDGE_QUANTILE", "0.95"))
+
+# Model warm-up and keep-alive
+_keep_alive = os.getenv("MODEL_KEEP_ALIVE", "30m")  # Сколько Ollama держит модель в памяти ("-1" - всегда)
+MODEL_KEEP_ALIVE = int(_keep_alive) if _keep_alive.lstrip("-").isdigit() else _keep_alive
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "True").lower() == "true"  # Прогрев модели при старте API
+MODEL_KEEP_WARM_INTERVAL = float(os.getenv("MODEL_KEEP_WARM_INTERVAL", "300"))  # 0 - без пингов
+
+# Response cache
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(4 * 1024 * 1024)))  # Бюджет памяти кэша
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "3600"))  # 0 - без истечения
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")  # memory | sqlite
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "data/response_cache.sqlite3")
+CACHE_SQLITE_MAX_BYTES = int(os.getenv("CACHE_SQLITE_MAX_BYTES", str(256 * 1024 * 1024)))
+CACHE_KEY_NORMALIZE = os.getenv("CACHE_KEY_NORMALIZE", "True").lower() == "true"  # Пунктуация, пробелы, повторы
+CACHE_KEY_SORT_TOKENS = os.getenv("CACHE_KEY_SORT_TOKENS", "False").lower() == "true"  # Порядок слов не важен
+CACHE_NEAR_DUPLICATE_THRESHOLD = float(os.getenv("CACHE_NEAR_DUPLICATE_THRESHOLD", "0"))  # 0 - выключено
+
+# Precomputed answer catalog (built with python -m src.utils.build_catalog)
+CATALOG_PATH = os.getenv("CATALOG_PATH", "")  # Файл каталога ответов, пусто - без каталога
+CATALOG_CHECK_INTERVAL = float(os.getenv("CATALOG_CHECK_INTERVAL", "30"))  # Проверка нового файла, секунды
+
+# Rate limiting (per client: API key header or IP)
+RATE_LIMIT_REQUESTS = int(os.getenv("RATE_LIMIT_REQUESTS", "10"))
+RATE_LIMIT_PERIOD = float(os.getenv("RATE_LIMIT_PERIOD", "60"))  # Секунды
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", os.getenv("RATE_LIMIT_REQUESTS", "10")))
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
+RATE_LIMIT_CLIENT_HEADER = os.getenv("RATE_LIMIT_CLIENT_HEADER", "X-API-Key")
+# Ключи через запятую, которым положен отдельный лимит; остальные клиенты считаются по IP
+RATE_LIMIT_API_KEYS = frozenset(key.strip() for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if key.strip())
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory | sqlite (общий для всех воркеров)
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "data/rate_limits.sqlite3")
+
+# Metrics of several workers (python -m src.api.serve --workers N)
+METRICS_SQLITE_PATH = os.getenv("METRICS_SQLITE_PATH", "")  # Пусто - метрики процесса, иначе сумма по воркерам
+METRICS_SYNC_INTERVAL = float(os.getenv("METRICS_SYNC_INTERVAL", "5"))  # Секунды между публикациями метрик воркера
+
+# Model call scheduling
+MODEL_CONCURRENCY = int(os.getenv("MODEL_CONCURRENCY", "4"))  # Одновременных вызовов модели
+SCHEDULER_AGING_SECONDS = float(os.getenv("SCHEDULER_AGING_SECONDS", "10"))  # Ожидание, поднимающее приоритет на класс
+
+# Admission control (503 + Retry-After instead of unbounded queueing)
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "30"))
+
+# Circuit breaker around model calls
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))  # Доля ошибок, размыкающая цепь
+CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "30"))  # Медленный вызов
+CIRCUIT_SLOW_CALL_RATE = float(os.getenv("CIRCUIT_SLOW_CALL_RATE", "0.8"))  # Доля медленных вызовов
+CIRCUIT_WINDOW = int(os.getenv("CIRCUIT_WINDOW", "20"))  # Последних вызовов в окне
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))  # До пробных вызовов
+CIRCUIT_HALF_OPEN_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_CALLS", "2"))
+
+# Background health probing of Ollama
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "10"))  # 0 - без проверок
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "2"))
+HEALTH_PROBE_HISTORY = int(os.getenv("HEALTH_PROBE_HISTORY", "60"))  # Последних проверок в истории
+
+# Batch analysis
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "100"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))  # Одновременных элементов одного пакета
+BATCH_DEADLINE_SECONDS = float(os.getenv("BATCH_DEADLINE_SECONDS", "60"))
+
 # Application settings
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT = os.getenv("LOG_FORMAT", "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
@@ -37,6 +120,9 @@ SYMPTOM_KEYWORDS = [
     "симптом", "плохо", "живот", "голова", "глаз", "зуб"
 ]
 
+# Markers of urgent conditions
+URGENT_INDICATORS = ['острая', 'сильная', 'тяжелая', 'кровь', 'потеря сознания']
+
 # Exit commands
 EXIT_COMMANDS = ['quit', 'выход', 'q']
 
@@ -50,6 +136,7 @@ LANGUAGES = {
         'error': "Извините, произошла ошибка. Попробуйте еще раз.",
         'processing': "Обрабатываю ваш запрос...",
         'no_symptoms': "Не найдено явных симптомов. Если у вас есть вопросы о здоровье, опишите симптомы подробнее.",
+        'urgent': "⚠️ Это может быть срочно! Не откладывайте обращение к врачу.",
         'model_error': "Сервис временно недоступен. Попробуйте позже."
     },
     'en': {
@@ -60,6 +147,7 @@ LANGUAGES = {
         'error': "Sorry, an error occurred. Please try again.",
         'processing': "Processing your request...",
         'no_symptoms': "No obvious symptoms found. If you have health questions, please describe symptoms in more detail.",
+        'urgent': "⚠️ This may be urgent! Do not delay seeing a doctor.",
         'model_error': "Service temporarily unavailable. Please try later."
     }
 }
@@ -0,0 +1,110 @@
+"""Admission control for model-bound requests."""
+
+import math
+from contextlib import contextmanager
+
+from src.services.scheduler import GENERAL, PRIORITY_NAMES, PriorityScheduler
+from src.utils import metrics
+
+
+class AdmissionRejected(Exception):
+    """Raised when the service is too loaded to accept a request."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Service overloaded ({reason}), retry after {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Rejects model-bound requests early instead of letting them pile up.
+
+    A request is refused when too many requests are already waiting on the
+    model, when the scheduler queue is full, or when the estimated queue
+    wait exceeds the limit. The estimate is the number of requests ahead
+    divided by the slots, times the moving average of one model call.
+
+    Every limit counts only requests of the same or a more urgent priority
+    class, which the scheduler serves first, so a queue full of general
+    chat does not turn away symptom or urgent requests.
+    """
+
+    def __init__(self, scheduler: PriorityScheduler, max_in_flight: int = 64,
+                 max_queue: int = 32, max_wait: float = 30.0):
+        """Initialize controller.
+
+        Args:
+            scheduler: Scheduler whose queue is guarded
+            max_in_flight: Admitted requests allowed at once
+            max_queue: Requests allowed to wait for a model slot
+            max_wait: Largest acceptable estimated wait in seconds
+        """
+        self.scheduler = scheduler
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self._admitted = {priority: 0 for priority in PRIORITY_NAMES}
+        self.rejected = {"in_flight": 0, "queue": 0, "wait": 0}
+
+    def _in_flight_ahead(self, priority: int) -> int:
+        return sum(count for admitted, count in self._admitted.items() if admitted <= priority)
+
+    def estimated_wait(self, priority: int = GENERAL) -> float:
+        """Estimated time a new request of the priority class would wait for a model slot."""
+        scheduler = self.scheduler
+        if scheduler.active < scheduler.slots:
+            return 0.0
+        ahead = scheduler.queue_depth(priority) + 1
+        return ahead / scheduler.slots * scheduler.service_time
+
+    def _retry_after(self, priority: int) -> float:
+        return max(1.0, math.ceil(self.estimated_wait(priority)))
+
+    def _refusal(self, priority: int):
+        """Reason a new request of the priority class would be refused, or None."""
+        if self._in_flight_ahead(priority) >= self.max_in_flight:
+            return "in_flight"
+        if self.scheduler.queue_depth(priority) >= self.max_queue:
+            return "queue"
+        if self.estimated_wait(priority) > self.max_wait:
+            return "wait"
+        return None
+
+    def check(self, priority: int = GENERAL):
+        """Raise AdmissionRejected if a new request of the priority class would be refused."""
+        reason = self._refusal(priority)
+        if reason is None:
+            return
+        self.rejected[reason] += 1
+        metrics.FALLBACK_ADMISSION.inc()
+        raise AdmissionRejected(reason, self._retry_after(priority))
+
+    @contextmanager
+    def admit(self, priority: int = GENERAL):
+        """Hold an admission for the duration of the block."""
+        self.check(priority)
+        self.in_flight += 1
+        self._admitted[priority] += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._admitted[priority] -= 1
+
+    def saturated(self) -> bool:
+        """True if new general requests are currently being refused."""
+        return self._refusal(GENERAL) is not None
+
+    def snapshot(self) -> dict:
+        """Current load for load balancers and dashboards."""
+        return {
+            "saturated": self.saturated(),
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": self.scheduler.queue_depth(),
+            "max_queue": self.max_queue,
+            "estimated_wait": round(self.estimated_wait(), 3),
+            "max_wait": self.max_wait,
+            "rejected": dict(self.rejected)
+        }
@@ -1,23 +1,59 @@
 """Service for working with AI model."""
 
+import asyncio
 import logging
-import time
-from collections import defaultdict
-from langchain_ollama import ChatOllama
-from langchain_core.messages import HumanMessage, SystemMessage
+from dataclasses import replace
+from time import perf_counter
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 
 from src.config.settings import (
-    MODEL_NAME, MODEL_TEMPERATURE, OLLAMA_BASE_URL,
-    MODEL_NUM_CTX, MODEL_NUM_PREDICT,
-    SYSTEM_PROMPT, GENERAL_ASSISTANT_PROMPT, SYMPTOM_KEYWORDS,
-    LANGUAGES, DEFAULT_LANGUAGE
+    MODEL_KEEP_WARM_INTERVAL, SYSTEM_PROMPT, GENERAL_ASSISTANT_PROMPT,
+    LANGUAGES, DEFAULT_LANGUAGE, CACHE_KEY_NORMALIZE, CACHE_KEY_SORT_TOKENS,
+    CACHE_NEAR_DUPLICATE_THRESHOLD, BATCH_CONCURRENCY, BATCH_DEADLINE_SECONDS,
+    MODEL_CONCURRENCY, SCHEDULER_AGING_SECONDS, ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_MAX_QUEUE, ADMISSION_MAX_WAIT_SECONDS,
+    CIRCUIT_FAILURE_RATE, CIRCUIT_SLOW_CALL_SECONDS, CIRCUIT_SLOW_CALL_RATE, CIRCUIT_WINDOW,
+    CIRCUIT_MIN_CALLS, CIRCUIT_OPEN_SECONDS, CIRCUIT_HALF_OPEN_CALLS,
+    MODEL_NUM_CTX, MODEL_NUM_PREDICT, BUDGET_ADAPTIVE, BUDGET_GENERAL_NUM_PREDICT,
+    BUDGET_MIN_NUM_PREDICT, BUDGET_QUEUE_HIGH, BUDGET_WAIT_HIGH_SECONDS, BUDGET_LATENCY_TARGET_SECONDS,
+    CATALOG_PATH, CATALOG_CHECK_INTERVAL
 )
-from src.services.doctor_service import recommend_doctor
+from src.services.admission import AdmissionController, AdmissionRejected
+from src.services.answer_catalog import CatalogTier
+from src.services.analysis import (
+    AnalysisResult, SOURCE_CACHE, SOURCE_FALLBACK, SOURCE_LLM, SOURCE_TRIAGE, SOURCE_VALIDATION
+)
+from src.services.cache_keys import NearDuplicateIndex, normalize_cache_key
+from src.services.cache_service import create_response_cache
+from src.services.circuit_breaker import CircuitBreaker
+from src.services.doctor_service import format_recommendation
+from src.services.generation_budget import BudgetPolicy, GenerationBudget, estimate_tokens, trim_to_tokens
+from src.services.matcher import PreparedInput, get_matcher, prepare_input
+from src.services.model_client import Message, ModelClient, create_model_client
+from src.services.rate_limiter import RateLimitDecision, RateLimitExceeded, create_rate_limiter
+from src.services.scheduler import PriorityScheduler, priority_for
+from src.services.single_flight import SingleFlight
+from src.services.warmup import ModelWarmer
+from src.utils import metrics
 
 logger = logging.getLogger(__name__)
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
 
+def catalog_key_settings() -> dict:
+    """Cache key settings an answer catalog must be built with to match this service."""
+    return {"key_normalize": CACHE_KEY_NORMALIZE, "key_sort_tokens": CACHE_KEY_SORT_TOKENS}
+
+
+class StreamInterrupted(Exception):
+    """Raised when the model fails after part of a streamed answer was sent."""
+
+
+async def _single_chunk(text: str) -> AsyncIterator[str]:
+    """Stream of one ready response."""
+    yield text
+
+
 class AIService:
     """Service for working with AI model (Singleton)."""
     
@@ -35,18 +71,56 @@ class AIService:
             return
         
         try:
-            self.model = ChatOllama(
-                model=MODEL_NAME,
-                temperature=MODEL_TEMPERATURE,
-                base_url=OLLAMA_BASE_URL,
+            # Keyword automaton is compiled once, before the first request
+            get_matcher()
+            self.model = create_model_client()
+            self.warmer = ModelWarmer(
+                self.model.with_options(num_predict=1),
+                [SYSTEM_PROMPT, GENERAL_ASSISTANT_PROMPT],
+                interval=MODEL_KEEP_WARM_INTERVAL
+            )
+            self.response_cache = create_response_cache()
+            self.catalog = CatalogTier(
+                CATALOG_PATH,
+                check_interval=CATALOG_CHECK_INTERVAL,
+                key_settings=catalog_key_settings()
+            ) if CATALOG_PATH else None
+            self.similar_keys = (
+                NearDuplicateIndex(threshold=CACHE_NEAR_DUPLICATE_THRESHOLD)
+                if CACHE_NEAR_DUPLICATE_THRESHOLD > 0 else None
+            )
+            self.in_flight = SingleFlight()
+            self.prefetches = set()  # Running prefetch tasks, kept referenced until done
+            self.scheduler = PriorityScheduler(
+                slots=MODEL_CONCURRENCY,
+                aging_seconds=SCHEDULER_AGING_SECONDS
+            )
+            self.admission = AdmissionController(
+                self.scheduler,
+                max_in_flight=ADMISSION_MAX_IN_FLIGHT,
+                max_queue=ADMISSION_MAX_QUEUE,
+                max_wait=ADMISSION_MAX_WAIT_SECONDS
+            )
+            self.budget_policy = BudgetPolicy(
                 num_ctx=MODEL_NUM_CTX,
-                num_predict=MODEL_NUM_PREDICT
+                symptom_tokens=MODEL_NUM_PREDICT,
+                general_tokens=BUDGET_GENERAL_NUM_PREDICT,
+                min_tokens=BUDGET_MIN_NUM_PREDICT,
+                queue_high=BUDGET_QUEUE_HIGH,
+                wait_high=BUDGET_WAIT_HIGH_SECONDS,
+                latency_target=BUDGET_LATENCY_TARGET_SECONDS,
+                adaptive=BUDGET_ADAPTIVE
             )
-            self.response_cache = {}
-            self.cache_max_size = 100
-            self.request_times = defaultdict(list)
-            self.rate_limit = 10
-            self.time_window = 60
+            self.breaker = CircuitBreaker(
+                failure_rate=CIRCUIT_FAILURE_RATE,
+                slow_call_seconds=CIRCUIT_SLOW_CALL_SECONDS,
+                slow_call_rate=CIRCUIT_SLOW_CALL_RATE,
+                window=CIRCUIT_WINDOW,
+                min_calls=CIRCUIT_MIN_CALLS,
+                open_seconds=CIRCUIT_OPEN_SECONDS,
+                half_open_calls=CIRCUIT_HALF_OPEN_CALLS
+            )
+            self.rate_limiter = create_rate_limiter()
             AIService._initialized = True
         except Exception as e:
             print(f"Error initializing AI model: {e}")
@@ -55,18 +129,7 @@ class AIService:
 
     def _detect_language(self, text: str) -> str:
         """Simple detected language for text."""
-        if not isinstance(text, str) or not text.strip():
-            return DEFAULT_LANGUAGE
-
-        text = text.strip()
-
-        # Check rus
-        cyrillic_chars = sum(1 for char in text if '\u0400' <= char <= '\u04FF')
-        if cyrillic_chars > len(text) * 0.3:  # >30% кириллицы
-            return 'ru'
-
-        # Default eng
-        return 'en'
+        return prepare_input(text).language
 
     def _get_message(self, key: str, language: str = None) -> str:
         """Set massage on correct language"""
@@ -84,22 +147,92 @@ class AIService:
 
     def _check_rate_limit(self, user_id: str = "default") -> bool:
         """Simple check rate limiting."""
+        return self._rate_limit_decision(user_id).allowed
+
+    def _rate_limit_decision(self, user_id: str = "default",
+                             timings: Dict[str, float] = None) -> RateLimitDecision:
+        """Count request for user and return rate limit decision."""
+        started = perf_counter()
         if not isinstance(user_id, str) or not user_id.strip():
             user_id = "default"
+        decision = self.rate_limiter.check(user_id)
+        elapsed = perf_counter() - started
+        metrics.RATE_LIMIT_SECONDS.observe(elapsed)
+        if timings is not None:
+            timings['rate_limit'] = elapsed
+        (metrics.RATE_LIMIT_ALLOWED if decision.allowed else metrics.RATE_LIMIT_REJECTED).inc()
+        return decision
 
-        now = time.time()
-        self.request_times[user_id] = [
-            t for t in self.request_times[user_id]
-            if now - t < self.time_window
-        ]
+    def _rate_limited_response(self, prepared: PreparedInput) -> str:
+        """Basic recommendation without AI for rate limited requests."""
+        metrics.FALLBACK_RATE_LIMITED.inc()
+        if prepared.has_symptoms:
+            return format_recommendation(prepared.doctors)
+        return self._get_message('rate_limit', prepared.language)
+
+    def _cache_key(self, user_input: str) -> str:
+        """Build response cache key for user input."""
+        if CACHE_KEY_NORMALIZE:
+            return normalize_cache_key(user_input, sort_tokens=CACHE_KEY_SORT_TOKENS)
+        return user_input.strip().lower()
+
+    def _cache_lookup(self, cache_key: str, timings: Dict[str, float] = None) -> Optional[str]:
+        """Return cached response for key or a near-duplicate of it."""
+        started = perf_counter()
+        cached = self._find_cached(cache_key)
+        elapsed = perf_counter() - started
+        metrics.CACHE_LOOKUP_SECONDS.observe(elapsed)
+        if timings is not None:
+            timings['cache_lookup'] = elapsed
+        (metrics.CACHE_MISSES if cached is None else metrics.CACHE_HITS).inc()
+        return cached
+
+    def _find_cached(self, cache_key: str) -> Optional[str]:
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        if self.catalog is not None:
+            cached = self.catalog.get(cache_key)
+            if cached is not None:
+                metrics.CATALOG_HITS.inc()
+                return cached
+        if self.similar_keys is None:
+            return None
 
-        if len(self.request_times[user_id]) >= self.rate_limit:
-            return False
+        similar_key = self.similar_keys.find(cache_key)
+        if similar_key is None:
+            return None
 
-        self.request_times[user_id].append(now)
-        return True
+        cached = self.response_cache.get(similar_key)
+        if cached is None:
+            self.similar_keys.remove(similar_key)
+        return cached
 
-    def _validate_input(self, text: str) -> tuple[bool, str, str]:
+    def _cache_store(self, cache_key: str, response: str):
+        """Store response and index its key for near-duplicate lookups."""
+        if self.response_cache.set(cache_key, response) and self.similar_keys is not None:
+            self.similar_keys.add(cache_key)
+
+    def _prepare(self, user_input: str,
+                 timings: Dict[str, float] = None) -> tuple[PreparedInput, bool, str, str]:
+        """Analyse and validate input, recording stage timings.
+
+        Returns:
+            (prepared_input, is_valid, error_message, detected_language)
+        """
+        started = perf_counter()
+        prepared = prepare_input(user_input)
+        detected = perf_counter()
+        is_valid, error_key, lang = self._validate_input(user_input, prepared)
+        validated = perf_counter()
+        metrics.SYMPTOM_DETECTION_SECONDS.observe(detected - started)
+        metrics.VALIDATION_SECONDS.observe(validated - detected)
+        if timings is not None:
+            timings['symptom_detection'] = detected - started
+            timings['validation'] = validated - detected
+        return prepared, is_valid, error_key, lang
+
+    def _validate_input(self, text: str, prepared: PreparedInput = None) -> tuple[bool, str, str]:
         """Fast validate input date.
         
         Returns:
@@ -109,7 +242,7 @@ class AIService:
             return False, 'empty_input', DEFAULT_LANGUAGE
         
         text = text.strip()
-        lang = self._detect_language(text)
+        lang = (prepared or prepare_input(text)).language
         
         # Basics validations
         if len(text) < 3:
@@ -121,38 +254,395 @@ class AIService:
         
         return True, '', lang
 
-    def analyze_and_respond(self, user_input: str) -> str:
+    def analyze_and_respond(self, user_input: str, user_id: str = "default") -> str:
         """Analyzes user input and returns response."""
+        return self.analyze(user_input, user_id).response
+
+    def analyze(self, user_input: str, user_id: str = "default") -> AnalysisResult:
+        """Analyzes user input and returns response with how it was produced."""
+        started = perf_counter()
+        timings = {}
+        result = self._analyze(user_input, user_id, timings)
+        # Joiners of one generation share its result, so each caller gets its own copy
+        return replace(result, timings={**timings, **result.timings, 'total': perf_counter() - started})
+
+    def _analyze(self, user_input: str, user_id: str, timings: Dict[str, float]) -> AnalysisResult:
         # Validations
-        is_valid, error_key, lang = self._validate_input(user_input)
+        prepared, is_valid, error_key, lang = self._prepare(user_input, timings)
         if not is_valid:
-            return self._get_message(error_key, lang)
-        
-        user_input_stripped = user_input.strip()
+            return AnalysisResult.from_prepared(
+                prepared, self._get_message(error_key, lang), SOURCE_VALIDATION
+            )
         
         # Cash
-        cache_key = user_input_stripped.lower()
-        if cache_key in self.response_cache:
-            return self.response_cache[cache_key]
+        cache_key = self._cache_key(user_input)
+        cached = self._cache_lookup(cache_key, timings)
+        if cached is not None:
+            return AnalysisResult.from_prepared(prepared, cached, SOURCE_CACHE)
         
         # Rate limiting - graceful degradation
-        if not self._check_rate_limit():
+        if not self._rate_limit_decision(user_id, timings).allowed:
             # Return basic recommendation without AI
-            if self._has_symptoms(user_input):
-                return recommend_doctor(user_input)
-            return self._get_message('rate_limit', lang)
+            return AnalysisResult.from_prepared(
+                prepared, self._rate_limited_response(prepared), SOURCE_FALLBACK
+            )
         
         try:
-            response = self._handle_symptoms(user_input) if self._has_symptoms(user_input) else self._handle_general_chat(user_input)
-            
-            if len(self.response_cache) < self.cache_max_size:
-                self.response_cache[cache_key] = response
-            
-            return response
+            # Identical concurrent requests share one generation
+            return self.in_flight.do(cache_key, lambda: self._generate(prepared, cache_key))
         except Exception as e:
             logger.error(f"Error processing request: {e}")
-            return self._get_message('error', lang)
+            return AnalysisResult.from_prepared(prepared, self._get_message('error', lang), SOURCE_FALLBACK)
+
+    def triage(self, user_input: str, use_cache: bool = False) -> AnalysisResult:
+        """Deterministic analysis without a model call.
+
+        Returns matched doctors, urgency and a templated recommendation in
+        microseconds. With use_cache an LLM answer already cached for the
+        input is returned instead.
+        """
+        started = perf_counter()
+        timings = {}
+        result = self._triage(user_input, use_cache, timings)
+        result.timings = {**timings, 'total': perf_counter() - started}
+        return result
+
+    def _triage(self, user_input: str, use_cache: bool, timings: Dict[str, float]) -> AnalysisResult:
+        prepared, is_valid, error_key, lang = self._prepare(user_input, timings)
+        if not is_valid:
+            return AnalysisResult.from_prepared(
+                prepared, self._get_message(error_key, lang), SOURCE_VALIDATION
+            )
+        if use_cache:
+            cached = self._cache_lookup(self._cache_key(user_input), timings)
+            if cached is not None:
+                return AnalysisResult.from_prepared(prepared, cached, SOURCE_CACHE)
+        return AnalysisResult.from_prepared(prepared, self._triage_response(prepared), SOURCE_TRIAGE)
+
+    def _triage_response(self, prepared: PreparedInput) -> str:
+        """Templated recommendation for fast mode."""
+        if not prepared.has_symptoms:
+            return self._get_message('no_symptoms', prepared.language)
+        recommendation = format_recommendation(prepared.doctors)
+        if prepared.is_urgent:
+            return f"{self._get_message('urgent', prepared.language)} {recommendation}"
+        return recommendation
+
+    def schedule_prefetch(self, user_input: str, user_id: str = "default") -> asyncio.Task:
+        """Start prefetch_async in the background of the running event loop."""
+        task = asyncio.create_task(self.prefetch_async(user_input, user_id))
+        self.prefetches.add(task)
+        task.add_done_callback(self.prefetches.discard)
+        return task
+
+    async def drain_prefetches(self, timeout: float = 5.0):
+        """Wait for running prefetches, cancelling those not done within timeout."""
+        tasks = set(self.prefetches)
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def prefetch_async(self, user_input: str, user_id: str = "default"):
+        """Generate and cache the model answer for input, e.g. after a fast-mode reply.
+
+        Subject to the rate limit and admission control like any request;
+        refusals and errors are logged, not raised.
+        """
+        try:
+            await self.analyze_async(user_input, user_id)
+        except AdmissionRejected as e:
+            logger.info(f"Answer prefetch skipped: {e}")
+        except Exception as e:
+            logger.error(f"Answer prefetch failed: {e}")
+
+    async def analyze_and_respond_async(self, user_input: str, user_id: str = "default",
+                                        raise_on_rate_limit: bool = False) -> str:
+        """Async variant of analyze_and_respond that never blocks the event loop.
+
+        Raises:
+            RateLimitExceeded: If raise_on_rate_limit is set and the user is
+                over the limit; carries the degraded response and retry delay
+            AdmissionRejected: If the model queue is saturated
+        """
+        result = await self.analyze_async(user_input, user_id, raise_on_rate_limit)
+        return result.response
+
+    async def analyze_async(self, user_input: str, user_id: str = "default",
+                            raise_on_rate_limit: bool = False) -> AnalysisResult:
+        """Async variant of analyze that never blocks the event loop.
+
+        Raises:
+            RateLimitExceeded: If raise_on_rate_limit is set and the user is
+                over the limit; carries the degraded result and retry delay
+            AdmissionRejected: If the model queue is saturated
+        """
+        started = perf_counter()
+        timings = {}
+        result = await self._analyze_async(user_input, user_id, raise_on_rate_limit, timings)
+        # Joiners of one generation share its result, so each caller gets its own copy
+        return replace(result, timings={**timings, **result.timings, 'total': perf_counter() - started})
+
+    async def _analyze_async(self, user_input: str, user_id: str, raise_on_rate_limit: bool,
+                             timings: Dict[str, float]) -> AnalysisResult:
+        prepared, is_valid, error_key, lang = self._prepare(user_input, timings)
+        if not is_valid:
+            return AnalysisResult.from_prepared(
+                prepared, self._get_message(error_key, lang), SOURCE_VALIDATION
+            )
+
+        cache_key = self._cache_key(user_input)
+        cached = self._cache_lookup(cache_key, timings)
+        if cached is not None:
+            return AnalysisResult.from_prepared(prepared, cached, SOURCE_CACHE)
+
+        decision = self._rate_limit_decision(user_id, timings)
+        if not decision.allowed:
+            fallback = AnalysisResult.from_prepared(
+                prepared, self._rate_limited_response(prepared), SOURCE_FALLBACK, timings
+            )
+            if raise_on_rate_limit:
+                raise RateLimitExceeded(decision.retry_after, fallback.response, fallback)
+            return fallback
+
+        try:
+            with self.admission.admit(priority_for(prepared)):
+                return await self.in_flight.do_async(
+                    cache_key, lambda: self._generate_async(prepared, cache_key)
+                )
+        except AdmissionRejected:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing request: {e}")
+            return AnalysisResult.from_prepared(prepared, self._get_message('error', lang), SOURCE_FALLBACK)
     
+    async def analyze_batch_async(self, texts: List[str], user_id: str = "default",
+                                  concurrency: int = BATCH_CONCURRENCY,
+                                  deadline: float = BATCH_DEADLINE_SECONDS
+                                  ) -> List[Union[AnalysisResult, Exception]]:
+        """Analyzes several inputs with bounded concurrency.
+
+        Duplicates within the batch and cached answers are resolved without
+        a model call. Each remaining unique input is generated once, with at
+        most `concurrency` model calls in flight. Inputs still running when
+        the deadline expires are cancelled.
+
+        Returns:
+            List aligned with texts; each item is an analysis result or
+            the exception that prevented it
+        """
+        results = [None] * len(texts)
+        pending = {}  # cache_key -> (prepared, [(index, prepared), ...])
+        for index, text in enumerate(texts):
+            prepared, is_valid, error_key, lang = self._prepare(text)
+            if not is_valid:
+                results[index] = AnalysisResult.from_prepared(
+                    prepared, self._get_message(error_key, lang), SOURCE_VALIDATION
+                )
+                continue
+
+            cache_key = self._cache_key(text)
+            if cache_key in pending:
+                pending[cache_key][1].append((index, prepared))
+                continue
+
+            cached = self._cache_lookup(cache_key)
+            if cached is not None:
+                results[index] = AnalysisResult.from_prepared(prepared, cached, SOURCE_CACHE)
+                continue
+            pending[cache_key] = (prepared, [(index, prepared)])
+
+        if not pending:
+            return results
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(cache_key: str, prepared: PreparedInput) -> AnalysisResult:
+            async with semaphore:
+                if not self._check_rate_limit(user_id):
+                    return AnalysisResult.from_prepared(
+                        prepared, self._rate_limited_response(prepared), SOURCE_FALLBACK
+                    )
+                with self.admission.admit(priority_for(prepared)):
+                    return await self.in_flight.do_async(
+                        cache_key, lambda: self._generate_async(prepared, cache_key)
+                    )
+
+        tasks = {
+            asyncio.ensure_future(run(cache_key, prepared)): items
+            for cache_key, (prepared, items) in pending.items()
+        }
+        done, not_done = await asyncio.wait(tasks, timeout=deadline)
+        for task in not_done:
+            task.cancel()
+
+        for task, items in tasks.items():
+            if task in done:
+                outcome = task.exception() or task.result()
+            else:
+                outcome = asyncio.TimeoutError("Batch deadline exceeded")
+            for index, prepared in items:
+                if isinstance(outcome, AnalysisResult):
+                    # Duplicates share the answer but keep their own analysis
+                    results[index] = replace(
+                        AnalysisResult.from_prepared(prepared, outcome.response, outcome.source),
+                        timings=outcome.timings
+                    )
+                else:
+                    results[index] = outcome
+        return results
+
+    def _model_fallback(self, prepared: PreparedInput) -> str:
+        """Deterministic answer used when the model is not called."""
+        if prepared.has_symptoms:
+            return self._symptoms_fallback(prepared)
+        return self._get_message('no_symptoms', prepared.language)
+
+    def _circuit_open_result(self, prepared: PreparedInput) -> AnalysisResult:
+        metrics.FALLBACK_CIRCUIT_OPEN.inc()
+        return AnalysisResult.from_prepared(prepared, self._model_fallback(prepared), SOURCE_FALLBACK)
+
+    def _generate(self, prepared: PreparedInput, cache_key: str) -> AnalysisResult:
+        """Generates model response and caches it unless the model failed or it was cut short."""
+        if not self.breaker.allow():
+            return self._circuit_open_result(prepared)
+        started = perf_counter()
+        try:
+            if prepared.has_symptoms:
+                response, source, cacheable = self._handle_symptoms(prepared.text, prepared)
+            else:
+                response, source, cacheable = self._handle_general_chat(prepared.text, prepared)
+        except BaseException:
+            self.breaker.cancel()
+            raise
+        model_seconds = perf_counter() - started
+        self.breaker.record(model_seconds, failed=source != SOURCE_LLM)
+        if source == SOURCE_LLM and cacheable:
+            self._cache_store(cache_key, response)
+        return AnalysisResult.from_prepared(prepared, response, source, {'model': model_seconds})
+
+    async def _generate_async(self, prepared: PreparedInput, cache_key: str) -> AnalysisResult:
+        """Generates model response without blocking and caches it unless the model failed or it was cut short."""
+        # Open circuit answers at once instead of queueing for a failing model
+        if not self.breaker.allow():
+            return self._circuit_open_result(prepared)
+        enqueued = perf_counter()
+        try:
+            # Urgent symptoms get the next free model slot first
+            async with self.scheduler.slot(priority_for(prepared)):
+                started = perf_counter()
+                if prepared.has_symptoms:
+                    response, source, cacheable = await self._handle_symptoms_async(prepared.text, prepared)
+                else:
+                    response, source, cacheable = await self._handle_general_chat_async(prepared.text, prepared)
+                finished = perf_counter()
+        except BaseException:
+            self.breaker.cancel()
+            raise
+        self.breaker.record(finished - started, failed=source != SOURCE_LLM)
+        if source == SOURCE_LLM and cacheable:
+            self._cache_store(cache_key, response)
+        return AnalysisResult.from_prepared(
+            prepared, response, source,
+            {'queue_wait': started - enqueued, 'model': finished - started}
+        )
+
+    async def analyze_and_stream(self, user_input: str, user_id: str = "default") -> AsyncIterator[str]:
+        """Analyzes user input and yields response chunks as the model produces them."""
+        chunks, _ = self.open_stream(user_input, user_id)
+        async for chunk in chunks:
+            yield chunk
+
+    def open_stream(self, user_input: str, user_id: str = "default",
+                    raise_on_rate_limit: bool = False) -> Tuple[AsyncIterator[str], str]:
+        """Validate input, look up the cache, count the rate limit and check
+        admission now, before anything is sent, and return the iterator of
+        response chunks with the detected language of the input.
+
+        Raises:
+            RateLimitExceeded: If raise_on_rate_limit is set and the user is
+                over the limit; carries the degraded result and retry delay
+            AdmissionRejected: If the model queue is saturated for the
+                priority class of the input
+        """
+        prepared, is_valid, error_key, lang = self._prepare(user_input)
+        if not is_valid:
+            return _single_chunk(self._get_message(error_key, lang)), lang
+
+        cache_key = self._cache_key(user_input)
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            return _single_chunk(cached), lang
+
+        decision = self._rate_limit_decision(user_id)
+        if not decision.allowed:
+            fallback = self._rate_limited_response(prepared)
+            if raise_on_rate_limit:
+                raise RateLimitExceeded(
+                    decision.retry_after, fallback,
+                    AnalysisResult.from_prepared(prepared, fallback, SOURCE_FALLBACK)
+                )
+            return _single_chunk(fallback), lang
+
+        self.admission.check(priority_for(prepared))
+        return self._stream_answer(user_input, prepared, cache_key), lang
+
+    async def _stream_answer(self, user_input: str, prepared: PreparedInput,
+                             cache_key: str) -> AsyncIterator[str]:
+        """Yields the model answer and caches it once complete."""
+        chunks = []
+        with self.admission.admit(priority_for(prepared)):
+            async for chunk in self._stream_generation(user_input, prepared, chunks):
+                yield chunk
+
+        if chunks:
+            self._cache_store(cache_key, ''.join(chunks))
+
+    async def _stream_generation(self, user_input: str, prepared: PreparedInput,
+                                 chunks: list) -> AsyncIterator[str]:
+        """Yields model chunks, or a fallback if the model fails before the first one.
+
+        Raises:
+            StreamInterrupted: If the model fails after the first chunk
+        """
+        if not self.breaker.allow():
+            metrics.FALLBACK_CIRCUIT_OPEN.inc()
+            yield self._model_fallback(prepared)
+            return
+        started = None
+        try:
+            async with self.scheduler.slot(priority_for(prepared)):
+                started = perf_counter()
+                model, messages, cacheable = self._budgeted_request(user_input, prepared)
+                try:
+                    async for chunk in model.astream(messages):
+                        if chunk.content:
+                            chunks.append(chunk.content)
+                            yield chunk.content
+                finally:
+                    latency = metrics.MODEL_CALL_SYMPTOMS_SECONDS if prepared.has_symptoms \
+                        else metrics.MODEL_CALL_GENERAL_SECONDS
+                    latency.observe(perf_counter() - started)
+            self.breaker.record(perf_counter() - started, failed=False)
+            if not cacheable:
+                # Answer shortened by load is not cached
+                chunks.clear()
+        except Exception as e:
+            logger.error(f"Error streaming response: {e}")
+            metrics.FALLBACK_STREAM.inc()
+            self.breaker.record(perf_counter() - started if started else 0.0, failed=True)
+            if chunks:
+                # Partial answer is not cached, and the caller must learn it was cut off
+                chunks.clear()
+                raise StreamInterrupted(f"Model failed mid-stream: {e}") from e
+            yield self._model_fallback(prepared)
+        except BaseException:
+            # Client went away mid-stream: no verdict on the model
+            self.breaker.cancel()
+            raise
+
     def _has_symptoms(self, user_input: str) -> bool:
         """Checks for symptoms in user input.
 
@@ -162,40 +652,148 @@ class AIService:
         Returns:
             True if symptoms found, False otherwise
         """
-        if not isinstance(user_input, str) or not user_input.strip():
-            return False
+        return prepare_input(user_input).has_symptoms
 
-        user_input_lower = user_input.lower().strip()
-        return any(keyword in user_input_lower for keyword in SYMPTOM_KEYWORDS)
+    def _symptoms_fallback(self, prepared: PreparedInput) -> str:
+        """Recommendation without AI when the model call fails."""
+        return f"На основе ваших симптомов рекомендую: {format_recommendation(prepared.doctors)}"
     
-    def _handle_symptoms(self, user_input: str) -> str:
-        """Handles input with symptoms."""
+    def _budget_load(self) -> float:
+        """Current load factor for generation budgets."""
+        return self.budget_policy.load(
+            self.scheduler.queue_depth(), self.admission.estimated_wait(), self.scheduler.service_time
+        )
+
+    def budget_status(self) -> dict:
+        """Current load factor and the num_predict each intent would get."""
+        return self.budget_policy.snapshot(self._budget_load())
+
+    def _generation_budget(self, prepared: PreparedInput) -> GenerationBudget:
+        """Generation budget for the request at the current load."""
+        budget = self.budget_policy.budget(prepared.has_symptoms, self._budget_load())
+        (metrics.GENERATION_BUDGET_SYMPTOMS if prepared.has_symptoms
+         else metrics.GENERATION_BUDGET_GENERAL).observe(budget.num_predict)
+        return budget
+
+    def _budgeted_request(self, user_input: str,
+                          prepared: PreparedInput) -> Tuple[ModelClient, list, bool]:
+        """Model client limited to the generation budget and a prompt that fits the context.
+
+        Returns:
+            (model, messages, cacheable); answers are cacheable only with the
+            full budget of their intent. Trimming at full budget depends on the
+            input alone, so it does not prevent caching
+        """
+        budget = self._generation_budget(prepared)
+        if prepared.has_symptoms:
+            def build(text):
+                return self._build_symptom_messages(text, prepared)
+        else:
+            build = self._build_general_messages
+
+        messages = build(user_input)
+        overflow = self.budget_policy.overflow(messages, budget.num_predict)
+        if overflow > 0:
+            # Shorter input rather than Ollama silently dropping the start of the prompt
+            metrics.PROMPTS_TRIMMED.inc()
+            messages = build(trim_to_tokens(user_input, estimate_tokens(user_input) - overflow))
+        return self.model.with_options(num_predict=budget.num_predict), messages, budget.full
+
+    def _build_symptom_messages(self, user_input: str, prepared: PreparedInput = None) -> list:
+        """Builds prompt messages for input with symptoms."""
+        prepared = prepared or prepare_input(user_input)
+        doctor_recommendation = format_recommendation(prepared.doctors)
+        urgency_note = "⚠️ Это может быть срочно!" if prepared.is_urgent else ""
+
+        return [
+            Message("system", SYSTEM_PROMPT),
+            Message("user", f"Пациент: {user_input}\nРекомендация: {doctor_recommendation}\n"
+                            f"{urgency_note}\nДай дружелюбный ответ.")
+        ]
+
+    def _build_general_messages(self, user_input: str) -> list:
+        """Builds prompt messages for general conversation."""
+        return [
+            Message("system", GENERAL_ASSISTANT_PROMPT),
+            Message("user", user_input)
+        ]
+
+    def _handle_symptoms(self, user_input: str, prepared: PreparedInput = None) -> Tuple[str, str, bool]:
+        """Handles input with symptoms.
+
+        Returns:
+            (response, source, cacheable)
+        """
+        prepared = prepared or prepare_input(user_input)
+        model, messages, cacheable = self._budgeted_request(user_input, prepared)
+        started = perf_counter()
         try:
-            doctor_recommendation = recommend_doctor(user_input)
-            urgent_indicators = ['острая', 'сильная', 'тяжелая', 'кровь', 'потеря сознания']
-            is_urgent = any(indicator in user_input.lower() for indicator in urgent_indicators)
-            urgency_note = "⚠️ Это может быть срочно!" if is_urgent else ""
-
-            messages = [
-                SystemMessage(content=SYSTEM_PROMPT),
-                HumanMessage(content=f"Пациент: {user_input}\nРекомендация: {doctor_recommendation}\n{urgency_note}\nДай дружелюбный ответ.")
-            ]
-
-            response = self.model.invoke(messages)
-            return response.content
+            response = model.invoke(messages)
+            return response.content, SOURCE_LLM, cacheable
         except Exception as e:
             logger.error(f"Error handling symptoms: {e}")
-            return f"На основе ваших симптомов рекомендую: {recommend_doctor(user_input)}"
+            metrics.FALLBACK_SYMPTOMS.inc()
+            return self._symptoms_fallback(prepared), SOURCE_FALLBACK, False
+        finally:
+            metrics.MODEL_CALL_SYMPTOMS_SECONDS.observe(perf_counter() - started)
+
+    async def _handle_symptoms_async(self, user_input: str,
+                                     prepared: PreparedInput = None) -> Tuple[str, str, bool]:
+        """Handles input with symptoms without blocking the event loop.
+
+        Returns:
+            (response, source, cacheable)
+        """
+        prepared = prepared or prepare_input(user_input)
+        model, messages, cacheable = self._budgeted_request(user_input, prepared)
+        started = perf_counter()
+        try:
+            response = await model.ainvoke(messages)
+            return response.content, SOURCE_LLM, cacheable
+        except Exception as e:
+            logger.error(f"Error handling symptoms: {e}")
+            metrics.FALLBACK_SYMPTOMS.inc()
+            return self._symptoms_fallback(prepared), SOURCE_FALLBACK, False
+        finally:
+            metrics.MODEL_CALL_SYMPTOMS_SECONDS.observe(perf_counter() - started)
     
-    def _handle_general_chat(self, user_input: str) -> str:
-        """Handles general conversation."""
+    def _handle_general_chat(self, user_input: str, prepared: PreparedInput = None) -> Tuple[str, str, bool]:
+        """Handles general conversation.
+
+        Returns:
+            (response, source, cacheable)
+        """
+        prepared = prepared or prepare_input(user_input)
+        model, messages, cacheable = self._budgeted_request(user_input, prepared)
+        started = perf_counter()
+        try:
+            response = model.invoke(messages)
+            return response.content, SOURCE_LLM, cacheable
+        except Exception as e:
+            logger.error(f"Error in general chat: {e}")
+            metrics.FALLBACK_GENERAL_CHAT.inc()
+            language = prepared.language
+            return self._get_message('no_symptoms', language), SOURCE_FALLBACK, False
+        finally:
+            metrics.MODEL_CALL_GENERAL_SECONDS.observe(perf_counter() - started)
+
+    async def _handle_general_chat_async(self, user_input: str,
+                                         prepared: PreparedInput = None) -> Tuple[str, str, bool]:
+        """Handles general conversation without blocking the event loop.
+
+        Returns:
+            (response, source, cacheable)
+        """
+        prepared = prepared or prepare_input(user_input)
+        model, messages, cacheable = self._budgeted_request(user_input, prepared)
+        started = perf_counter()
         try:
-            messages = [
-                SystemMessage(content=GENERAL_ASSISTANT_PROMPT),
-                HumanMessage(content=user_input)
-            ]
-            response = self.model.invoke(messages)
-            return response.content
+            response = await model.ainvoke(messages)
+            return response.content, SOURCE_LLM, cacheable
         except Exception as e:
             logger.error(f"Error in general chat: {e}")
-            return self._get_message('no_symptoms', self._detect_language(user_input))
+            metrics.FALLBACK_GENERAL_CHAT.inc()
+            language = prepared.language
+            return self._get_message('no_symptoms', language), SOURCE_FALLBACK, False
+        finally:
+            metrics.MODEL_CALL_GENERAL_SECONDS.observe(perf_counter() - started)
@@ -0,0 +1,45 @@
+"""Structured result of analysing one user input."""
+
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+from src.services.matcher import PreparedInput
+
+# Where the response came from
+SOURCE_CACHE = "cache"
+SOURCE_LLM = "llm"
+SOURCE_FALLBACK = "fallback"
+SOURCE_VALIDATION = "validation"
+SOURCE_TRIAGE = "triage"  # Deterministic answer of fast mode, no model call
+
+
+@dataclass
+class AnalysisResult:
+    """Response to a user input with what was learned while producing it.
+
+    `timings` maps stage names (validation, symptom_detection, cache_lookup,
+    rate_limit, queue_wait, model, total) to seconds; only stages that ran
+    are present.
+    """
+    response: str
+    language: str
+    source: str
+    doctors: Tuple[str, ...] = ()
+    is_urgent: bool = False
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_prepared(cls, prepared: PreparedInput, response: str, source: str,
+                      timings: Dict[str, float] = None) -> "AnalysisResult":
+        """Build result for analysed input."""
+        return cls(
+            response=response,
+            language=prepared.language,
+            source=source,
+            doctors=prepared.doctors,
+            is_urgent=prepared.is_urgent,
+            timings=dict(timings or {})
+        )
+
+    def __str__(self) -> str:
+        return self.response
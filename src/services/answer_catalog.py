@@ -0,0 +1,252 @@
+"""Precomputed answer catalog.
+
+A catalog is a read-only file of answers to the most frequent questions,
+keyed like the response cache. Layout:
+
+    header    magic "MAICAT", format version (u16), entry count (u32), metadata length (u32)
+    metadata  JSON: catalog version, model, build time, cache key settings
+    index     entry count x (key hash (u64), record offset (u32)), sorted by hash
+    records   key length (u32), value length (u32), key, value (UTF-8)
+
+The file is memory-mapped, so lookups read only the pages they touch and
+worker processes share one copy. New catalogs are written to a temporary
+file and renamed over the old one.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import suppress
+from typing import Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MAICAT"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<6sHII")  # magic, format version, entry count, metadata length
+_INDEX_ENTRY = struct.Struct("<QI")  # key hash, record offset
+_RECORD = struct.Struct("<II")  # key length, value length
+
+
+class CatalogError(Exception):
+    """Raised when a catalog file is malformed or does not fit the service."""
+
+
+def _key_hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def write_catalog(path: str, entries: Iterable[Tuple[str, str]], meta: Optional[dict] = None) -> int:
+    """Write catalog file atomically.
+
+    Args:
+        path: Catalog file path
+        entries: (cache key, answer) pairs; the first answer for a key wins
+        meta: Metadata stored in the header
+
+    Returns:
+        Number of entries written
+    """
+    answers = {}
+    for key, value in entries:
+        answers.setdefault(key.encode(), value.encode())
+    items = sorted((_key_hash(key), key, value) for key, value in answers.items())
+    meta_bytes = json.dumps(meta or {}, ensure_ascii=False).encode()
+
+    records_start = _HEADER.size + len(meta_bytes) + _INDEX_ENTRY.size * len(items)
+    index, records = bytearray(), bytearray()
+    for key_hash, key, value in items:
+        index += _INDEX_ENTRY.pack(key_hash, records_start + len(records))
+        records += _RECORD.pack(len(key), len(value)) + key + value
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=directory, prefix=".catalog-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(items), len(meta_bytes)))
+            f.write(meta_bytes)
+            f.write(index)
+            f.write(records)
+            f.flush()
+            os.fsync(f.fileno())
+        # Readers see either the old catalog or the new one, never a partial file
+        os.replace(temporary, path)
+    except BaseException:
+        with suppress(OSError):
+            os.unlink(temporary)
+        raise
+    return len(items)
+
+
+class AnswerCatalog:
+    """Memory-mapped catalog file."""
+
+    def __init__(self, path: str):
+        """Open catalog.
+
+        Raises:
+            CatalogError: If the file is not a catalog of a supported format
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise CatalogError(f"{path} is too short to be a catalog")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, meta_length = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise CatalogError(f"{path} is not an answer catalog")
+        if version != FORMAT_VERSION:
+            raise CatalogError(f"{path} has unsupported format version {version}")
+        self._count = count
+        self._index_start = _HEADER.size + meta_length
+        try:
+            self.meta = json.loads(self._map[_HEADER.size:self._index_start])
+        except ValueError as e:
+            raise CatalogError(f"{path} has malformed metadata: {e}")
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.meta.get("version")
+
+    def _index_entry(self, position: int) -> Tuple[int, int]:
+        return _INDEX_ENTRY.unpack_from(self._map, self._index_start + position * _INDEX_ENTRY.size)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return answer for key, None if the catalog has none."""
+        encoded = key.encode()
+        target = _key_hash(encoded)
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._index_entry(middle)[0] < target:
+                low = middle + 1
+            else:
+                high = middle
+        # Hash collisions are adjacent in the index
+        while low < self._count:
+            key_hash, offset = self._index_entry(low)
+            if key_hash != target:
+                break
+            key_length, value_length = _RECORD.unpack_from(self._map, offset)
+            start = offset + _RECORD.size
+            if self._map[start:start + key_length] == encoded:
+                return self._map[start + key_length:start + key_length + value_length].decode()
+            low += 1
+        return None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+
+class CatalogTier:
+    """Read-only cache tier backed by the catalog published at a path.
+
+    Every `check_interval` seconds a lookup checks whether a new file was
+    published at the path and, if so, opens it and swaps it in. Lookups in
+    progress keep using the file they started with. A missing file means
+    no catalog; a broken one, or one built with different cache key
+    settings, is logged and skipped while the previous catalog stays in
+    use.
+    """
+
+    def __init__(self, path: str, check_interval: float = 30.0, key_settings: Optional[dict] = None):
+        """Initialize tier and open the catalog if it exists.
+
+        Args:
+            path: Catalog file path
+            check_interval: Seconds between checks for a new file, 0 checks only on reload()
+            key_settings: Metadata values the catalog must match, e.g. cache key normalization
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self.key_settings = dict(key_settings or {})
+        self.catalog: Optional[AnswerCatalog] = None
+        self.lookups = 0
+        self.hits = 0
+        self.last_error: Optional[str] = None
+        self._signature = None
+        self._checked = time.monotonic()
+        self._lock = threading.Lock()
+        self.reload()
+
+    def _open(self) -> AnswerCatalog:
+        catalog = AnswerCatalog(self.path)
+        for name, expected in self.key_settings.items():
+            if catalog.meta.get(name) != expected:
+                raise CatalogError(
+                    f"{self.path} was built with {name}={catalog.meta.get(name)!r}, service uses {expected!r}"
+                )
+        return catalog
+
+    def reload(self) -> bool:
+        """Open the catalog file if a new one was published.
+
+        Returns:
+            True if a new catalog was swapped in
+        """
+        if not self._lock.acquire(blocking=False):
+            return False  # Another thread is already reloading
+        try:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                if self.catalog is not None:
+                    logger.warning(f"Answer catalog {self.path} was removed")
+                self.catalog, self._signature = None, None
+                return False
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if signature == self._signature:
+                return False
+            self._signature = signature
+            try:
+                catalog = self._open()
+            except (OSError, CatalogError) as e:
+                self.last_error = str(e)
+                logger.error(f"Answer catalog not loaded: {e}")
+                return False
+            self.catalog = catalog
+            self.last_error = None
+            logger.info(f"Answer catalog {catalog.version} loaded with {len(catalog)} answers")
+            return True
+        finally:
+            self._lock.release()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return catalog answer for key."""
+        if self.check_interval > 0:
+            now = time.monotonic()
+            if now - self._checked >= self.check_interval:
+                self._checked = now
+                self.reload()
+        catalog = self.catalog
+        if catalog is None:
+            return None
+        self.lookups += 1
+        value = catalog.get(key)
+        if value is not None:
+            self.hits += 1
+        return value
+
+    def status(self) -> dict:
+        """Loaded catalog and hit statistics for health views."""
+        catalog = self.catalog
+        return {
+            "path": self.path,
+            "loaded": catalog is not None,
+            "version": catalog.version if catalog is not None else None,
+            "entries": len(catalog) if catalog is not None else 0,
+            "built": catalog.meta.get("created") if catalog is not None else None,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "last_error": self.last_error
+        }
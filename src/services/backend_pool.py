@@ -0,0 +1,256 @@
+"""Pool of model backends with least-outstanding routing and hedged requests."""
+
+import asyncio
+import copy
+import logging
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Iterable, List, Optional, Sequence
+
+from src.services.model_client import Message, ModelClient, ModelResponse
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class Backend:
+    """Routing state of one backend, shared by option copies of the pool."""
+
+    def __init__(self, name: str, window: int = 100):
+        self.name = name
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.failures = 0  # Consecutive failed calls
+        self.ejections = 0  # Consecutive ejections, each one twice as long
+        self.ejected_until = 0.0  # time.monotonic()
+        self.latencies = deque(maxlen=window)
+
+    def available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def status(self, now: float) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "name": self.name,
+            "available": self.available(now),
+            "ejected_for": round(max(0.0, self.ejected_until - now), 3),
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "consecutive_failures": self.failures,
+            "latency_p50": round(_percentile(latencies, 0.5), 3),
+            "latency_p95": round(_percentile(latencies, 0.95), 3)
+        }
+
+
+class BackendPool(ModelClient):
+    """Spreads model calls over several backends serving the same model.
+
+    Each call goes to the available backend with the fewest outstanding
+    requests, ties broken round-robin. A backend that fails
+    `eject_failures` calls in a row is ejected for `eject_seconds`; when it
+    comes back, one more failure ejects it again for twice as long (up to
+    `max_eject_seconds`), and one success restores it fully. If every
+    backend is ejected, the one due back first is tried anyway.
+
+    A failed complete call is retried once on another backend. With
+    `hedge` enabled, an async call still running after the pool's recent
+    `hedge_quantile` latency is duplicated on a second backend, the first
+    answer wins and the other call is cancelled. Streams are routed but
+    neither retried nor hedged.
+    """
+
+    def __init__(self, clients: Sequence[ModelClient], names: Optional[Sequence[str]] = None,
+                 eject_failures: int = 3, eject_seconds: float = 30.0, max_eject_seconds: float = 300.0,
+                 hedge: bool = False, hedge_quantile: float = 0.95, hedge_min_samples: int = 20,
+                 hedge_min_delay: float = 0.05, window: int = 200):
+        """Initialize pool.
+
+        Args:
+            clients: One client per backend
+            names: Backend names for status views, default is each client's base_url
+            eject_failures: Consecutive failures that eject a backend
+            eject_seconds: First ejection time
+            max_eject_seconds: Longest ejection time
+            hedge: Duplicate slow async calls on a second backend
+            hedge_quantile: Latency quantile after which a call is hedged
+            hedge_min_samples: Successful calls needed before hedging starts
+            hedge_min_delay: Shortest hedging delay in seconds
+            window: Recent latencies kept for the hedging delay
+        """
+        if not clients:
+            raise ValueError("BackendPool needs at least one backend")
+        if names is None:
+            names = [getattr(client, "base_url", f"backend-{i}") for i, client in enumerate(clients)]
+        self.clients = list(clients)
+        self.backends = [Backend(name) for name in names]
+        self.eject_failures = eject_failures
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.counters = {"hedged": 0, "retried": 0}  # Shared with option copies
+        self._latencies = deque(maxlen=window)
+        self._next = [0]  # Round-robin start, shared with option copies
+        self._lock = threading.Lock()
+
+    def _acquire(self, exclude: Iterable[int] = ()) -> Optional[int]:
+        """Pick a backend for a call and count it as outstanding."""
+        now = time.monotonic()
+        with self._lock:
+            count = len(self.backends)
+            candidates = [i for i in range(count) if i not in exclude]
+            if not candidates:
+                return None
+            available = [i for i in candidates if self.backends[i].available(now)]
+            if available:
+                start = self._next[0]
+                self._next[0] = (start + 1) % count
+                index = min(available, key=lambda i: (self.backends[i].outstanding, (i - start) % count))
+            else:
+                index = min(candidates, key=lambda i: self.backends[i].ejected_until)
+            backend = self.backends[index]
+            backend.outstanding += 1
+            backend.requests += 1
+            return index
+
+    def _release(self, index: int, duration: float, failed: bool = False, cancelled: bool = False):
+        """Record the outcome of a call on a backend."""
+        now = time.monotonic()
+        with self._lock:
+            backend = self.backends[index]
+            backend.outstanding -= 1
+            if cancelled:
+                return
+            if not failed:
+                backend.failures = 0
+                backend.ejections = 0
+                backend.ejected_until = 0.0
+                backend.latencies.append(duration)
+                self._latencies.append(duration)
+                return
+            backend.errors += 1
+            backend.failures += 1
+            if backend.failures >= self.eject_failures and backend.available(now):
+                seconds = min(self.max_eject_seconds, self.eject_seconds * 2 ** backend.ejections)
+                backend.ejected_until = now + seconds
+                backend.ejections += 1
+                logger.warning(f"Model backend {backend.name} ejected for {seconds:.0f}s "
+                               f"after {backend.failures} failed calls")
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which an async call is duplicated, None if hedging is off."""
+        if not self.hedge or len(self.backends) < 2 or len(self._latencies) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, _percentile(sorted(self._latencies), self.hedge_quantile))
+
+    def _invoke_on(self, index: int, messages: List[Message]) -> ModelResponse:
+        started = time.perf_counter()
+        try:
+            response = self.clients[index].invoke(messages)
+        except Exception:
+            self._release(index, time.perf_counter() - started, failed=True)
+            raise
+        self._release(index, time.perf_counter() - started)
+        return response
+
+    async def _ainvoke_on(self, index: int, messages: List[Message]) -> ModelResponse:
+        started = time.perf_counter()
+        try:
+            response = await self.clients[index].ainvoke(messages)
+        except asyncio.CancelledError:
+            self._release(index, 0.0, cancelled=True)
+            raise
+        except Exception:
+            self._release(index, time.perf_counter() - started, failed=True)
+            raise
+        self._release(index, time.perf_counter() - started)
+        return response
+
+    def invoke(self, messages: Iterable[Message]) -> ModelResponse:
+        messages = list(messages)
+        first = self._acquire()
+        try:
+            return self._invoke_on(first, messages)
+        except Exception:
+            second = self._acquire(exclude={first})
+            if second is None:
+                raise
+            self.counters["retried"] += 1
+            return self._invoke_on(second, messages)
+
+    async def ainvoke(self, messages: Iterable[Message]) -> ModelResponse:
+        messages = list(messages)
+        first = self._acquire()
+        delay = self.hedge_delay()
+        tasks = {asyncio.ensure_future(self._ainvoke_on(first, messages))}
+        can_add = True  # At most one hedge or retry per call
+        error = None
+        try:
+            while tasks:
+                timeout = delay if can_add else None
+                done, tasks = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                # Hedge a slow call, or retry a failed one elsewhere
+                if can_add and (not done or not tasks):
+                    can_add = False
+                    second = self._acquire(exclude={first})
+                    if second is not None:
+                        self.counters["retried" if done else "hedged"] += 1
+                        tasks.add(asyncio.ensure_future(self._ainvoke_on(second, messages)))
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def astream(self, messages: Iterable[Message]) -> AsyncIterator[ModelResponse]:
+        index = self._acquire()
+        started = time.perf_counter()
+        try:
+            async for chunk in self.clients[index].astream(messages):
+                yield chunk
+        except Exception:
+            self._release(index, time.perf_counter() - started, failed=True)
+            raise
+        except BaseException:
+            self._release(index, 0.0, cancelled=True)
+            raise
+        self._release(index, time.perf_counter() - started)
+
+    def with_options(self, **options) -> "BackendPool":
+        # Routing state is shared with the copy
+        clone = copy.copy(self)
+        clone.clients = [client.with_options(**options) for client in self.clients]
+        return clone
+
+    def close(self):
+        for client in self.clients:
+            client.close()
+
+    async def aclose(self):
+        for client in self.clients:
+            await client.aclose()
+
+    def status(self) -> dict:
+        """Per-backend routing state and pool counters."""
+        now = time.monotonic()
+        with self._lock:
+            backends = [backend.status(now) for backend in self.backends]
+        delay = self.hedge_delay()
+        return {
+            "backends": backends,
+            "hedge_delay": round(delay, 3) if delay is not None else None,
+            **self.counters
+        }
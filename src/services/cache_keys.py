@@ -0,0 +1,148 @@
+"""Cache key normalization and near-duplicate lookup."""
+
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+# Mixing constants for shingle hashes
+_PRIME = (1 << 61) - 1
+_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+def normalize_cache_key(text: str, sort_tokens: bool = False) -> str:
+    """Normalize text so trivial rephrasings share one cache key.
+
+    Lowercases, folds 'ё' into 'е', drops punctuation, collapses
+    whitespace and removes repeated words.
+
+    Args:
+        text: User input
+        sort_tokens: Also sort words so word order does not matter
+
+    Returns:
+        Normalized key
+    """
+    tokens = _NON_WORD.sub(" ", text.lower().replace("ё", "е")).split()
+    unique_tokens = list(dict.fromkeys(tokens))
+    if sort_tokens:
+        unique_tokens.sort()
+    return " ".join(unique_tokens)
+
+
+def _shingles(text: str, size: int) -> frozenset:
+    """Character n-grams of text padded with spaces."""
+    padded = f" {text} "
+    if len(padded) <= size:
+        return frozenset([padded])
+    return frozenset(padded[i:i + size] for i in range(len(padded) - size + 1))
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index over character n-grams of cache keys.
+
+    Candidates sharing at least one LSH band are verified with exact
+    Jaccard similarity, so the threshold is honoured precisely while the
+    lookup stays sub-linear in the number of indexed keys.
+    """
+
+    def __init__(self, threshold: float = 0.8, shingle_size: int = 3,
+                 bands: int = 16, rows: int = 4, max_entries: int = 10000):
+        """Initialize index.
+
+        Args:
+            threshold: Minimum Jaccard similarity to report a match
+            shingle_size: Length of character n-grams
+            bands: Number of LSH bands
+            rows: MinHash values per band
+            max_entries: Oldest keys are dropped beyond this size
+        """
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = rows
+        self.max_entries = max_entries
+        self._keys = OrderedDict()  # key -> (shingles, band hashes)
+        self._buckets = {}  # (band, band hash) -> set of keys
+        self._lock = threading.Lock()
+
+    def _signature_bands(self, shingles: frozenset) -> tuple:
+        """Compute LSH band hashes for a set of shingles.
+
+        Uses one-permutation hashing: each shingle hash lands in one of the
+        signature bins and each bin keeps its minimum, so the cost is linear
+        in the number of shingles. Empty bins borrow the next filled bin.
+        """
+        num_bins = self.bands * self.rows
+        signature = [None] * num_bins
+        for shingle in shingles:
+            value = zlib.crc32(shingle.encode()) * _MULTIPLIER % _PRIME
+            bin_index = value % num_bins
+            if signature[bin_index] is None or value < signature[bin_index]:
+                signature[bin_index] = value
+
+        for i in range(num_bins):
+            if signature[i] is None:
+                for offset in range(1, num_bins):
+                    borrowed = signature[(i + offset) % num_bins]
+                    if borrowed is not None:
+                        signature[i] = borrowed + offset
+                        break
+
+        return tuple(
+            hash(tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        )
+
+    def add(self, key: str):
+        """Index key."""
+        shingles = _shingles(key, self.shingle_size)
+        band_hashes = self._signature_bands(shingles)
+        with self._lock:
+            if key in self._keys:
+                self._keys.move_to_end(key)
+                return
+            self._keys[key] = (shingles, band_hashes)
+            for band, band_hash in enumerate(band_hashes):
+                self._buckets.setdefault((band, band_hash), set()).add(key)
+            while len(self._keys) > self.max_entries:
+                self._remove_locked(next(iter(self._keys)))
+
+    def remove(self, key: str):
+        """Drop key from index."""
+        with self._lock:
+            self._remove_locked(key)
+
+    def _remove_locked(self, key: str):
+        entry = self._keys.pop(key, None)
+        if entry is None:
+            return
+        for band, band_hash in enumerate(entry[1]):
+            bucket = self._buckets.get((band, band_hash))
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[(band, band_hash)]
+
+    def find(self, key: str) -> Optional[str]:
+        """Return most similar indexed key above threshold, or None."""
+        shingles = _shingles(key, self.shingle_size)
+        band_hashes = self._signature_bands(shingles)
+        best_key, best_score = None, self.threshold
+        with self._lock:
+            candidates = set()
+            for band, band_hash in enumerate(band_hashes):
+                candidates.update(self._buckets.get((band, band_hash), ()))
+
+            for candidate in candidates:
+                other = self._keys[candidate][0]
+                score = len(shingles & other) / len(shingles | other)
+                if score >= best_score:
+                    best_key, best_score = candidate, score
+        return best_key
+
+    def __len__(self) -> int:
+        return len(self._keys)
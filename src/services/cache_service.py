@@ -0,0 +1,332 @@
+"""Response cache for AI answers."""
+
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from src.config.settings import (
+    CACHE_BACKEND, CACHE_MAX_BYTES, CACHE_TTL_SECONDS,
+    CACHE_SQLITE_PATH, CACHE_SQLITE_MAX_BYTES
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with optional TTL and a memory budget in bytes."""
+
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024, ttl: float = 0):
+        """Initialize cache.
+
+        Args:
+            max_bytes: Upper bound for the estimated size of all entries
+            ttl: Entry lifetime in seconds, 0 disables expiry
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _entry_size(key: str, value: str) -> int:
+        """Estimate memory used by one entry."""
+        return sys.getsizeof(key) + sys.getsizeof(value)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached value and mark it as recently used, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, size, expires_at = entry
+            if expires_at and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.current_bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str) -> bool:
+        """Store value, evicting least recently used entries to fit the budget.
+
+        Returns:
+            False if the entry alone exceeds the budget and was not stored
+        """
+        size = self._entry_size(key, value)
+        if size > self.max_bytes:
+            return False
+
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else 0
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+
+            while self._entries and self.current_bytes + size > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+            self._entries[key] = (value, size, expires_at)
+            self.current_bytes += size
+        return True
+
+    def clear(self):
+        """Remove all entries and reset statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> dict:
+        """Return cache statistics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+
+class SQLiteCache:
+    """Persistent cache in a SQLite database shared by all worker processes.
+
+    The database runs in WAL mode so readers in one process never block
+    writers in another. When the stored payload exceeds the byte budget the
+    oldest entries are pruned. Lookups and writes run on the event loop, so
+    they wait at most `busy_timeout` for another worker's lock and count as
+    a miss or a skipped write otherwise.
+    """
+
+    _PRUNE_EVERY = 64
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, ttl: float = 0,
+                 busy_timeout: float = 0.02):
+        """Initialize cache.
+
+        Args:
+            path: Database file, created if missing
+            max_bytes: Upper bound for the stored keys and values
+            ttl: Entry lifetime in seconds, 0 disables expiry
+            busy_timeout: Seconds a lookup or write waits for the database lock
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return connection for current process, reopening after fork."""
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created_at)")
+            # Setup may wait for other workers, requests must not stall the event loop
+            conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached value or None."""
+        with self._lock:
+            try:
+                row = self._connection().execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.error(f"Persistent cache read failed: {e}")
+                row = None
+
+            if row is None or (row[1] and row[1] <= time.time()):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> bool:
+        """Store value.
+
+        Returns:
+            False if the entry was not stored
+        """
+        size = len(key.encode()) + len(value.encode())
+        if size > self.max_bytes:
+            return False
+
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl > 0 else 0
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, size, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, value, size, now, expires_at)
+                )
+                self._writes += 1
+                if self._writes % self._PRUNE_EVERY == 0:
+                    self._prune(conn, now)
+            except sqlite3.Error as e:
+                logger.error(f"Persistent cache write failed: {e}")
+                return False
+        return True
+
+    def _prune(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries and the oldest ones above the byte budget."""
+        conn.execute("DELETE FROM responses WHERE expires_at > 0 AND expires_at <= ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        freed = 0
+        keys = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY created_at"):
+            keys.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+        self.evictions += len(keys)
+
+    def clear(self):
+        """Remove all entries and reset statistics."""
+        with self._lock:
+            self._connection().execute("DELETE FROM responses")
+            self.hits = self.misses = self.evictions = 0
+
+    def close(self):
+        """Close database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict:
+        """Return cache statistics."""
+        with self._lock:
+            entries, total = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return self._connection().execute(
+                "SELECT 1 FROM responses WHERE key = ?", (key,)
+            ).fetchone() is not None
+
+
+class TieredCache:
+    """In-process cache in front of a shared persistent cache."""
+
+    def __init__(self, memory: ResponseCache, persistent: SQLiteCache):
+        self.memory = memory
+        self.persistent = persistent
+
+    def get(self, key: str) -> Optional[str]:
+        """Return value from the fastest tier that has it."""
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        value = self.persistent.get(key)
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: str) -> bool:
+        """Store value in both tiers."""
+        stored = self.persistent.set(key, value)
+        return self.memory.set(key, value) or stored
+
+    def clear(self):
+        """Remove all entries from both tiers."""
+        self.memory.clear()
+        self.persistent.clear()
+
+    def stats(self) -> dict:
+        """Return statistics per tier."""
+        return {
+            "memory": self.memory.stats(),
+            "persistent": self.persistent.stats()
+        }
+
+    def __len__(self) -> int:
+        return len(self.persistent)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.memory or key in self.persistent
+
+
+def create_response_cache():
+    """Create response cache for the backend selected in settings."""
+    memory = ResponseCache(max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL_SECONDS)
+    if CACHE_BACKEND == "sqlite":
+        try:
+            persistent = SQLiteCache(CACHE_SQLITE_PATH, max_bytes=CACHE_SQLITE_MAX_BYTES, ttl=CACHE_TTL_SECONDS)
+            return TieredCache(memory, persistent)
+        except sqlite3.Error as e:
+            logger.error(f"Persistent cache unavailable, using memory only: {e}")
+    return memory
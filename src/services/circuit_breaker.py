@@ -0,0 +1,138 @@
+"""Circuit breaker for model calls."""
+
+import threading
+import time
+from collections import deque
+
+from src.utils import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Stops calling the model while it keeps failing or answering too slowly.
+
+    Outcomes of the last `window` calls are kept. Once at least `min_calls`
+    are recorded, the circuit opens when the share of failed calls reaches
+    `failure_rate` or the share of calls slower than `slow_call_seconds`
+    reaches `slow_call_rate`. While open, `allow()` refuses immediately.
+    After `open_seconds` the circuit turns half-open and lets
+    `half_open_calls` trial calls through: if all succeed it closes, and
+    any failure opens it again.
+    """
+
+    def __init__(self, failure_rate: float = 0.5, slow_call_seconds: float = 30.0,
+                 slow_call_rate: float = 0.8, window: int = 20, min_calls: int = 5,
+                 open_seconds: float = 30.0, half_open_calls: int = 2, history: int = 20):
+        """Initialize breaker.
+
+        Args:
+            failure_rate: Share of failed calls that opens the circuit
+            slow_call_seconds: Calls longer than this count as slow
+            slow_call_rate: Share of slow calls that opens the circuit
+            window: Recent calls considered
+            min_calls: Calls needed in the window before the rates apply
+            open_seconds: Time the circuit stays open before a trial
+            half_open_calls: Successful trial calls needed to close
+            history: Recent state transitions kept for health views
+        """
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self.transitions = deque(maxlen=history)
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window)  # (failed, slow)
+        self._opened_at = 0.0
+        self._trials = 0  # Trial calls let through while half-open
+        self._trial_successes = 0
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str, now: float):
+        self.transitions.append({"at": round(time.time(), 3), "from": self.state, "to": state})
+        self.state = state
+        metrics.CIRCUIT_TRANSITIONS.labels(state).inc()
+        if state == OPEN:
+            self._opened_at = now
+        if state != CLOSED:
+            self._trials = 0
+            self._trial_successes = 0
+        else:
+            self._outcomes.clear()
+
+    def allow(self, now: float = None) -> bool:
+        """Decide whether a model call may proceed.
+
+        A True answer must be followed by `record()` or `cancel()`.
+        """
+        if self.state == CLOSED:
+            return True
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            if self.state == OPEN and now - self._opened_at >= self.open_seconds:
+                self._transition(HALF_OPEN, now)
+            if self.state == HALF_OPEN and self._trials < self.half_open_calls:
+                self._trials += 1
+                return True
+            if self.state == CLOSED:
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, duration: float, failed: bool, now: float = None):
+        """Record outcome of an allowed call."""
+        if now is None:
+            now = time.monotonic()
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed or slow:
+                    self._transition(OPEN, now)
+                    return
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_calls:
+                    self._transition(CLOSED, now)
+                return
+            if self.state == OPEN:
+                return
+
+            self._outcomes.append((failed, slow))
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for f, _ in self._outcomes if f)
+            slow_calls = sum(1 for _, s in self._outcomes if s)
+            if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_call_rate:
+                self._transition(OPEN, now)
+
+    def cancel(self):
+        """Release an allowed call that ended without an outcome."""
+        with self._lock:
+            if self.state == HALF_OPEN and self._trials > self._trial_successes:
+                self._trials -= 1
+
+    def status(self) -> dict:
+        """Current state, window statistics and recent transitions."""
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = sum(1 for f, _ in self._outcomes if f)
+            slow_calls = sum(1 for _, s in self._outcomes if s)
+            retry_in = max(0.0, self._opened_at + self.open_seconds - time.monotonic()) \
+                if self.state == OPEN else 0.0
+            return {
+                "state": self.state,
+                "calls": calls,
+                "failure_rate": round(failures / calls, 3) if calls else 0.0,
+                "slow_call_rate": round(slow_calls / calls, 3) if calls else 0.0,
+                "rejected": self.rejected,
+                "retry_in": round(retry_in, 3),
+                "transitions": list(self.transitions)
+            }
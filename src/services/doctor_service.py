@@ -1,6 +1,25 @@
 """Service for recommending doctors based on symptoms."""
 
-from src.models.symptom_data import SYMPTOM_DOCTOR_MAP
+from typing import Iterable
+
+from src.services.matcher import prepare_input
+
+
+def format_recommendation(doctors: Iterable[str]) -> str:
+    """Formats doctor recommendation for matched specialists.
+
+    Args:
+        doctors: Matched doctor profiles
+
+    Returns:
+        String with doctor recommendation
+    """
+    doctors = list(doctors)
+    if doctors:
+        unique_doctors = ', '.join(dict.fromkeys(doctors))
+        return f"Вам стоит обратиться к следующему специалисту: {unique_doctors}."
+    else:
+        return "Рекомендую для начала обратиться к терапевту."
 
 
 def recommend_doctor(symptoms: str) -> str:
@@ -12,13 +31,4 @@ def recommend_doctor(symptoms: str) -> str:
     Returns:
         String with doctor recommendation
     """
-    matches = []
-    for word, doctors in SYMPTOM_DOCTOR_MAP.items():
-        if word in symptoms.lower():
-            matches.extend(doctors)
-    
-    if matches:
-        unique_doctors = ', '.join(set(matches))
-        return f"Вам стоит обратиться к следующему специалисту: {unique_doctors}."
-    else:
-        return "Рекомендую для начала обратиться к терапевту."
+    return format_recommendation(prepare_input(symptoms).doctors)
@@ -0,0 +1,124 @@
+"""Per-request generation budget."""
+
+import math
+from typing import Iterable, NamedTuple
+
+from src.services.model_client import Message
+
+MESSAGE_OVERHEAD_TOKENS = 4  # Role markers of the chat template
+CONTEXT_MARGIN_TOKENS = 16  # Slack for estimate error
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for llama-family tokenizers.
+
+    Cyrillic and other non-ASCII text takes about one token per 2.5
+    characters, Latin text about one per 4. The estimate leans high so
+    trimmed prompts fit the context.
+    """
+    non_ascii = sum(1 for c in text if ord(c) > 127)
+    return math.ceil(non_ascii / 2.5 + (len(text) - non_ascii) / 4)
+
+
+def prompt_tokens(messages: Iterable[Message]) -> int:
+    """Estimated tokens of a chat prompt."""
+    return sum(estimate_tokens(m.content) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text at a word boundary so its estimate fits max_tokens."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 1:
+        return ""
+    # Longest prefix that fits, leaving a token for the ellipsis
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= max_tokens - 1:
+            low = middle
+        else:
+            high = middle - 1
+    prefix = text[:low]
+    boundary = prefix.rfind(" ")
+    if boundary > len(prefix) // 2:
+        prefix = prefix[:boundary]
+    return prefix.rstrip() + "…"
+
+
+class GenerationBudget(NamedTuple):
+    """Limits for one model call."""
+    num_predict: int  # Tokens the model may generate
+    load: float  # Load factor it was chosen at, 0..1
+    full: bool = True  # False if load shortened it below the intent's base budget
+
+
+class BudgetPolicy:
+    """Chooses how many tokens a request may generate.
+
+    The base budget depends on intent: symptom questions get the full
+    answer length, general chat a shorter one. Under load the budget
+    shrinks linearly towards `min_tokens`. Load is the largest of queue
+    depth relative to `queue_high`, estimated queue wait relative to
+    `wait_high` and how far the average model call exceeds
+    `latency_target` (full at twice the target). num_predict is not a load
+    option in Ollama, so changing it per call does not reload the model.
+    """
+
+    def __init__(self, num_ctx: int = 512, symptom_tokens: int = 192, general_tokens: int = 96,
+                 min_tokens: int = 48, queue_high: int = 16, wait_high: float = 10.0,
+                 latency_target: float = 8.0, adaptive: bool = True):
+        """Initialize policy.
+
+        Args:
+            num_ctx: Model context window in tokens
+            symptom_tokens: Budget for symptom questions without load
+            general_tokens: Budget for general chat without load
+            min_tokens: Budget at full load
+            queue_high: Queue depth at which load is full
+            wait_high: Estimated queue wait in seconds at which load is full
+            latency_target: Average model call seconds above which budgets shrink
+            adaptive: Shrink budgets under load
+        """
+        self.num_ctx = num_ctx
+        self.symptom_tokens = symptom_tokens
+        self.general_tokens = general_tokens
+        self.min_tokens = min_tokens
+        self.queue_high = queue_high
+        self.wait_high = wait_high
+        self.latency_target = latency_target
+        self.adaptive = adaptive
+
+    def load(self, queue_depth: int = 0, estimated_wait: float = 0.0, call_seconds: float = 0.0) -> float:
+        """Load factor from 0 (idle) to 1 (budgets at minimum)."""
+        if not self.adaptive:
+            return 0.0
+        pressures = [0.0]
+        if self.queue_high > 0:
+            pressures.append(queue_depth / self.queue_high)
+        if self.wait_high > 0:
+            pressures.append(estimated_wait / self.wait_high)
+        if self.latency_target > 0:
+            pressures.append(call_seconds / self.latency_target - 1)
+        return min(1.0, max(pressures))
+
+    def budget(self, has_symptoms: bool, load: float = 0.0) -> GenerationBudget:
+        """Generation budget for a request of the given intent at the given load."""
+        base = self.symptom_tokens if has_symptoms else self.general_tokens
+        floor = min(self.min_tokens, base)
+        num_predict = round(base - (base - floor) * load)
+        return GenerationBudget(num_predict, load, num_predict == base)
+
+    def snapshot(self, load: float) -> dict:
+        """Budgets at the given load, for health views."""
+        return {
+            "adaptive": self.adaptive,
+            "load": round(load, 3),
+            "symptoms": self.budget(True, load).num_predict,
+            "general_chat": self.budget(False, load).num_predict,
+            "num_ctx": self.num_ctx
+        }
+
+    def overflow(self, messages: list, num_predict: int) -> int:
+        """Tokens by which the prompt must shrink to leave room for the answer."""
+        return prompt_tokens(messages) + num_predict + CONTEXT_MARGIN_TOKENS - self.num_ctx
@@ -0,0 +1,154 @@
+"""Single-pass keyword matching over user input."""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.config.settings import SYMPTOM_KEYWORDS, URGENT_INDICATORS, DEFAULT_LANGUAGE
+from src.models.symptom_data import SYMPTOM_DOCTOR_MAP
+
+SYMPTOM = "symptom"
+URGENT = "urgent"
+DOCTOR = "doctor"
+
+
+@dataclass(frozen=True)
+class PreparedInput:
+    """User input analysed once and shared by every processing stage."""
+    text: str
+    normalized: str
+    language: str
+    symptom_keywords: Tuple[str, ...] = ()
+    urgent_indicators: Tuple[str, ...] = ()
+    doctors: Tuple[str, ...] = ()
+
+    @property
+    def has_symptoms(self) -> bool:
+        return bool(self.symptom_keywords)
+
+    @property
+    def is_urgent(self) -> bool:
+        return bool(self.urgent_indicators)
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over symptom, urgency and doctor-map keywords.
+
+    One walk over the lowercased text finds every occurrence of every
+    keyword, so the cost depends on the input length and the number of
+    matches rather than on the size of the keyword tables. Cyrillic
+    characters are counted during the same walk for language detection.
+    """
+
+    def __init__(self, symptom_keywords: Iterable[str] = (),
+                 urgent_indicators: Iterable[str] = (),
+                 doctor_map: Optional[Dict[str, List[str]]] = None):
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [()]
+        self._doctor_map = {}
+        for word, doctors in (doctor_map or {}).items():
+            self._doctor_map.setdefault(word.lower(), []).extend(doctors)
+
+        patterns = {}
+        for category, words in (
+            (SYMPTOM, symptom_keywords),
+            (URGENT, urgent_indicators),
+            (DOCTOR, self._doctor_map),
+        ):
+            for word in words:
+                word = word.lower()
+                if word:
+                    patterns.setdefault(word, []).append((category, word))
+
+        for word, labels in patterns.items():
+            self._add(word, tuple(labels))
+        self._build_failure_links()
+        self.size = len(patterns)
+
+    def _add(self, word: str, labels: tuple):
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            state = next_state
+        self._outputs[state] = self._outputs[state] + labels
+
+    def _build_failure_links(self):
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def prepare(self, text: str) -> PreparedInput:
+        """Analyse text in a single pass."""
+        if not isinstance(text, str) or not text.strip():
+            return PreparedInput(text=text if isinstance(text, str) else "", normalized="",
+                                 language=DEFAULT_LANGUAGE)
+
+        normalized = text.strip().lower()
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        found = {}
+        cyrillic_chars = 0
+        state = 0
+        for char in normalized:
+            if '\u0400' <= char <= '\u04FF':
+                cyrillic_chars += 1
+            next_state = goto[state].get(char)
+            while next_state is None and state:
+                state = fail[state]
+                next_state = goto[state].get(char)
+            state = next_state or 0
+            if outputs[state]:
+                for label in outputs[state]:
+                    found[label] = None
+
+        symptoms, urgent, doctors = [], [], {}
+        for category, word in found:
+            if category == SYMPTOM:
+                symptoms.append(word)
+            elif category == URGENT:
+                urgent.append(word)
+            else:
+                for doctor in self._doctor_map[word]:
+                    doctors[doctor] = None
+
+        return PreparedInput(
+            text=text,
+            normalized=normalized,
+            language='ru' if cyrillic_chars > len(normalized) * 0.3 else 'en',  # >30% кириллицы
+            symptom_keywords=tuple(symptoms),
+            urgent_indicators=tuple(urgent),
+            doctors=tuple(doctors)
+        )
+
+
+_default_matcher = None
+
+
+def get_matcher() -> KeywordMatcher:
+    """Return matcher for the configured keyword tables, built once."""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = KeywordMatcher(SYMPTOM_KEYWORDS, URGENT_INDICATORS, SYMPTOM_DOCTOR_MAP)
+    return _default_matcher
+
+
+def prepare_input(text: str) -> PreparedInput:
+    """Analyse text with the default matcher."""
+    return get_matcher().prepare(text)
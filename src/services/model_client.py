@@ -0,0 +1,332 @@
+"""Chat model clients.
+
+AIService talks to the model through `ModelClient`. Two backends exist:
+`OllamaClient` posts to Ollama's /api/chat over pooled keep-alive
+connections, and `LangChainClient` goes through `ChatOllama`. Several
+Ollama servers are combined by `BackendPool`.
+"""
+
+import asyncio
+import copy
+import json
+import logging
+import threading
+from typing import AsyncIterator, Iterable, List, NamedTuple, Optional
+
+from src.config.settings import (
+    MODEL_BACKEND, MODEL_NAME, MODEL_TEMPERATURE, OLLAMA_BASE_URL, OLLAMA_BASE_URLS,
+    MODEL_NUM_CTX, MODEL_NUM_PREDICT, MODEL_KEEP_ALIVE, MODEL_TIMEOUT, MODEL_CONCURRENCY,
+    POOL_EJECT_FAILURES, POOL_EJECT_SECONDS, POOL_MAX_EJECT_SECONDS, POOL_HEDGE, POOL_HEDGE_QUANTILE
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Message(NamedTuple):
+    """One chat message."""
+    role: str  # system | user | assistant
+    content: str
+
+
+class ModelResponse(NamedTuple):
+    """Model answer, or one chunk of a streamed answer."""
+    content: str
+
+
+class ModelClientError(Exception):
+    """Raised when the model backend returns an error."""
+
+
+class ModelClient:
+    """Chat model backend used by AIService."""
+
+    def invoke(self, messages: Iterable[Message]) -> ModelResponse:
+        """Generate a complete answer."""
+        raise NotImplementedError
+
+    async def ainvoke(self, messages: Iterable[Message]) -> ModelResponse:
+        """Generate a complete answer without blocking the event loop."""
+        raise NotImplementedError
+
+    def astream(self, messages: Iterable[Message]) -> AsyncIterator[ModelResponse]:
+        """Yield the answer in chunks as the model produces them."""
+        raise NotImplementedError
+
+    def with_options(self, **options) -> "ModelClient":
+        """Return client for the same model with some options overridden."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release connections."""
+
+    async def aclose(self):
+        """Release connections from the running event loop."""
+        self.close()
+
+
+async def _aclose_quietly(client):
+    try:
+        await client.aclose()
+    except RuntimeError:
+        # The loop that opened the connections is closed, their sockets are released anyway
+        pass
+
+
+class _Connections:
+    """httpx clients of an OllamaClient, shared by its option copies."""
+
+    def __init__(self, options):
+        self._options = options  # Returns httpx client arguments
+        self._lock = threading.Lock()
+        self._closing = set()  # Tasks closing replaced async clients, kept referenced until done
+        self.client = None
+        self.async_client = None
+        self.async_loop = None
+
+    def sync(self):
+        with self._lock:
+            if self.client is None:
+                import httpx
+                self.client = httpx.Client(**self._options())
+            return self.client
+
+    def for_loop(self, loop):
+        with self._lock:
+            stale = None
+            if self.async_client is None or self.async_loop is not loop:
+                import httpx
+                if self.async_client is not None:
+                    stale = self.async_client, self.async_loop
+                self.async_client = httpx.AsyncClient(**self._options())
+                self.async_loop = loop
+            client = self.async_client
+        if stale is not None:
+            self._discard(*stale)
+        return client
+
+    def _discard(self, client, loop):
+        """Close an async client without waiting, on its own loop if that still runs."""
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        if loop is not current and loop.is_running():
+            asyncio.run_coroutine_threadsafe(_aclose_quietly(client), loop)
+        elif current is not None:
+            task = current.create_task(_aclose_quietly(client))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        else:
+            asyncio.run(_aclose_quietly(client))
+
+    def _take(self):
+        with self._lock:
+            taken = self.client, self.async_client, self.async_loop
+            self.client = self.async_client = self.async_loop = None
+        return taken
+
+    def close(self):
+        client, async_client, loop = self._take()
+        if client is not None:
+            client.close()
+        if async_client is not None:
+            self._discard(async_client, loop)
+
+    async def aclose(self):
+        client, async_client, loop = self._take()
+        if client is not None:
+            client.close()
+        if async_client is None:
+            return
+        if loop is asyncio.get_running_loop() or not loop.is_running():
+            await _aclose_quietly(async_client)
+        else:
+            self._discard(async_client, loop)
+
+
+class OllamaClient(ModelClient):
+    """Native client for Ollama's /api/chat endpoint.
+
+    One sync and one async httpx client keep connections to Ollama open
+    between calls, so a request costs one JSON encode, one round trip and
+    one JSON decode. Copies made by with_options() use the same clients.
+    The async client is bound to the event loop that created it; when a
+    different loop calls, it is closed and recreated.
+    """
+
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, model: str = MODEL_NAME,
+                 options: Optional[dict] = None, keep_alive=MODEL_KEEP_ALIVE,
+                 timeout: float = MODEL_TIMEOUT, max_connections: int = MODEL_CONCURRENCY * 2,
+                 transport=None):
+        """Initialize client.
+
+        Args:
+            base_url: Ollama server URL
+            model: Model name
+            options: Ollama generation options (num_ctx, num_predict, ...)
+            keep_alive: How long Ollama keeps the model loaded after a call
+            timeout: Read timeout in seconds
+            max_connections: Idle connections kept open to Ollama
+            transport: Custom httpx transport, used by tests
+        """
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.options = dict(options or {})
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._transport = transport
+        self._connections = _Connections(self._client_options)
+
+    def _client_options(self) -> dict:
+        # httpx is imported on first use to keep startup fast
+        import httpx
+        return {
+            "base_url": self.base_url,
+            "timeout": httpx.Timeout(self.timeout, connect=5.0),
+            "limits": httpx.Limits(max_connections=None, max_keepalive_connections=self.max_connections,
+                                   keepalive_expiry=60.0),
+            "transport": self._transport
+        }
+
+    @property
+    def client(self):
+        """Pooled sync httpx client."""
+        return self._connections.sync()
+
+    @property
+    def async_client(self):
+        """Pooled async httpx client for the running event loop."""
+        return self._connections.for_loop(asyncio.get_running_loop())
+
+    def _payload(self, messages: Iterable[Message], stream: bool) -> dict:
+        payload = {
+            "model": self.model,
+            "messages": [{"role": m.role, "content": m.content} for m in messages],
+            "stream": stream,
+            "options": self.options
+        }
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    @staticmethod
+    def _content(response) -> ModelResponse:
+        if response.status_code >= 400:
+            raise ModelClientError(f"Ollama returned {response.status_code}: {response.text[:200]}")
+        data = response.json()
+        if "error" in data:
+            raise ModelClientError(data["error"])
+        return ModelResponse(data["message"]["content"])
+
+    def invoke(self, messages: Iterable[Message]) -> ModelResponse:
+        return self._content(self.client.post("/api/chat", json=self._payload(messages, False)))
+
+    async def ainvoke(self, messages: Iterable[Message]) -> ModelResponse:
+        response = await self.async_client.post("/api/chat", json=self._payload(messages, False))
+        return self._content(response)
+
+    async def astream(self, messages: Iterable[Message]) -> AsyncIterator[ModelResponse]:
+        request = self.async_client.build_request("POST", "/api/chat", json=self._payload(messages, True))
+        response = await self.async_client.send(request, stream=True)
+        try:
+            if response.status_code >= 400:
+                await response.aread()
+                raise ModelClientError(f"Ollama returned {response.status_code}: {response.text[:200]}")
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if "error" in data:
+                    raise ModelClientError(data["error"])
+                content = data.get("message", {}).get("content")
+                if content:
+                    yield ModelResponse(content)
+                if data.get("done"):
+                    break
+        finally:
+            await response.aclose()
+
+    def with_options(self, **options) -> "OllamaClient":
+        # The copy refers to the same _Connections, so it reuses open connections
+        clone = copy.copy(self)
+        clone.options = {**self.options, **options}
+        return clone
+
+    def close(self):
+        self._connections.close()
+
+    async def aclose(self):
+        await self._connections.aclose()
+
+
+class LangChainClient(ModelClient):
+    """Client going through LangChain's ChatOllama."""
+
+    def __init__(self, chat_model=None, **kwargs):
+        """Initialize client.
+
+        Args:
+            chat_model: Existing ChatOllama instance
+            **kwargs: ChatOllama arguments, used if chat_model is not given
+        """
+        if chat_model is None:
+            from langchain_ollama import ChatOllama
+            chat_model = ChatOllama(**kwargs)
+        self.chat_model = chat_model
+
+    @staticmethod
+    def _convert(messages: Iterable[Message]) -> list:
+        from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+        types = {"system": SystemMessage, "user": HumanMessage, "assistant": AIMessage}
+        return [types[m.role](content=m.content) for m in messages]
+
+    def invoke(self, messages: Iterable[Message]) -> ModelResponse:
+        return ModelResponse(self.chat_model.invoke(self._convert(messages)).content)
+
+    async def ainvoke(self, messages: Iterable[Message]) -> ModelResponse:
+        return ModelResponse((await self.chat_model.ainvoke(self._convert(messages))).content)
+
+    async def astream(self, messages: Iterable[Message]) -> AsyncIterator[ModelResponse]:
+        async for chunk in self.chat_model.astream(self._convert(messages)):
+            if chunk.content:
+                yield ModelResponse(chunk.content)
+
+    def with_options(self, **options) -> "LangChainClient":
+        # Same model and context size, so calls reuse the loaded instance
+        return LangChainClient(self.chat_model.model_copy(update=options))
+
+
+def create_model_client(backend: str = MODEL_BACKEND, base_urls: Optional[List[str]] = None) -> ModelClient:
+    """Create model client for the backend selected in settings.
+
+    Several base URLs give a BackendPool with one client per server.
+    """
+    base_urls = base_urls or OLLAMA_BASE_URLS or [OLLAMA_BASE_URL]
+    options = {
+        "temperature": MODEL_TEMPERATURE,
+        "num_ctx": MODEL_NUM_CTX,
+        "num_predict": MODEL_NUM_PREDICT
+    }
+    if backend not in ("ollama", "langchain"):
+        logger.error(f"Unknown model backend {backend!r}, using native Ollama client")
+        backend = "ollama"
+
+    def single(base_url: str) -> ModelClient:
+        if backend == "langchain":
+            return LangChainClient(model=MODEL_NAME, base_url=base_url,
+                                   keep_alive=MODEL_KEEP_ALIVE, **options)
+        return OllamaClient(base_url, MODEL_NAME, options=options)
+
+    if len(base_urls) == 1:
+        return single(base_urls[0])
+    from src.services.backend_pool import BackendPool
+    return BackendPool(
+        [single(url) for url in base_urls],
+        names=base_urls,
+        eject_failures=POOL_EJECT_FAILURES,
+        eject_seconds=POOL_EJECT_SECONDS,
+        max_eject_seconds=POOL_MAX_EJECT_SECONDS,
+        hedge=POOL_HEDGE,
+        hedge_quantile=POOL_HEDGE_QUANTILE
+    )
@@ -0,0 +1,226 @@
+"""Per-client rate limiting."""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from typing import NamedTuple
+
+from src.config.settings import (
+    RATE_LIMIT_BACKEND, RATE_LIMIT_SQLITE_PATH, RATE_LIMIT_REQUESTS,
+    RATE_LIMIT_PERIOD, RATE_LIMIT_BURST, RATE_LIMIT_MAX_CLIENTS
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitDecision(NamedTuple):
+    """Result of a rate limit check."""
+    allowed: bool
+    retry_after: float = 0.0
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a client is over its rate limit."""
+
+    def __init__(self, retry_after: float, fallback: str, result=None):
+        super().__init__(f"Rate limit exceeded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+        self.fallback = fallback
+        self.result = result  # Degraded AnalysisResult, if available
+
+
+class GCRARateLimiter:
+    """Generic cell rate algorithm limiter with O(1) checks.
+
+    Each client costs one stored float: its theoretical arrival time (TAT).
+    A client whose TAT is in the past has a full bucket, so its state can be
+    dropped without changing any decision. Such idle clients are evicted
+    from the least recently used end on every check, and the table never
+    grows beyond max_clients.
+    """
+
+    def __init__(self, rate: int = 10, period: float = 60, burst: int = None,
+                 max_clients: int = 100000):
+        """Initialize limiter.
+
+        Args:
+            rate: Requests allowed per period
+            period: Period length in seconds
+            burst: Requests allowed back to back, defaults to rate
+            max_clients: Upper bound for tracked clients
+        """
+        self.rate = rate
+        self.period = period
+        self.burst = burst if burst is not None else rate
+        self.max_clients = max_clients
+        self.emission_interval = period / rate
+        self.tolerance = self.emission_interval * self.burst
+        self._tat = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, key: str, now: float = None) -> RateLimitDecision:
+        """Count one request for key and decide whether it is allowed."""
+        if now is None:
+            now = time.monotonic()
+
+        with self._lock:
+            tat = max(self._tat.get(key, now), now)
+            new_tat = tat + self.emission_interval
+            if new_tat - now > self.tolerance:
+                return RateLimitDecision(False, new_tat - now - self.tolerance)
+
+            self._tat[key] = new_tat
+            self._tat.move_to_end(key)
+            self._evict(now)
+            return RateLimitDecision(True)
+
+    def _evict(self, now: float):
+        """Drop idle clients from the least recently used end."""
+        while self._tat:
+            oldest_key, oldest_tat = next(iter(self._tat.items()))
+            if oldest_tat > now and len(self._tat) <= self.max_clients:
+                break
+            del self._tat[oldest_key]
+
+    def reset(self):
+        """Forget all clients."""
+        with self._lock:
+            self._tat.clear()
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+
+class SQLiteRateLimiter:
+    """GCRA limiter with its state in a SQLite database shared by worker processes.
+
+    Decisions match GCRARateLimiter, but every worker on the host reads and
+    updates the same TAT per client inside one write transaction, so a
+    client gets `rate` requests per period from the host rather than from
+    each worker. TATs are wall-clock times because they outlive processes.
+    Idle clients are pruned every few hundred allowed requests. Checks run
+    on the event loop, so they wait at most `busy_timeout` for another
+    worker's lock; if the database is busy or unavailable, requests are
+    allowed.
+    """
+
+    _PRUNE_EVERY = 256
+
+    def __init__(self, path: str, rate: int = 10, period: float = 60, burst: int = None,
+                 max_clients: int = 100000, busy_timeout: float = 0.02):
+        """Initialize limiter.
+
+        Args:
+            path: Database file, created if missing
+            rate: Requests allowed per period
+            period: Period length in seconds
+            burst: Requests allowed back to back, defaults to rate
+            max_clients: Upper bound for tracked clients
+            busy_timeout: Seconds a check waits for the database lock
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.rate = rate
+        self.period = period
+        self.burst = burst if burst is not None else rate
+        self.max_clients = max_clients
+        self.emission_interval = period / rate
+        self.tolerance = self.emission_interval * self.burst
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._allowed = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return connection for current process, reopening after fork."""
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Limiter state is disposable, losing the last writes on power loss is harmless
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS rate_limits_tat ON rate_limits (tat)")
+            # Setup may wait for other workers, requests must not stall the event loop
+            conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def check(self, key: str, now: float = None) -> RateLimitDecision:
+        """Count one request for key and decide whether it is allowed."""
+        if now is None:
+            now = time.time()
+
+        with self._lock:
+            try:
+                conn = self._connection()
+                # Takes the write lock, so concurrent checks from other workers are serialized
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    decision = self._check(conn, key, now)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    with suppress(sqlite3.Error):
+                        conn.execute("ROLLBACK")
+                    raise
+                return decision
+            except sqlite3.Error as e:
+                logger.error(f"Shared rate limiter unavailable, allowing request: {e}")
+                return RateLimitDecision(True)
+
+    def _check(self, conn: sqlite3.Connection, key: str, now: float) -> RateLimitDecision:
+        row = conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+        tat = max(row[0], now) if row is not None else now
+        new_tat = tat + self.emission_interval
+        if new_tat - now > self.tolerance:
+            return RateLimitDecision(False, new_tat - now - self.tolerance)
+
+        conn.execute(
+            "INSERT INTO rate_limits (key, tat) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+            (key, new_tat)
+        )
+        self._allowed += 1
+        if self._allowed % self._PRUNE_EVERY == 0:
+            self._prune(conn, now)
+        return RateLimitDecision(True)
+
+    def _prune(self, conn: sqlite3.Connection, now: float):
+        """Drop idle clients, then the least recently active ones over max_clients."""
+        conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+        excess = conn.execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0] - self.max_clients
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM rate_limits WHERE key IN (SELECT key FROM rate_limits ORDER BY tat LIMIT ?)",
+                (excess,)
+            )
+
+    def reset(self):
+        """Forget all clients."""
+        with self._lock:
+            self._connection().execute("DELETE FROM rate_limits")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+
+def create_rate_limiter():
+    """Create rate limiter for the backend selected in settings."""
+    options = dict(rate=RATE_LIMIT_REQUESTS, period=RATE_LIMIT_PERIOD,
+                   burst=RATE_LIMIT_BURST, max_clients=RATE_LIMIT_MAX_CLIENTS)
+    if RATE_LIMIT_BACKEND == "sqlite":
+        try:
+            return SQLiteRateLimiter(RATE_LIMIT_SQLITE_PATH, **options)
+        except sqlite3.Error as e:
+            logger.error(f"Shared rate limiter unavailable, limiting per process: {e}")
+    return GCRARateLimiter(**options)
@@ -0,0 +1,149 @@
+"""Priority scheduling of model calls."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from src.services.matcher import PreparedInput
+
+URGENT = 0
+SYMPTOMS = 1
+GENERAL = 2
+
+PRIORITY_NAMES = {URGENT: "urgent", SYMPTOMS: "symptoms", GENERAL: "general"}
+
+
+def priority_for(prepared: PreparedInput) -> int:
+    """Choose priority class for analysed input."""
+    if prepared.is_urgent:
+        return URGENT
+    if prepared.has_symptoms:
+        return SYMPTOMS
+    return GENERAL
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class PriorityScheduler:
+    """Grants a fixed number of model slots to waiting requests by priority.
+
+    A waiting request's effective priority improves by one class every
+    `aging_seconds`, so general chat cannot starve behind a steady stream
+    of urgent requests. Because every waiter ages at the same rate, the
+    order between two waiters never changes while they wait, and ordering
+    by `priority * aging_seconds + enqueue_time` in a heap is exact.
+    """
+
+    _SERVICE_TIME_ALPHA = 0.2
+
+    def __init__(self, slots: int = 4, aging_seconds: float = 10.0, stats_window: int = 1000):
+        """Initialize scheduler.
+
+        Args:
+            slots: Model calls allowed to run at the same time
+            aging_seconds: Waiting time that raises priority by one class
+            stats_window: Recent wait times kept per class for percentiles
+        """
+        self.slots = slots
+        self.aging_seconds = aging_seconds
+        self.active = 0
+        self.service_time = 0.0  # Moving average of slot hold time
+        self._waiting = []
+        self._counter = itertools.count()
+        self._queued = {priority: 0 for priority in PRIORITY_NAMES}
+        self._waits = {priority: deque(maxlen=stats_window) for priority in PRIORITY_NAMES}
+        self._served = {priority: 0 for priority in PRIORITY_NAMES}
+
+    def _record(self, priority: int, wait: float):
+        self._waits[priority].append(wait)
+        self._served[priority] += 1
+
+    async def acquire(self, priority: int) -> float:
+        """Wait for a model slot.
+
+        Returns:
+            Time spent waiting in seconds
+        """
+        if self.active < self.slots and not self.queue_depth():
+            self.active += 1
+            self._record(priority, 0.0)
+            return 0.0
+
+        enqueued = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        order = priority * self.aging_seconds + enqueued
+        heapq.heappush(self._waiting, (order, next(self._counter), future, priority, enqueued))
+        self._queued[priority] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just before cancellation; hand it on
+                self.release()
+            else:
+                self._queued[priority] -= 1
+            raise
+        return time.monotonic() - enqueued
+
+    def release(self):
+        """Return a slot, handing it to the best waiting request."""
+        while self._waiting:
+            _, _, future, priority, enqueued = heapq.heappop(self._waiting)
+            if future.done():
+                continue
+            self._queued[priority] -= 1
+            self._record(priority, time.monotonic() - enqueued)
+            future.set_result(None)
+            return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int):
+        """Hold a model slot for the duration of the block."""
+        await self.acquire(priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._observe_service_time(time.monotonic() - started)
+            self.release()
+
+    def _observe_service_time(self, duration: float):
+        if self.service_time == 0.0:
+            self.service_time = duration
+        else:
+            self.service_time += self._SERVICE_TIME_ALPHA * (duration - self.service_time)
+
+    def queue_depth(self, priority: int = None) -> int:
+        """Number of requests waiting for a slot, or only those of priority classes up to `priority`."""
+        if priority is None:
+            return sum(self._queued.values())
+        return sum(count for queued, count in self._queued.items() if queued <= priority)
+
+    def stats(self) -> dict:
+        """Return queue and wait-time statistics per priority class."""
+        classes = {}
+        for priority, name in PRIORITY_NAMES.items():
+            waits = sorted(self._waits[priority])
+            classes[name] = {
+                "waiting": self._queued[priority],
+                "served": self._served[priority],
+                "wait_p50": round(_percentile(waits, 0.5), 4),
+                "wait_p99": round(_percentile(waits, 0.99), 4),
+                "wait_max": round(waits[-1], 4) if waits else 0.0
+            }
+        return {
+            "slots": self.slots,
+            "active": self.active,
+            "waiting": self.queue_depth(),
+            "service_time": round(self.service_time, 4),
+            "classes": classes
+        }
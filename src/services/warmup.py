@@ -0,0 +1,125 @@
+"""Model warm-up and keep-warm pings."""
+
+import asyncio
+import logging
+import time
+from typing import Optional, Sequence
+
+from src.services.backend_pool import BackendPool
+from src.services.model_client import Message
+
+logger = logging.getLogger(__name__)
+
+
+class ModelWarmer:
+    """Loads the model before traffic arrives and keeps it loaded.
+
+    Warm-up sends one short request per system prompt, so Ollama loads the
+    weights and caches the prompt prefixes the service uses. Until it has
+    succeeded the service reports not ready. Afterwards a one-token ping
+    every `interval` seconds renews the model's keep-alive, so Ollama does
+    not unload it during quiet periods. With a backend pool every server
+    is warmed and pinged, and one warmed server makes the service ready.
+    """
+
+    _RETRY_MIN = 1.0
+    _RETRY_MAX = 60.0
+
+    def __init__(self, model, prompts: Sequence[str], interval: float = 300.0):
+        """Initialize warmer.
+
+        Args:
+            model: Chat model used for priming, ideally limited to one token
+            prompts: System prompts to prime
+            interval: Seconds between keep-warm pings, 0 disables them
+        """
+        self.model = model
+        self.prompts = list(prompts)
+        self.interval = interval
+        self.ready = False
+        self.warmup_seconds: Optional[float] = None
+        self.last_ping: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.pings = 0
+        self.failures = 0
+
+    def _messages(self, prompt: str) -> list:
+        return [Message("system", prompt), Message("user", "ping")]
+
+    def _targets(self) -> list:
+        # Every server of a pool has its own copy of the model to load
+        return self.model.clients if isinstance(self.model, BackendPool) else [self.model]
+
+    async def warm_up(self) -> bool:
+        """Prime every prompt once on every backend.
+
+        Returns:
+            True if at least one backend answered for all prompts
+        """
+        started = time.monotonic()
+        targets = self._targets()
+        warmed = 0
+        for target in targets:
+            try:
+                for prompt in self.prompts:
+                    await target.ainvoke(self._messages(prompt))
+                warmed += 1
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e) or type(e).__name__
+                logger.warning(f"Model warm-up failed: {self.last_error}")
+        if not warmed:
+            return False
+        if warmed == len(targets):
+            self.last_error = None
+
+        self.warmup_seconds = time.monotonic() - started
+        self.last_ping = time.time()
+        self.ready = True
+        logger.info(f"Model warmed up in {self.warmup_seconds:.2f}s")
+        return True
+
+    async def ping(self) -> bool:
+        """Renew the model keep-alive on every backend with a one-token request.
+
+        Returns:
+            True if every backend answered
+        """
+        ok = True
+        for target in self._targets():
+            try:
+                await target.ainvoke(self._messages(self.prompts[0] if self.prompts else ""))
+            except Exception as e:
+                ok = False
+                self.failures += 1
+                self.last_error = str(e) or type(e).__name__
+                logger.warning(f"Keep-warm ping failed: {self.last_error}")
+        if ok:
+            self.pings += 1
+            self.last_ping = time.time()
+            self.last_error = None
+        return ok
+
+    async def run(self):
+        """Warm up, retrying with backoff, then ping until cancelled."""
+        delay = self._RETRY_MIN
+        while not await self.warm_up():
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self._RETRY_MAX)
+
+        if self.interval <= 0:
+            return
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.ping()
+
+    def status(self) -> dict:
+        """Warm-up state for readiness checks."""
+        return {
+            "ready": self.ready,
+            "warmup_seconds": round(self.warmup_seconds, 3) if self.warmup_seconds is not None else None,
+            "last_ping": self.last_ping,
+            "pings": self.pings,
+            "failures": self.failures,
+            "last_error": self.last_error
+        }
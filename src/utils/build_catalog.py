@@ -0,0 +1,147 @@
+"""Build the precomputed answer catalog from a frequency-ranked corpus.
+
+Usage:
+    python -m src.utils.build_catalog questions.jsonl --top 500
+    python -m src.utils.build_catalog questions.jsonl --top 200 --output data/answer_catalog.bin --concurrency 2
+
+Each JSONL line must contain a "text", "body" or "title" field and may
+contain a "count". Questions are grouped by cache key and ranked by total
+count (1 per line without one); lines without counts keep file order, so
+an already ranked list works as is. Answers for the top questions are
+generated through AIService and the catalog is published atomically, so
+running services with CATALOG_PATH set pick it up within
+CATALOG_CHECK_INTERVAL seconds.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from typing import Iterable, List, Tuple
+
+from src.config.settings import CATALOG_PATH, MODEL_NAME
+from src.services.analysis import SOURCE_LLM
+from src.services.answer_catalog import write_catalog
+
+DEFAULT_OUTPUT = "data/answer_catalog.bin"
+
+
+def load_ranked(path: str) -> List[Tuple[str, int]]:
+    """Read (text, count) pairs from a JSONL corpus."""
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            text = item.get("text") or item.get("body") or item.get("title")
+            if text:
+                items.append((text, int(item.get("count", 1))))
+    return items
+
+
+def rank(items: Iterable[Tuple[str, int]], cache_key, top: int) -> List[str]:
+    """Return one representative text for each of the `top` most frequent cache keys.
+
+    Args:
+        items: (text, count) pairs
+        cache_key: Function mapping a text to its cache key
+        top: Number of questions to keep
+
+    Returns:
+        Texts ordered by total count, ties in first-seen order
+    """
+    totals = {}  # cache_key -> [count, first position, text]
+    for position, (text, count) in enumerate(items):
+        key = cache_key(text)
+        if key in totals:
+            totals[key][0] += count
+        else:
+            totals[key] = [count, position, text]
+    ranked = sorted(totals.values(), key=lambda total: (-total[0], total[1]))
+    return [text for _, _, text in ranked[:top]]
+
+
+def prepare_service(service):
+    """Configure a service for building: no catalog, no earlier cached answers,
+    full-length answers and no rate limit for the builder."""
+    import copy
+
+    from src.services.cache_service import ResponseCache
+    from src.services.rate_limiter import GCRARateLimiter
+
+    service.catalog = None
+    service.similar_keys = None
+    service.response_cache = ResponseCache()
+    service.budget_policy = copy.copy(service.budget_policy)
+    service.budget_policy.adaptive = False
+    service.rate_limiter = GCRARateLimiter(rate=1_000_000, period=1)
+    return service
+
+
+def build(service, texts: List[str], output: str, concurrency: int = 1,
+          version: str = None, source: str = None) -> dict:
+    """Generate answers for texts and publish them as a catalog.
+
+    Only model answers are stored; fallbacks and validation messages are
+    skipped so a model outage cannot end up in the catalog.
+
+    Args:
+        service: AI service, see prepare_service()
+        texts: Questions, most frequent first
+        output: Catalog file path
+        concurrency: Model calls in flight
+        version: Catalog version, default is the build time
+        source: Corpus name recorded in the metadata
+
+    Returns:
+        Catalog metadata with entry and skip counts
+    """
+    from src.services.ai_service import catalog_key_settings
+
+    started = time.perf_counter()
+    results = asyncio.run(service.analyze_batch_async(
+        texts, user_id="catalog-builder", concurrency=concurrency, deadline=None
+    ))
+    entries = [
+        (service._cache_key(text), result.response)
+        for text, result in zip(texts, results)
+        if not isinstance(result, Exception) and result.source == SOURCE_LLM
+    ]
+    created = datetime.now(timezone.utc)
+    meta = {
+        "version": version or created.strftime("%Y%m%d%H%M%S"),
+        "created": created.isoformat(timespec="seconds"),
+        "model": MODEL_NAME,
+        "source": source,
+        **catalog_key_settings()
+    }
+    meta["entries"] = write_catalog(output, entries, meta)
+    meta["skipped"] = len(texts) - len(entries)
+    meta["build_seconds"] = round(time.perf_counter() - started, 1)
+    return meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", help="Frequency-ranked JSONL corpus")
+    parser.add_argument("--top", type=int, default=500, help="Number of questions to answer")
+    parser.add_argument("--output", default=CATALOG_PATH or DEFAULT_OUTPUT,
+                        help=f"Catalog file path (default: CATALOG_PATH, else {DEFAULT_OUTPUT})")
+    parser.add_argument("--concurrency", type=int, default=1, help="Model calls in flight")
+    parser.add_argument("--version", help="Catalog version, default is the build time")
+    args = parser.parse_args()
+
+    from src.services.ai_service import AIService
+
+    service = prepare_service(AIService())
+    texts = rank(load_ranked(args.corpus), service._cache_key, args.top)
+    print(f"Generating answers for {len(texts)} questions...")
+    meta = build(service, texts, args.output, args.concurrency, args.version, args.corpus)
+    print(f"Catalog {meta['version']} written to {args.output}: {meta['entries']} answers, "
+          f"{meta['skipped']} skipped, {meta['build_seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 """Command line interface utilities."""
 
 from src.config.settings import EXIT_COMMANDS
-from src.services.ai_service import AIService
 from src.utils.health import health_check
 
 
@@ -10,7 +9,15 @@ class CLI:
     
     def __init__(self):
         """Initialize CLI."""
-        self.ai_service = AIService()
+        self._ai_service = None
+
+    @property
+    def ai_service(self):
+        """AI service, created on first use."""
+        if self._ai_service is None:
+            from src.services.ai_service import AIService
+            self._ai_service = AIService()
+        return self._ai_service
     
     def run_tests(self):
         """Runs test examples."""
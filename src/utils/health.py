@@ -1,12 +1,21 @@
 """Health check utilities for Medical AI Service."""
 
+import asyncio
+import logging
 import os
+import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any
+from typing import Any, Dict, List, Optional
 
-from src.config.settings import MODEL_NAME, OLLAMA_BASE_URL
+from src.config.settings import (
+    MODEL_NAME, OLLAMA_BASE_URL, OLLAMA_BASE_URLS,
+    HEALTH_PROBE_INTERVAL, HEALTH_PROBE_TIMEOUT, HEALTH_PROBE_HISTORY
+)
 from src import __version__, __description__
 
+logger = logging.getLogger(__name__)
+
 
 def health_check() -> Dict[str, Any]:
     """
@@ -51,7 +60,14 @@ def check_dependencies() -> Dict[str, bool]:
     dependencies = {}
 
     try:
-        import langchain  # noqa: F401
+        import httpx  # noqa: F401
+        dependencies["httpx"] = True
+    except ImportError:
+        dependencies["httpx"] = False
+
+    # Needed only for MODEL_BACKEND=langchain
+    try:
+        import langchain_ollama  # noqa: F401
         dependencies["langchain"] = True
     except ImportError:
         dependencies["langchain"] = False
@@ -105,3 +121,203 @@ def quick_health_check() -> Dict[str, Any]:
     base_result = health_check()
     base_result["ai_service"] = check_ai_service()
     return base_result
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+class HealthProber:
+    """Probes Ollama in the background and keeps the latest result.
+
+    Every `interval` seconds the prober asks Ollama for its model list,
+    recording whether it answered, whether the configured model is
+    installed, and how long the call took. Request handlers and
+    liveness/readiness endpoints only read the stored snapshot, so probes
+    cost the same no matter how often they are polled.
+    """
+
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, model_name: str = MODEL_NAME,
+                 interval: float = HEALTH_PROBE_INTERVAL, timeout: float = HEALTH_PROBE_TIMEOUT,
+                 history: int = HEALTH_PROBE_HISTORY, transport=None):
+        """Initialize prober.
+
+        Args:
+            base_url: Ollama server URL
+            model_name: Model that must be installed
+            interval: Seconds between probes, 0 disables probing
+            timeout: Probe timeout in seconds
+            history: Recent probes kept for the deep health view
+            transport: Custom httpx transport, used by tests
+        """
+        self.base_url = base_url.rstrip("/")
+        self.model_name = model_name
+        self.interval = interval
+        self.timeout = timeout
+        self.history = deque(maxlen=history)
+        self._transport = transport
+        self._checked_at = None  # time.monotonic() of the last probe
+        self._snapshot = {
+            "status": "unknown",
+            "ollama_reachable": None,
+            "model_available": None,
+            "latency_ms": None,
+            "checked_at": None,
+            "consecutive_failures": 0,
+            "error": None
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def _model_installed(self, tags: dict) -> bool:
+        names = {model.get("name") for model in tags.get("models", [])}
+        wanted = self.model_name if ":" in self.model_name else f"{self.model_name}:latest"
+        return self.model_name in names or wanted in names
+
+    async def probe(self, client) -> dict:
+        """Probe Ollama once and store the result."""
+        started = time.perf_counter()
+        reachable, available, error = False, False, None
+        try:
+            response = await client.get("/api/tags")
+            response.raise_for_status()
+            reachable = True
+            available = self._model_installed(response.json())
+            if not available:
+                error = f"Model {self.model_name} is not installed"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        latency = time.perf_counter() - started
+
+        ok = reachable and available
+        failures = 0 if ok else self._snapshot["consecutive_failures"] + 1
+        self._snapshot = {
+            "status": "healthy" if ok else ("degraded" if reachable else "unhealthy"),
+            "ollama_reachable": reachable,
+            "model_available": available,
+            "latency_ms": round(latency * 1000, 2),
+            "checked_at": datetime.now().isoformat(),
+            "consecutive_failures": failures,
+            "error": error
+        }
+        self._checked_at = time.monotonic()
+        self.history.append((time.time(), latency, ok))
+        if not ok and failures == 1:
+            logger.warning(f"Ollama health probe failed: {error}")
+        return self._snapshot
+
+    async def run(self):
+        """Probe every interval until cancelled."""
+        import httpx
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout,
+                                     transport=self._transport) as client:
+            while True:
+                await self.probe(client)
+                await asyncio.sleep(self.interval)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latest probe result."""
+        return self._snapshot
+
+    def healthy(self) -> bool:
+        """True if the last probe succeeded and is recent; always True when disabled."""
+        if not self.enabled:
+            return True
+        if self._checked_at is None or self._snapshot["status"] != "healthy":
+            return False
+        # A prober that stopped reporting is not evidence of health
+        return time.monotonic() - self._checked_at < max(3 * self.interval, self.timeout * 2)
+
+    def latency_summary(self) -> Dict[str, Any]:
+        """Latency percentiles and success rate over the kept history."""
+        latencies = sorted(latency for _, latency, _ in self.history)
+        successes = sum(1 for _, _, ok in self.history if ok)
+        return {
+            "probes": len(self.history),
+            "success_rate": round(successes / len(self.history), 3) if self.history else None,
+            "latency_ms_p50": round(_percentile(latencies, 0.5) * 1000, 2),
+            "latency_ms_p99": round(_percentile(latencies, 0.99) * 1000, 2),
+            "latency_ms_max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            "recent": [
+                {"timestamp": round(at, 3), "latency_ms": round(latency * 1000, 2), "ok": ok}
+                for at, latency, ok in list(self.history)[-10:]
+            ]
+        }
+
+
+class PoolHealthProber:
+    """Probes every Ollama server of a backend pool.
+
+    The instance can serve while any backend can, so it counts as healthy
+    when at least one backend passed its last probe. The snapshot is
+    "degraded" while only some do and lists the result of each backend.
+    """
+
+    def __init__(self, base_urls: List[str], **kwargs):
+        """Initialize prober.
+
+        Args:
+            base_urls: Ollama server URLs
+            **kwargs: HealthProber arguments shared by all backends
+        """
+        self.probers = [HealthProber(url, **kwargs) for url in base_urls]
+
+    @property
+    def interval(self) -> float:
+        return self.probers[0].interval
+
+    @property
+    def enabled(self) -> bool:
+        return self.probers[0].enabled
+
+    async def probe(self) -> dict:
+        """Probe every backend once, in parallel."""
+        import httpx
+
+        async def probe_one(prober: HealthProber):
+            async with httpx.AsyncClient(base_url=prober.base_url, timeout=prober.timeout,
+                                         transport=prober._transport) as client:
+                await prober.probe(client)
+
+        await asyncio.gather(*(probe_one(prober) for prober in self.probers))
+        return self.snapshot()
+
+    async def run(self):
+        """Probe every backend every interval until cancelled."""
+        await asyncio.gather(*(prober.run() for prober in self.probers))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Overall status and the latest probe of each backend."""
+        backends = [{"url": prober.base_url, **prober.snapshot()} for prober in self.probers]
+        healthy = sum(prober.healthy() for prober in self.probers)
+        statuses = {backend["status"] for backend in backends}
+        if healthy == len(self.probers):
+            status = "healthy"
+        elif healthy or "degraded" in statuses:
+            status = "degraded"
+        elif statuses == {"unknown"}:
+            status = "unknown"
+        else:
+            status = "unhealthy"
+        return {"status": status, "healthy_backends": healthy, "backends": backends}
+
+    def healthy(self) -> bool:
+        """True if at least one backend is healthy; always True when disabled."""
+        return not self.enabled or any(prober.healthy() for prober in self.probers)
+
+    def latency_summary(self) -> Dict[str, Any]:
+        """Probe latency summary of each backend."""
+        backends = [{"url": prober.base_url, **prober.latency_summary()} for prober in self.probers]
+        return {"probes": sum(backend["probes"] for backend in backends), "backends": backends}
+
+
+def create_health_prober(base_urls: Optional[List[str]] = None):
+    """Create prober for the configured Ollama servers, one per pool member."""
+    base_urls = base_urls or OLLAMA_BASE_URLS or [OLLAMA_BASE_URL]
+    if len(base_urls) == 1:
+        return HealthProber(base_urls[0])
+    return PoolHealthProber(base_urls)
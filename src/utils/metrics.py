@@ -0,0 +1,372 @@
+"""Prometheus metrics for Medical AI Service.
+
+Hot paths only touch pre-created metric children: an observation is a
+bisect and two additions, with no locks and no string formatting. All
+formatting happens in `render()` when /metrics is scraped.
+"""
+
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Sequence, Set, Tuple
+
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+MODEL_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 21.0, 34.0, 60.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0
+        self.function = None
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from function at scrape time."""
+        self.function = function
+
+    def get(self) -> float:
+        if self.function is not None:
+            try:
+                return self.function()
+            except Exception:
+                return float("nan")
+        return self.value
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric:
+    """Metric family with a child per label value combination."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 labelvalues: Iterable[Sequence[str]] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        for values in labelvalues:
+            self.labels(*values)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Return child for label values, creating it on first use."""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def _child_state(self, child):
+        raise NotImplementedError
+
+    def snapshot(self) -> list:
+        """Label values and state of every child, for merging across processes."""
+        return [[list(values), self._child_state(child)] for values, child in list(self._children.items())]
+
+    def merged(self, snapshots: Dict[str, list], live: Set[str]) -> "_Metric":
+        """Return a copy holding the per-process snapshots combined.
+
+        Args:
+            snapshots: snapshot() results keyed by worker name
+            live: Workers whose point-in-time values are still current
+        """
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self._children[()].inc(amount)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+    def _child_state(self, child):
+        return child.value
+
+    def merged(self, snapshots, live):
+        # Counts of exited workers still belong to the totals
+        total = Counter(self.name, self.documentation, self.labelnames)
+        for snapshot in snapshots.values():
+            for values, value in snapshot:
+                total.labels(*values).inc(value)
+        return total
+
+
+class Gauge(_Metric):
+    """Value that can go up and down or be read from a callback."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._children[()].set(value)
+
+    def inc(self, amount: float = 1):
+        self._children[()].inc(amount)
+
+    def dec(self, amount: float = 1):
+        self._children[()].dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        self._children[()].set_function(function)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.get())}"
+
+    def _child_state(self, child):
+        value = child.get()
+        return None if value != value else value  # JSON has no NaN
+
+    def merged(self, snapshots, live):
+        # Point-in-time values do not add up meaningfully, so keep one series per worker
+        per_worker = Gauge(self.name, self.documentation, self.labelnames + ("worker",))
+        for worker, snapshot in snapshots.items():
+            if worker not in live:
+                continue
+            for values, value in snapshot:
+                per_worker.labels(*values, worker).set(float("nan") if value is None else value)
+        return per_worker
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 labelvalues: Iterable[Sequence[str]] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, labelvalues)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float):
+        self._children[()].observe(value)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), list(child.counts)):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {child.count}"
+
+    def _child_state(self, child):
+        return [list(child.counts), child.sum, child.count]
+
+    def merged(self, snapshots, live):
+        total = Histogram(self.name, self.documentation, self.labelnames, buckets=self.bounds)
+        for snapshot in snapshots.values():
+            for values, (counts, value_sum, count) in snapshot:
+                child = total.labels(*values)
+                child.counts = [a + b for a, b in zip(child.counts, counts)]
+                child.sum += value_sum
+                child.count += count
+        return total
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> _Metric:
+        return self._metrics[name]
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+    def snapshot(self) -> dict:
+        """State of all metrics, see _Metric.snapshot()."""
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def render_merged(self, snapshots: Dict[str, dict], live: Set[str]) -> str:
+        """Render metrics combined from registry snapshots of several processes.
+
+        Args:
+            snapshots: snapshot() results keyed by worker name
+            live: Workers whose gauges are still reported
+        """
+        return "\n".join(
+            metric.merged({worker: snapshot.get(name, []) for worker, snapshot in snapshots.items()}, live).render()
+            for name, metric in self._metrics.items()
+        ) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request pipeline stages
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "medical_ai_stage_seconds", "Duration of request pipeline stages",
+    ["stage"], [("validation",), ("symptom_detection",), ("cache_lookup",), ("rate_limit",)]
+))
+VALIDATION_SECONDS = STAGE_SECONDS.labels("validation")
+SYMPTOM_DETECTION_SECONDS = STAGE_SECONDS.labels("symptom_detection")
+CACHE_LOOKUP_SECONDS = STAGE_SECONDS.labels("cache_lookup")
+RATE_LIMIT_SECONDS = STAGE_SECONDS.labels("rate_limit")
+
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "medical_ai_cache_lookups_total", "Response cache lookups by result",
+    ["result"], [("hit",), ("miss",)]
+))
+CACHE_HITS = CACHE_LOOKUPS.labels("hit")
+CACHE_MISSES = CACHE_LOOKUPS.labels("miss")
+CATALOG_HITS = REGISTRY.register(Counter(
+    "medical_ai_catalog_hits_total", "Cache lookups answered from the precomputed answer catalog"
+))
+
+RATE_LIMIT_DECISIONS = REGISTRY.register(Counter(
+    "medical_ai_rate_limit_decisions_total", "Rate limit decisions",
+    ["decision"], [("allowed",), ("rejected",)]
+))
+RATE_LIMIT_ALLOWED = RATE_LIMIT_DECISIONS.labels("allowed")
+RATE_LIMIT_REJECTED = RATE_LIMIT_DECISIONS.labels("rejected")
+
+# Model calls
+MODEL_CALL_SECONDS = REGISTRY.register(Histogram(
+    "medical_ai_model_call_seconds", "Model call latency by intent",
+    ["intent"], [("symptoms",), ("general_chat",)], buckets=MODEL_BUCKETS
+))
+MODEL_CALL_SYMPTOMS_SECONDS = MODEL_CALL_SECONDS.labels("symptoms")
+MODEL_CALL_GENERAL_SECONDS = MODEL_CALL_SECONDS.labels("general_chat")
+
+GENERATION_BUDGET_TOKENS = REGISTRY.register(Histogram(
+    "medical_ai_generation_budget_tokens", "num_predict chosen per model call by intent",
+    ["intent"], [("symptoms",), ("general_chat",)], buckets=(16, 32, 48, 64, 96, 128, 192, 256, 384, 512)
+))
+GENERATION_BUDGET_SYMPTOMS = GENERATION_BUDGET_TOKENS.labels("symptoms")
+GENERATION_BUDGET_GENERAL = GENERATION_BUDGET_TOKENS.labels("general_chat")
+PROMPTS_TRIMMED = REGISTRY.register(Counter(
+    "medical_ai_prompts_trimmed_total", "User inputs shortened to fit the model context"
+))
+
+FALLBACKS = REGISTRY.register(Counter(
+    "medical_ai_fallbacks_total", "Responses produced without the model, by path",
+    ["path"], [("symptoms_model_error",), ("general_chat_model_error",), ("stream_model_error",),
+               ("rate_limited",), ("admission_rejected",), ("circuit_open",)]
+))
+FALLBACK_SYMPTOMS = FALLBACKS.labels("symptoms_model_error")
+FALLBACK_GENERAL_CHAT = FALLBACKS.labels("general_chat_model_error")
+FALLBACK_STREAM = FALLBACKS.labels("stream_model_error")
+FALLBACK_RATE_LIMITED = FALLBACKS.labels("rate_limited")
+FALLBACK_ADMISSION = FALLBACKS.labels("admission_rejected")
+FALLBACK_CIRCUIT_OPEN = FALLBACKS.labels("circuit_open")
+
+CIRCUIT_STATE = REGISTRY.register(Gauge(
+    "medical_ai_circuit_state", "Model circuit breaker state (0 closed, 1 half-open, 2 open)"
+))
+CIRCUIT_TRANSITIONS = REGISTRY.register(Counter(
+    "medical_ai_circuit_transitions_total", "Model circuit breaker transitions by new state",
+    ["state"], [("closed",), ("half_open",), ("open",)]
+))
+
+# In-flight work
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "medical_ai_http_requests_in_flight", "HTTP requests being processed"
+))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "medical_ai_http_request_seconds", "HTTP request latency by endpoint",
+    ["endpoint"], buckets=MODEL_BUCKETS
+))
+MODEL_IN_FLIGHT = REGISTRY.register(Gauge(
+    "medical_ai_model_requests_in_flight", "Admitted requests waiting on or running in the model"
+))
+MODEL_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "medical_ai_model_queue_depth", "Requests waiting for a model slot"
+))
+MODEL_SLOTS_ACTIVE = REGISTRY.register(Gauge(
+    "medical_ai_model_slots_active", "Model slots in use"
+))
+MODEL_READY = REGISTRY.register(Gauge(
+    "medical_ai_model_ready", "1 once the model has been warmed up"
+))
+OLLAMA_UP = REGISTRY.register(Gauge(
+    "medical_ai_ollama_up", "1 if the last health probe found Ollama (any pool server) with the model installed"
+))
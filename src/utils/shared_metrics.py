@@ -0,0 +1,117 @@
+"""Metrics shared by the worker processes of one host through SQLite."""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import suppress
+
+from src.utils.metrics import REGISTRY, Registry
+
+logger = logging.getLogger(__name__)
+
+
+class SharedMetrics:
+    """Merges the metric registries of all worker processes on a host.
+
+    Each worker keeps counting in its own registry, so hot paths cost the
+    same as with one process, and publishes a snapshot to a SQLite
+    database every `interval` seconds and whenever it renders /metrics.
+    Rendering sums counters and histograms over every worker that published
+    since the database was cleared, including exited ones, so host totals
+    do not go back when a worker is restarted. Gauges are reported per
+    worker with a `worker` label, for workers that published within the
+    last three intervals.
+    """
+
+    def __init__(self, path: str, registry: Registry = REGISTRY, interval: float = 5.0):
+        """Initialize shared metrics.
+
+        Args:
+            path: Database file, created if missing
+            registry: Registry of this process
+            interval: Seconds between snapshots published by run()
+        """
+        self.path = path
+        self.registry = registry
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._worker = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return connection for current process, reopening after fork."""
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS worker_metrics ("
+                "worker TEXT PRIMARY KEY, pid INTEGER NOT NULL, snapshot TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+            # PIDs are reused, so a restarted worker must not overwrite the totals of an exited one
+            self._worker = f"{self._pid}-{uuid.uuid4().hex[:8]}"
+        return self._conn
+
+    def publish(self):
+        """Store the current snapshot of this process."""
+        snapshot = json.dumps(self.registry.snapshot(), separators=(",", ":"))
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO worker_metrics (worker, pid, snapshot, updated_at) VALUES (?, ?, ?, ?)",
+                (self._worker, self._pid, snapshot, time.time())
+            )
+
+    def render(self) -> str:
+        """Render host-wide metrics, falling back to this process on database errors."""
+        try:
+            self.publish()
+            with self._lock:
+                rows = self._connection().execute(
+                    "SELECT pid, snapshot, updated_at FROM worker_metrics"
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Shared metrics unavailable, rendering this worker only: {e}")
+            return self.registry.render()
+
+        cutoff = time.time() - 3 * self.interval
+        snapshots, live = {}, set()
+        for pid, snapshot, updated_at in rows:
+            # Two rows may share a PID after reuse; only one of them can be live
+            worker = str(pid) if updated_at >= cutoff else f"{pid}-exited-{len(snapshots)}"
+            snapshots[worker] = json.loads(snapshot)
+            if updated_at >= cutoff:
+                live.add(worker)
+        return self.registry.render_merged(snapshots, live)
+
+    def clear(self):
+        """Forget all workers, e.g. before starting a new set of them."""
+        with self._lock:
+            self._connection().execute("DELETE FROM worker_metrics")
+
+    async def run(self):
+        """Publish snapshots until cancelled, and once more on the way out."""
+        try:
+            while True:
+                try:
+                    # Waiting for another worker's lock must not stall the event loop
+                    await asyncio.to_thread(self.publish)
+                except sqlite3.Error as e:
+                    logger.error(f"Publishing worker metrics failed: {e}")
+                await asyncio.sleep(self.interval)
+        finally:
+            with suppress(sqlite3.Error):
+                self.publish()
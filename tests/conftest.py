@@ -0,0 +1,40 @@
+"""Shared fixtures for the unit tests."""
+
+import pytest
+
+from src.services.admission import AdmissionController
+from src.services.ai_service import AIService
+from src.services.cache_service import ResponseCache
+from src.services.circuit_breaker import CircuitBreaker
+from src.services.rate_limiter import GCRARateLimiter
+from src.services.scheduler import PriorityScheduler
+from src.services.single_flight import SingleFlight
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """The AIService singleton with fresh per-service state, restored after the test.
+
+    Cache, catalog, near-duplicate index, coalescing, scheduler, admission,
+    circuit breaker and prefetches start empty and the rate limiter is
+    permissive. The model and budget policy are left as they are for the
+    test to replace and put back afterwards.
+    """
+    ai = AIService()
+    scheduler = PriorityScheduler(slots=ai.scheduler.slots, aging_seconds=ai.scheduler.aging_seconds)
+    monkeypatch.setattr(ai, "response_cache", ResponseCache())
+    monkeypatch.setattr(ai, "catalog", None)
+    monkeypatch.setattr(ai, "similar_keys", None)
+    monkeypatch.setattr(ai, "in_flight", SingleFlight())
+    monkeypatch.setattr(ai, "scheduler", scheduler)
+    monkeypatch.setattr(ai, "admission", AdmissionController(
+        scheduler, max_in_flight=ai.admission.max_in_flight,
+        max_queue=ai.admission.max_queue, max_wait=ai.admission.max_wait
+    ))
+    monkeypatch.setattr(ai, "breaker", CircuitBreaker())
+    monkeypatch.setattr(ai, "prefetches", set())
+    monkeypatch.setattr(ai, "rate_limiter", GCRARateLimiter(rate=1000, period=60))
+    # Tests replace these freely, directly or through monkeypatch
+    model, budget_policy = ai.model, ai.budget_policy
+    yield ai
+    ai.model, ai.budget_policy = model, budget_policy
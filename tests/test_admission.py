@@ -0,0 +1,75 @@
+"""Tests for admission control."""
+
+import pytest
+
+from src.services.admission import AdmissionController, AdmissionRejected
+from src.services.scheduler import GENERAL, SYMPTOMS, URGENT, PriorityScheduler
+
+
+def test_in_flight_limit():
+    """Test requests beyond max_in_flight are rejected."""
+    controller = AdmissionController(PriorityScheduler(slots=1), max_in_flight=1)
+
+    with controller.admit():
+        with pytest.raises(AdmissionRejected) as error:
+            with controller.admit():
+                pass
+
+    assert error.value.reason == "in_flight"
+    assert controller.in_flight == 0
+
+
+def test_queue_limit():
+    """Test requests are rejected while the scheduler queue is full."""
+    scheduler = PriorityScheduler(slots=1)
+    controller = AdmissionController(scheduler, max_queue=2)
+    scheduler._queued[0] = 2
+
+    with pytest.raises(AdmissionRejected) as error:
+        controller.check()
+
+    assert error.value.reason == "queue"
+    assert controller.snapshot()["saturated"]
+
+
+def test_estimated_wait_limit():
+    """Test estimate uses queue depth, slots and average model time."""
+    scheduler = PriorityScheduler(slots=2)
+    scheduler.active = 2
+    scheduler.service_time = 4.0
+    scheduler._queued[2] = 3
+    controller = AdmissionController(scheduler, max_queue=100, max_wait=5.0)
+
+    assert controller.estimated_wait() == 8.0
+    with pytest.raises(AdmissionRejected) as error:
+        controller.check()
+    assert error.value.reason == "wait"
+    assert error.value.retry_after == 8.0
+
+
+def test_idle_service_admits():
+    """Test free slots mean no estimated wait."""
+    controller = AdmissionController(PriorityScheduler(slots=2))
+
+    controller.check()
+
+    assert controller.estimated_wait() == 0.0
+    assert not controller.snapshot()["saturated"]
+
+
+def test_urgent_admitted_while_queue_full_of_general():
+    """Test limits count only requests served no later, so urgent requests pass a full general queue."""
+    scheduler = PriorityScheduler(slots=1)
+    scheduler.active = 1
+    scheduler.service_time = 4.0
+    scheduler._queued[GENERAL] = 10
+    controller = AdmissionController(scheduler, max_in_flight=2, max_queue=10, max_wait=30.0)
+
+    with pytest.raises(AdmissionRejected):
+        controller.check(GENERAL)
+    with controller.admit(URGENT):
+        controller.check(SYMPTOMS)
+
+    assert controller.estimated_wait(URGENT) == 4.0
+    assert controller.estimated_wait(GENERAL) == 44.0
+    assert controller.snapshot()["saturated"]
@@ -0,0 +1,140 @@
+"""Tests for structured analysis results."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.analysis import AnalysisResult
+from src.services.circuit_breaker import OPEN, CircuitBreaker
+from src.services.matcher import prepare_input
+from src.services.model_client import ModelResponse
+from src.services.rate_limiter import GCRARateLimiter, RateLimitExceeded
+
+
+class FailingModel:
+    """Model stand-in whose calls always fail."""
+
+    def invoke(self, messages):
+        raise ConnectionError("model unavailable")
+
+    async def ainvoke(self, messages):
+        raise ConnectionError("model unavailable")
+
+    def with_options(self, **options):
+        return self
+
+
+def test_from_prepared_copies_analysis():
+    """Test result carries language, doctors and urgency of the input."""
+    prepared = prepare_input("Сильная боль в груди")
+    result = AnalysisResult.from_prepared(prepared, "ответ", "llm", {"model": 1.0})
+
+    assert result.language == "ru"
+    assert result.is_urgent == prepared.is_urgent
+    assert result.doctors == prepared.doctors
+    assert str(result) == "ответ"
+
+
+def test_validation_source(service):
+    """Test invalid input is answered by validation without other stages."""
+    result = service.analyze("?")
+
+    assert result.source == "validation"
+    assert "cache_lookup" not in result.timings
+    assert result.timings["total"] >= result.timings["validation"]
+
+
+def test_model_failure_is_fallback_and_not_cached(service, monkeypatch):
+    """Test a failed model call is reported as fallback and not cached."""
+    monkeypatch.setattr(service, "model", FailingModel())
+
+    result = asyncio.run(service.analyze_async("Болит зуб"))
+
+    assert result.source == "fallback"
+    assert "стоматолог" in result.response
+    assert len(service.response_cache) == 0
+
+
+def test_cache_source(service, monkeypatch):
+    """Test second identical request is served from cache."""
+    model = SimpleNamespace(invoke=lambda messages: ModelResponse("Ответ"))
+    model.with_options = lambda **options: model
+    monkeypatch.setattr(service, "model", model)
+
+    assert service.analyze("Болит зуб").source == "llm"
+    assert service.analyze("Болит зуб").source == "cache"
+    assert service.analyze_and_respond("Болит зуб") == "Ответ"
+
+
+def test_coalesced_callers_get_own_timings(service, monkeypatch):
+    """Test callers sharing one generation each get a result with their own timings."""
+    class SlowModel:
+        def with_options(self, **options):
+            return self
+
+        async def ainvoke(self, messages):
+            await asyncio.sleep(0.05)
+            return ModelResponse("Ответ")
+
+    monkeypatch.setattr(service, "model", SlowModel())
+
+    async def scenario():
+        first = asyncio.ensure_future(service.analyze_async("Болит зуб"))
+        await asyncio.sleep(0.02)
+        return await asyncio.gather(first, service.analyze_async("Болит зуб"))
+
+    first, joiner = asyncio.run(scenario())
+
+    assert first.response == joiner.response == "Ответ"
+    assert first.timings is not joiner.timings
+    assert first.timings["total"] > joiner.timings["total"]
+
+
+def test_rate_limit_carries_degraded_result(service, monkeypatch):
+    """Test rate limited async request raises with the fallback result."""
+    monkeypatch.setattr(service, "rate_limiter", GCRARateLimiter(rate=1, period=60))
+    monkeypatch.setattr(service, "model", FailingModel())
+    asyncio.run(service.analyze_async("Болит голова", user_id="u"))
+
+    with pytest.raises(RateLimitExceeded) as error:
+        asyncio.run(service.analyze_async("Болит зуб", user_id="u", raise_on_rate_limit=True))
+
+    assert error.value.result.source == "fallback"
+    assert error.value.result.language == "ru"
+    assert error.value.fallback == error.value.result.response
+
+
+def test_open_circuit_skips_model(service, monkeypatch):
+    """Test failing model opens the circuit and later calls skip it."""
+    calls = []
+
+    class CountingFailingModel(FailingModel):
+        async def ainvoke(self, messages):
+            calls.append(messages)
+            return await super().ainvoke(messages)
+
+    monkeypatch.setattr(service, "model", CountingFailingModel())
+    monkeypatch.setattr(service, "breaker", CircuitBreaker(min_calls=2, failure_rate=0.5))
+
+    for i in range(5):
+        result = asyncio.run(service.analyze_async(f"Болит зуб {i}"))
+        assert result.source == "fallback"
+        assert "стоматолог" in result.response
+
+    assert service.breaker.state == OPEN
+    assert len(calls) == 2
+
+
+def test_triage_is_deterministic_and_localized(service):
+    """Test fast triage returns doctors, urgency and templated text in the input language."""
+    urgent = service.triage("Сильная боль в груди")
+    english = service.triage("I have chest pain, it is severe")
+    chat = service.triage("Расскажи анекдот")
+
+    assert urgent.source == "triage"
+    assert urgent.is_urgent
+    assert urgent.response.startswith("⚠️ Это может быть срочно!")
+    assert english.language == "en"
+    assert chat.response == service._get_message("no_symptoms", "ru")
+    assert {"validation", "symptom_detection", "total"} <= set(urgent.timings)
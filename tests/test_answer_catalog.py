@@ -0,0 +1,152 @@
+"""Tests for the precomputed answer catalog and its builder."""
+
+import json
+
+import pytest
+
+from src.services import answer_catalog
+from src.services.ai_service import AIService, catalog_key_settings
+from src.services.answer_catalog import AnswerCatalog, CatalogError, CatalogTier, write_catalog
+from src.services.model_client import ModelResponse
+from src.utils.build_catalog import build, load_ranked, prepare_service, rank
+
+
+class CountingModel:
+    """Model stand-in that counts calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def with_options(self, **options):
+        return self
+
+    def invoke(self, messages):
+        self.calls += 1
+        return ModelResponse(f"Ответ на: {messages[-1].content}")
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+@pytest.fixture
+def service(service, monkeypatch):
+    """Shared service fixture with a counting model."""
+    monkeypatch.setattr(service, "model", CountingModel())
+    return service
+
+
+def test_catalog_round_trip(tmp_path):
+    """Test every written answer is found by its key and unknown keys miss."""
+    path = str(tmp_path / "catalog.bin")
+    entries = [(f"вопрос {i}", f"Ответ {i} " * (i % 5 + 1)) for i in range(500)]
+
+    count = write_catalog(path, entries + [("вопрос 1", "дубликат")], {"version": "v1"})
+    catalog = AnswerCatalog(path)
+
+    assert count == len(catalog) == 500
+    assert catalog.version == "v1"
+    assert all(catalog.get(key) == value for key, value in entries)
+    assert catalog.get("нет такого") is None
+    assert "вопрос 7" in catalog
+
+
+def test_hash_collisions_resolved_by_key(tmp_path, monkeypatch):
+    """Test keys sharing a hash are told apart by the stored key."""
+    monkeypatch.setattr(answer_catalog, "_key_hash", lambda key: len(key) % 2)
+    path = str(tmp_path / "catalog.bin")
+    entries = [(f"key-{i}", f"value-{i}") for i in range(20)]
+    write_catalog(path, entries)
+
+    catalog = AnswerCatalog(path)
+
+    assert all(catalog.get(key) == value for key, value in entries)
+    assert catalog.get("key-99") is None
+
+
+def test_not_a_catalog_rejected(tmp_path):
+    """Test files that are not catalogs raise CatalogError."""
+    path = tmp_path / "catalog.bin"
+    path.write_bytes(b"SQLite format 3\x00" + b"\x00" * 64)
+
+    with pytest.raises(CatalogError):
+        AnswerCatalog(str(path))
+
+
+def test_tier_swaps_published_catalog(tmp_path):
+    """Test a newly published catalog replaces the old one while the old map stays readable."""
+    path = str(tmp_path / "catalog.bin")
+    write_catalog(path, [("болит зуб", "Старый ответ")], {"version": "v1"})
+    tier = CatalogTier(path, check_interval=0)
+    old = tier.catalog
+
+    write_catalog(path, [("болит зуб", "Новый ответ"), ("болит горло", "Ответ")], {"version": "v2"})
+
+    assert tier.reload()
+    assert tier.get("болит зуб") == "Новый ответ"
+    assert tier.status()["version"] == "v2"
+    assert tier.status()["entries"] == 2
+    assert old.get("болит зуб") == "Старый ответ"
+    assert not tier.reload()
+
+
+def test_tier_keeps_serving_when_new_catalog_does_not_match(tmp_path):
+    """Test a catalog built with other cache key settings is skipped and a missing file is no catalog."""
+    path = tmp_path / "catalog.bin"
+    settings = {"key_normalize": True, "key_sort_tokens": False}
+    write_catalog(str(path), [("болит зуб", "Ответ")], {"version": "v1", **settings})
+    tier = CatalogTier(str(path), check_interval=0, key_settings=settings)
+
+    write_catalog(str(path), [("болит зуб", "Другой")], {"version": "v2", "key_normalize": False})
+    tier.reload()
+
+    assert tier.get("болит зуб") == "Ответ"
+    assert "key_normalize" in tier.status()["last_error"]
+
+    path.unlink()
+    tier.reload()
+    assert tier.get("болит зуб") is None
+    assert tier.status()["loaded"] is False
+    assert CatalogTier(str(tmp_path / "missing.bin")).status()["loaded"] is False
+
+
+def test_service_answers_from_catalog_without_model(service, tmp_path):
+    """Test a question in the catalog is answered as a cache hit without a model call."""
+    path = str(tmp_path / "catalog.bin")
+    write_catalog(path, [(service._cache_key("Болит зуб!"), "Ответ из каталога")], catalog_key_settings())
+    service.catalog = CatalogTier(path, check_interval=0, key_settings=catalog_key_settings())
+
+    result = service.analyze("болит   зуб")
+    fast = service.triage("Болит зуб", use_cache=True)
+
+    assert result.source == "cache"
+    assert result.response == "Ответ из каталога"
+    assert fast.response == "Ответ из каталога"
+    assert service.model.calls == 0
+    assert service.catalog.status()["hits"] == 2
+
+
+def test_rank_merges_duplicates_by_cache_key(tmp_path):
+    """Test rephrasings are counted together and the most frequent come first."""
+    corpus = tmp_path / "corpus.jsonl"
+    lines = [{"text": "Болит горло", "count": 3}, {"text": "Болит зуб", "count": 2},
+             {"text": "болит  зуб!"}, {"text": "болит зуб", "count": 2}, {"body": "Кашель"}]
+    corpus.write_text("\n".join(json.dumps(line, ensure_ascii=False) for line in lines), encoding="utf-8")
+
+    texts = rank(load_ranked(str(corpus)), AIService()._cache_key, top=2)
+
+    assert texts == ["Болит зуб", "Болит горло"]
+
+
+def test_build_publishes_model_answers_only(service, tmp_path):
+    """Test the builder stores model answers keyed like the cache and skips invalid input."""
+    path = str(tmp_path / "catalog.bin")
+    prepare_service(service)
+
+    meta = build(service, ["Болит зуб", "Болит горло", "   "], path, concurrency=2, version="test")
+    catalog = AnswerCatalog(path)
+
+    assert meta["entries"] == 2
+    assert meta["skipped"] == 1
+    assert catalog.meta["version"] == "test"
+    assert catalog.meta["key_normalize"] == catalog_key_settings()["key_normalize"]
+    assert catalog.get(service._cache_key("болит зуб")).startswith("Ответ на:")
@@ -0,0 +1,501 @@
+"""Tests for the REST API with a stubbed model."""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from src.api import app as app_module
+from src.config.settings import BATCH_CONCURRENCY
+from src.services.model_client import ModelResponse
+from src.services.rate_limiter import GCRARateLimiter
+from src.services.admission import AdmissionController
+from src.services.scheduler import PriorityScheduler
+from src.utils.health import PoolHealthProber
+
+
+class SlowModel:
+    """Stand-in for the model client that takes a fixed time per generation."""
+
+    def __init__(self, delay: float = 0.3):
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        time.sleep(self.delay)
+        return ModelResponse("Тестовый ответ от AI")
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return ModelResponse("Тестовый ответ от AI")
+
+    async def astream(self, messages):
+        self.calls += 1
+        tokens = ["Тестовый", " ответ", " от", " AI"]
+        for token in tokens:
+            await asyncio.sleep(self.delay / len(tokens))
+            yield ModelResponse(token)
+
+    def with_options(self, **options):
+        return self
+
+
+def _set_scheduler(monkeypatch, scheduler, **admission):
+    service = app_module.get_ai_service()
+    monkeypatch.setattr(service, "scheduler", scheduler)
+    monkeypatch.setattr(service, "admission", AdmissionController(scheduler, **admission))
+
+
+@pytest.fixture
+def slow_model(service, monkeypatch):
+    """Replace the model of the shared service fixture with a slow stub."""
+    assert service is app_module.get_ai_service()
+    model = SlowModel()
+    monkeypatch.setattr(service, "model", model)
+    _set_scheduler(monkeypatch, PriorityScheduler(slots=100))
+    return model
+
+
+async def _post_many(texts):
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(
+            *(client.post("/api/v1/analyze", json={"text": text}) for text in texts)
+        )
+
+
+def test_concurrent_requests_overlap(slow_model):
+    """Concurrent analyze calls share the event loop instead of running serially."""
+    texts = [f"Вопрос номер {i}" for i in range(5)]
+
+    start = time.perf_counter()
+    responses = asyncio.run(_post_many(texts))
+    elapsed = time.perf_counter() - start
+
+    assert all(r.status_code == 200 for r in responses)
+    assert slow_model.calls == len(texts)
+    # Serial execution would need len(texts) * delay seconds
+    assert elapsed < slow_model.delay * 2
+
+
+def test_health_not_blocked_by_generation(slow_model):
+    """Health endpoint answers while a generation is in flight."""
+    slow_model.delay = 0.5
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            analyze = asyncio.create_task(
+                client.post("/api/v1/analyze", json={"text": "У меня болит голова"})
+            )
+            await asyncio.sleep(0.05)
+            start = time.perf_counter()
+            health = await client.get("/api/v1/health")
+            health_elapsed = time.perf_counter() - start
+            await analyze
+            return health, health_elapsed
+
+    health, health_elapsed = asyncio.run(scenario())
+
+    assert health.status_code == 200
+    assert health_elapsed < 0.2
+
+
+def _parse_sse(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_emits_tokens_then_done(slow_model):
+    """Streaming endpoint sends each token and a final summary event."""
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/v1/analyze/stream", json={"text": "У меня болит голова"})
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    tokens = [data["text"] for event, data in events if event == "token"]
+    assert "".join(tokens) == "Тестовый ответ от AI"
+    assert events[-1][0] == "done"
+    assert events[-1][1]["language"] == "ru"
+    assert events[-1][1]["time_to_first_token"] < slow_model.delay
+    # Streamed answers are cached for the regular endpoint as well
+    assert app_module.get_ai_service().response_cache.get("у меня болит голова") == "Тестовый ответ от AI"
+    assert events[-1][1]["truncated"] is False
+
+
+def test_stream_failing_mid_answer_reports_truncation(slow_model, monkeypatch):
+    """A model failing after the first tokens ends the stream with an error and a truncated done."""
+    async def failing_stream(messages):
+        yield ModelResponse("Тестовый")
+        raise ConnectionError("model went away")
+
+    monkeypatch.setattr(slow_model, "astream", failing_stream)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/v1/analyze/stream", json={"text": "У меня болит голова"})
+
+    events = _parse_sse(asyncio.run(scenario()).text)
+
+    assert [event for event, _ in events] == ["token", "error", "done"]
+    assert "model went away" in events[1][1]["detail"]
+    assert events[-1][1]["truncated"] is True
+    assert len(app_module.get_ai_service().response_cache) == 0
+
+
+def test_identical_requests_coalesced(slow_model):
+    """Identical concurrent questions trigger a single model call."""
+    responses = asyncio.run(_post_many(["Болит голова!"] * 3 + ["болит  голова"] * 2))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert slow_model.calls == 1
+
+
+def test_rate_limit_per_client(slow_model, monkeypatch):
+    """Clients are limited separately and rejected with 429 and Retry-After."""
+    slow_model.delay = 0
+    monkeypatch.setattr(app_module.get_ai_service(), "rate_limiter", GCRARateLimiter(rate=2, period=60))
+    monkeypatch.setattr(app_module, "RATE_LIMIT_API_KEYS", frozenset({"clinic-a", "clinic-b"}))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = [
+                await client.post("/api/v1/analyze", json={"text": f"Болит голова {i}"},
+                                  headers={"X-API-Key": "clinic-a"})
+                for i in range(3)
+            ]
+            other = await client.post("/api/v1/analyze", json={"text": "Болит голова"},
+                                      headers={"X-API-Key": "clinic-b"})
+            return first, other
+
+    first, other = asyncio.run(scenario())
+
+    assert [r.status_code for r in first] == [200, 200, 429]
+    rejected = first[-1]
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert "невролог" in rejected.json()["response"]
+    assert other.status_code == 200
+
+
+def test_unknown_api_keys_share_client_ip_limit(slow_model, monkeypatch):
+    """A new unknown key per request does not get a client past the limit of its IP."""
+    slow_model.delay = 0
+    monkeypatch.setattr(app_module.get_ai_service(), "rate_limiter", GCRARateLimiter(rate=2, period=60))
+    monkeypatch.setattr(app_module, "RATE_LIMIT_API_KEYS", frozenset({"clinic-a"}))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [
+                (await client.post("/api/v1/analyze", json={"text": f"Болит голова {i}"},
+                                   headers={"X-API-Key": f"random-{i}"})).status_code
+                for i in range(3)
+            ]
+
+    assert asyncio.run(scenario()) == [200, 200, 429]
+
+
+def test_stream_over_rate_limit_is_429(slow_model, monkeypatch):
+    """Streaming checks the rate limit before sending 200 and answers 429 with Retry-After."""
+    slow_model.delay = 0
+    monkeypatch.setattr(app_module.get_ai_service(), "rate_limiter", GCRARateLimiter(rate=1, period=60))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post("/api/v1/analyze/stream", json={"text": "Болит голова"})
+            second = await client.post("/api/v1/analyze/stream", json={"text": "Болит зуб"})
+            cached = await client.post("/api/v1/analyze/stream", json={"text": "Болит голова"})
+            return first, second, cached
+
+    first, second, cached = asyncio.run(scenario())
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert int(second.headers["Retry-After"]) >= 1
+    assert "стоматолог" in second.json()["response"]
+    assert cached.status_code == 200
+    assert "event: done" in cached.text
+
+
+def test_batch_deduplicates_and_bounds_concurrency(slow_model):
+    """Batch answers every item, generating each unique text once."""
+    slow_model.delay = 0.05
+    texts = ["Болит голова", "болит голова!", "Болит зуб", "thank you!"] + \
+        [f"Вопрос номер {i}" for i in range(8)]
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/v1/analyze/batch",
+                                     json={"items": [{"text": text} for text in texts]})
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == list(range(len(texts)))
+    assert all(r["error"] is None and r["result"]["response"] for r in results)
+    assert slow_model.calls == len(texts) - 1
+    assert slow_model.max_active <= BATCH_CONCURRENCY
+
+
+def test_batch_deadline_reports_per_item_errors(slow_model):
+    """Items unfinished at the deadline fail without failing the batch."""
+    service = app_module.get_ai_service()
+    service.response_cache.set("болит зуб", "Обратитесь к стоматологу.")
+
+    results = asyncio.run(service.analyze_batch_async(["Болит зуб", "Болит голова"], deadline=0.05))
+
+    assert results[0].response == "Обратитесь к стоматологу."
+    assert results[0].source == "cache"
+    assert isinstance(results[1], asyncio.TimeoutError)
+
+
+def test_model_slots_limit_concurrent_generations(slow_model, monkeypatch):
+    """Model calls beyond the scheduler slots wait for a free slot."""
+    slow_model.delay = 0.05
+    _set_scheduler(monkeypatch, PriorityScheduler(slots=2))
+
+    responses = asyncio.run(_post_many([f"Вопрос номер {i}" for i in range(6)]))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert slow_model.max_active == 2
+    stats = app_module.get_ai_service().scheduler.stats()
+    assert stats["classes"]["general"]["served"] == 6
+
+
+def test_saturated_queue_rejected_with_503(slow_model, monkeypatch):
+    """Requests beyond the queue limit fail fast with 503 and Retry-After."""
+    slow_model.delay = 0.2
+    _set_scheduler(monkeypatch, PriorityScheduler(slots=1), max_queue=1)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = [asyncio.ensure_future(client.post("/api/v1/analyze", json={"text": f"Вопрос {i}"}))
+                     for i in range(2)]
+            await asyncio.sleep(0.05)
+            load = await client.get("/api/v1/load")
+            rejected = await client.post("/api/v1/analyze", json={"text": "Вопрос 3"})
+            return await asyncio.gather(*first), load, rejected
+
+    accepted, load, rejected = asyncio.run(scenario())
+
+    assert [r.status_code for r in accepted] == [200, 200]
+    assert load.status_code == 503
+    assert load.json()["queue_depth"] == 1
+    assert rejected.status_code == 503
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert app_module.get_ai_service().admission.rejected["queue"] >= 1
+
+
+def test_metrics_endpoint_reports_stages(slow_model):
+    """Metrics expose stage latencies, cache results and per-route timings."""
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/api/v1/analyze", json={"text": "У меня болит голова"})
+            await client.post("/api/v1/analyze", json={"text": "У меня болит голова"})
+            return await client.get("/metrics")
+
+    response = asyncio.run(scenario())
+    text = response.text
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for stage in ("validation", "symptom_detection", "cache_lookup", "rate_limit"):
+        assert f'medical_ai_stage_seconds_count{{stage="{stage}"}}' in text
+    assert 'medical_ai_cache_lookups_total{result="hit"}' in text
+    assert 'medical_ai_model_call_seconds_count{intent="symptoms"}' in text
+    assert 'medical_ai_http_request_seconds_count{endpoint="/api/v1/analyze"}' in text
+    assert "medical_ai_model_queue_depth 0" in text
+
+
+def test_analyze_reports_source_and_timings(slow_model):
+    """Response says where the answer came from and, on request, stage timings."""
+    slow_model.delay = 0.01
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post("/api/v1/analyze?timings=true", json={"text": "Болит зуб"})
+            second = await client.post("/api/v1/analyze", json={"text": "Болит зуб"})
+            return first.json(), second.json()
+
+    first, second = asyncio.run(scenario())
+
+    assert first["source"] == "llm"
+    assert first["language"] == "ru"
+    assert first["doctors"] == ["стоматолог"]
+    assert {"validation", "symptom_detection", "cache_lookup", "rate_limit",
+            "queue_wait", "model", "total"} <= set(first["timings"])
+    assert first["timings"]["model"] >= slow_model.delay
+    assert second["source"] == "cache"
+    assert second["timings"] is None
+
+
+def test_fast_mode_skips_model(slow_model):
+    """Fast mode answers with matched doctors and urgency without calling the model."""
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/api/v1/analyze?mode=fast", json={"text": "Сильная боль в груди"})
+            invalid = await client.post("/api/v1/analyze?mode=slow", json={"text": "Болит зуб"})
+            return response.json(), invalid.status_code
+
+    body, invalid_status = asyncio.run(scenario())
+
+    assert body["source"] == "triage"
+    assert body["is_urgent"] is True
+    assert body["response"].startswith("⚠️")
+    assert body["upgrade_pending"] is None
+    assert invalid_status == 422
+    assert slow_model.calls == 0
+
+
+def test_fast_mode_upgrade_fills_cache(slow_model):
+    """Fast mode with upgrade returns triage before the model answers and the model answer on a repeat."""
+    slow_model.delay = 0.5
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            url = "/api/v1/analyze?mode=fast&upgrade=true"
+            started = time.perf_counter()
+            first = await client.post(url, json={"text": "Болит зуб"})
+            elapsed = time.perf_counter() - started
+            pending = len(app_module.get_ai_service().prefetches)
+            await app_module.get_ai_service().drain_prefetches()
+            second = await client.post(url, json={"text": "Болит зуб"})
+            return first.json(), second.json(), elapsed, pending
+
+    first, second, elapsed, pending = asyncio.run(scenario())
+
+    assert elapsed < slow_model.delay
+    assert pending == 1
+    assert first["source"] == "triage"
+    assert first["doctors"] == ["стоматолог"]
+    assert first["upgrade_pending"] is True
+    assert second["source"] == "cache"
+    assert second["response"] == "Тестовый ответ от AI"
+    assert second["upgrade_pending"] is None
+    assert slow_model.calls == 1
+
+
+def test_ready_only_after_warm_up(monkeypatch):
+    """Readiness is 503 while the model is cold and 200 once warmed up."""
+    warmer = app_module.get_ai_service().warmer
+    monkeypatch.setattr(app_module, "MODEL_WARMUP", True)
+    monkeypatch.setattr(app_module.health_prober, "interval", 0)
+    monkeypatch.setattr(warmer, "ready", False)
+
+    class ColdModel:
+        def __init__(self):
+            self.loaded = asyncio.Event()
+
+        async def ainvoke(self, messages):
+            await self.loaded.wait()
+            return ModelResponse("ok")
+
+    model = ColdModel()
+    monkeypatch.setattr(warmer, "model", model)
+    monkeypatch.setattr(warmer, "interval", 0)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with app_module.lifespan(app_module.app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                cold = await client.get("/api/v1/ready")
+                model.loaded.set()
+                for _ in range(100):
+                    await asyncio.sleep(0.01)
+                    if warmer.ready:
+                        break
+                warm = await client.get("/api/v1/ready")
+                return cold, warm
+
+    cold, warm = asyncio.run(scenario())
+
+    assert cold.status_code == 503
+    assert warm.status_code == 200
+    assert warm.json()["ready"]
+
+
+def test_ready_follows_health_probe(monkeypatch):
+    """Readiness turns 503 when the background probe cannot reach Ollama."""
+    prober = app_module.health_prober
+    monkeypatch.setattr(app_module.get_ai_service().warmer, "ready", True)
+    monkeypatch.setattr(prober, "interval", 10)
+    monkeypatch.setattr(prober, "_checked_at", None)
+    monkeypatch.setattr(prober, "_snapshot", dict(prober.snapshot()))
+
+    async def scenario(status_code):
+        transport = httpx.MockTransport(lambda request: httpx.Response(
+            status_code, json={"models": [{"name": prober.model_name}]}
+        ))
+        async with httpx.AsyncClient(transport=transport, base_url="http://ollama") as ollama:
+            await prober.probe(ollama)
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get(path) for path in
+                    ("/api/v1/live", "/api/v1/ready", "/api/v1/health", "/api/v1/health/deep")]
+
+    live, ready, health, deep = asyncio.run(scenario(200))
+    assert live.status_code == 200
+    assert ready.status_code == 200
+    assert health.json()["status"] == "healthy"
+    assert deep.json()["probes"]["probes"] >= 1
+
+    live, ready, health, _ = asyncio.run(scenario(500))
+    assert live.status_code == 200
+    assert ready.status_code == 503
+    assert health.json()["status"] == "unhealthy"
+
+
+def test_ready_while_any_pool_backend_is_healthy(monkeypatch):
+    """Readiness stays 200 when one of several Ollama servers is down."""
+    def handler(request):
+        if request.url.host == "gpu-1":
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(200, json={"models": [{"name": "m:latest"}]})
+
+    prober = PoolHealthProber(["http://gpu-1:11434", "http://gpu-2:11434"], model_name="m", interval=10,
+                              transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(app_module, "health_prober", prober)
+    monkeypatch.setattr(app_module.get_ai_service().warmer, "ready", True)
+
+    async def scenario():
+        await prober.probe()
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/api/v1/ready"), await client.get("/api/v1/health/deep")
+
+    ready, deep = asyncio.run(scenario())
+
+    assert ready.status_code == 200
+    assert [backend["url"] for backend in deep.json()["ollama"]["backends"]] == [
+        "http://gpu-1:11434", "http://gpu-2:11434"
+    ]
+    assert deep.json()["ollama"]["healthy_backends"] == 1
@@ -0,0 +1,129 @@
+"""Tests for the multi-backend pool against local stub Ollama servers."""
+
+import asyncio
+import time
+from contextlib import ExitStack
+
+import pytest
+
+from benchmarks.stub_ollama import StubOllamaServer
+from src.services.backend_pool import BackendPool
+from src.services.model_client import Message, ModelClientError, OllamaClient, create_model_client
+from src.services.warmup import ModelWarmer
+
+MESSAGES = [Message("user", "Болит голова")]
+
+
+@pytest.fixture
+def servers():
+    """Start stub servers with the given settings, stopped after the test."""
+    with ExitStack() as stack:
+        yield lambda *settings: [stack.enter_context(StubOllamaServer(**options)) for options in settings]
+
+
+def _pool(servers, **kwargs) -> BackendPool:
+    return BackendPool([OllamaClient(server.url, "stub") for server in servers], **kwargs)
+
+
+def test_least_outstanding_spreads_concurrent_calls(servers):
+    """Test concurrent calls are spread evenly over equally fast backends."""
+    stubs = servers(*[{"ttft": 0.2}] * 3)
+    pool = _pool(stubs)
+
+    async def scenario():
+        return await asyncio.gather(*(pool.ainvoke(MESSAGES) for _ in range(6)))
+
+    responses = asyncio.run(scenario())
+
+    assert len(responses) == 6
+    assert [stub.requests for stub in stubs] == [2, 2, 2]
+
+
+def test_failing_backend_ejected_and_calls_retried(servers):
+    """Test a failing backend is ejected after consecutive failures and callers still get answers."""
+    bad, good = servers({"error_rate": 1.0}, {})
+    pool = _pool([bad, good], eject_failures=2, eject_seconds=60)
+
+    for _ in range(8):
+        assert pool.invoke(MESSAGES).content
+
+    status = pool.status()
+    assert bad.requests == 2
+    assert status["backends"][0]["available"] is False
+    assert status["backends"][1]["errors"] == 0
+    assert status["retried"] == 2
+
+
+def test_ejected_backend_comes_back(servers):
+    """Test an ejected backend is retried after the ejection time and restored once it answers."""
+    flaky, good = servers({"error_rate": 1.0}, {})
+    pool = _pool([flaky, good], eject_failures=1, eject_seconds=0.2)
+
+    pool.invoke(MESSAGES)
+    assert pool.status()["backends"][0]["available"] is False
+
+    # Still failing: ejected again for twice as long
+    time.sleep(0.25)
+    pool.invoke(MESSAGES)
+    assert 0.3 < pool.status()["backends"][0]["ejected_for"] <= 0.4
+
+    flaky.error_rate = 0.0
+    time.sleep(0.45)
+    pool.invoke(MESSAGES)
+    backend = pool.status()["backends"][0]
+    assert backend["available"] is True
+    assert backend["consecutive_failures"] == 0
+
+
+def test_all_backends_failing_raises(servers):
+    """Test the error surfaces when no backend can answer."""
+    stubs = servers({"error_rate": 1.0}, {"error_rate": 1.0})
+    pool = _pool(stubs)
+
+    with pytest.raises(ModelClientError):
+        asyncio.run(pool.ainvoke(MESSAGES))
+
+
+def test_hedged_call_takes_faster_backend(servers):
+    """Test a call slower than the hedging delay is duplicated and the fast answer wins."""
+    slow, fast = servers({"ttft": 2.0}, {})
+    pool = _pool([slow, fast], hedge=True, hedge_min_samples=0, hedge_min_delay=0.1)
+
+    started = time.perf_counter()
+    response = asyncio.run(pool.ainvoke(MESSAGES))
+    elapsed = time.perf_counter() - started
+
+    assert response.content
+    assert elapsed < 1.0
+    assert pool.status()["hedged"] == 1
+    assert [backend["outstanding"] for backend in pool.status()["backends"]] == [0, 0]
+
+
+def test_option_copies_share_routing_state(servers):
+    """Test per-request option copies update the pool they came from."""
+    bad, good = servers({"error_rate": 1.0}, {})
+    pool = _pool([bad, good], eject_failures=1)
+
+    pool.with_options(num_predict=8).invoke(MESSAGES)
+
+    assert pool.status()["backends"][0]["available"] is False
+    assert pool.status()["retried"] == 1
+
+
+def test_create_model_client_pools_several_urls():
+    """Test several configured URLs give a pool with one client per server."""
+    pool = create_model_client("ollama", ["http://gpu-1:11434", "http://gpu-2:11434"])
+    single = create_model_client("ollama", ["http://gpu-1:11434"])
+
+    assert isinstance(pool, BackendPool)
+    assert [backend.name for backend in pool.backends] == ["http://gpu-1:11434", "http://gpu-2:11434"]
+    assert isinstance(single, OllamaClient)
+
+
+def test_warmer_primes_every_backend(servers):
+    """Test warm-up loads the model on each server of the pool."""
+    stubs = servers({}, {})
+    warmer = ModelWarmer(_pool(stubs).with_options(num_predict=1), ["symptoms prompt", "general prompt"])
+
+    assert asyncio.run(warmer.warm_up())
+    assert [stub.requests for stub in stubs] == [2, 2]
@@ -0,0 +1,29 @@
+"""Tests for the hot path micro-benchmarks."""
+
+from benchmarks.bench_hot_paths import compare, run, text_of
+
+
+def test_text_of_respects_length():
+    """Test generated inputs stay within the requested length."""
+    assert len(text_of(10)) <= 10
+    assert 990 <= len(text_of(1000)) <= 1000
+
+
+def test_compare_flags_regressions():
+    """Test cases are classified by ratio against the threshold."""
+    baseline = {"a": {"ns_per_op": 100.0}, "b": {"ns_per_op": 100.0}, "c": {"ns_per_op": 100.0},
+                "gone": {"ns_per_op": 1.0}}
+    current = {"a": {"ns_per_op": 130.0}, "b": {"ns_per_op": 105.0}, "c": {"ns_per_op": 50.0},
+               "added": {"ns_per_op": 1.0}}
+
+    verdicts = {name: verdict for name, *_, verdict in compare(baseline, current, threshold=0.15)}
+
+    assert verdicts == {"a": "slower", "b": "same", "c": "faster", "gone": "removed", "added": "new"}
+
+
+def test_run_single_case():
+    """Test a filtered run times only the matching cases."""
+    results = run(min_time=0.001, repeat=1, only="validate_input[chars=10]")
+
+    assert list(results) == ["validate_input[chars=10]"]
+    assert results["validate_input[chars=10]"]["ns_per_op"] > 0
@@ -0,0 +1,79 @@
+"""Tests for the stub Ollama server and the load driver."""
+
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from benchmarks.bench_load import drive
+from benchmarks.stub_ollama import StubOllamaServer
+from src.services.model_client import Message, ModelClientError, OllamaClient
+
+MESSAGES = [Message("user", "Болит голова")]
+
+
+def test_stub_timing_and_length():
+    """Test the stub waits for the first token, paces tokens and honours num_predict."""
+    with StubOllamaServer(ttft=0.1, token_rate=50, tokens=10) as server:
+        client = OllamaClient(server.url, "stub", options={"num_predict": 5})
+
+        started = time.perf_counter()
+        response = client.invoke(MESSAGES)
+        elapsed = time.perf_counter() - started
+        client.close()
+
+    assert response.content == "Рекомендую обратиться к терапевту."
+    assert 0.18 <= elapsed < 1.0  # ttft 0.1 + 5 tokens at 50/s
+
+
+def test_stub_injects_errors():
+    """Test error_rate 1 fails every chat request."""
+    with StubOllamaServer(error_rate=1.0) as server:
+        client = OllamaClient(server.url, "stub")
+        with pytest.raises(ModelClientError, match="500"):
+            client.invoke(MESSAGES)
+        client.close()
+
+        assert server.errors == server.requests == 1
+
+
+def test_stub_limits_parallel_generations():
+    """Test only `parallel` replies are generated at a time."""
+    with StubOllamaServer(ttft=0.2, parallel=1) as server:
+        clients = [OllamaClient(server.url, "stub") for _ in range(2)]
+        threads = [threading.Thread(target=client.invoke, args=(MESSAGES,)) for client in clients]
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    assert elapsed >= 0.4
+
+
+def test_drive_reports_statuses_sources_and_latency():
+    """Test the driver sends at the offered rate and aggregates outcomes."""
+    sent = []
+
+    def handler(request):
+        sent.append((json.loads(request.content)["text"], request.headers["X-API-Key"]))
+        if len(sent) % 4 == 0:
+            return httpx.Response(503, json={"detail": "busy"})
+        return httpx.Response(200, json={"response": "ok", "source": "llm"})
+
+    summary = asyncio.run(drive("http://test", ["Болит голова", "Кашель"], rate=40, duration=0.5,
+                                users=3, unique=True, transport=httpx.MockTransport(handler)))
+
+    assert summary["requests"] == len(sent) == 20
+    assert summary["statuses"] == {"200": 15, "503": 5}
+    assert summary["sources"] == {"llm": 15}
+    assert summary["error_rate"] == 0.25
+    assert 0.4 <= summary["elapsed_seconds"] < 1.5
+    assert set(summary["latency"]) == {"mean_ms", "p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms"}
+    assert len({text for text, _ in sent}) == 20
+    assert {key for _, key in sent} == {"load-0", "load-1", "load-2"}
@@ -0,0 +1,50 @@
+"""Tests for cache key normalization and near-duplicate lookup."""
+
+from src.services.cache_keys import NearDuplicateIndex, normalize_cache_key
+
+
+def test_normalize_punctuation_and_whitespace():
+    """Test punctuation, case and extra spaces do not change the key."""
+    assert normalize_cache_key("Болит голова!") == normalize_cache_key("болит  голова")
+    assert normalize_cache_key("  Болит, ГОЛОВА... ") == "болит голова"
+
+
+def test_normalize_repeated_words_and_yo():
+    """Test repeated words and 'ё' are folded."""
+    assert normalize_cache_key("болит болит голова") == "болит голова"
+    assert normalize_cache_key("Тошнёт") == "тошнет"
+
+
+def test_normalize_sort_tokens():
+    """Test optional token sorting ignores word order."""
+    assert normalize_cache_key("голова болит", sort_tokens=True) == \
+        normalize_cache_key("болит голова", sort_tokens=True)
+    assert normalize_cache_key("голова болит") != normalize_cache_key("болит голова")
+
+
+def test_near_duplicate_found():
+    """Test close phrasing of an indexed key is found."""
+    index = NearDuplicateIndex(threshold=0.6)
+    index.add("у меня сильно болит голова")
+    index.add("болит зуб")
+
+    assert index.find("у меня очень сильно болит голова") == "у меня сильно болит голова"
+
+
+def test_near_duplicate_respects_threshold():
+    """Test different complaints are not matched."""
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add("у меня сильно болит голова")
+
+    assert index.find("высокая температура и кашель") is None
+
+
+def test_near_duplicate_bounded():
+    """Test oldest keys are dropped beyond max_entries."""
+    index = NearDuplicateIndex(threshold=0.9, max_entries=2)
+    for key in ["болит голова", "болит зуб", "кашель неделю"]:
+        index.add(key)
+
+    assert len(index) == 2
+    assert index.find("болит голова") is None
+    assert index.find("кашель неделю") == "кашель неделю"
@@ -0,0 +1,123 @@
+"""Tests for response cache."""
+
+import multiprocessing
+import time
+
+from src.services.cache_service import ResponseCache, SQLiteCache, TieredCache
+
+
+def test_get_and_set():
+    """Test basic cache hit and miss accounting."""
+    cache = ResponseCache()
+
+    assert cache.get("болит голова") is None
+    cache.set("болит голова", "Обратитесь к неврологу.")
+    assert cache.get("болит голова") == "Обратитесь к неврологу."
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+    assert stats["bytes"] > 0
+
+
+def test_lru_eviction_by_bytes():
+    """Test least recently used entries are evicted to fit the byte budget."""
+    entry_size = ResponseCache._entry_size("key-0", "x" * 100)
+    cache = ResponseCache(max_bytes=entry_size * 3)
+
+    for i in range(3):
+        cache.set(f"key-{i}", "x" * 100)
+    cache.get("key-0")  # key-1 becomes least recently used
+    cache.set("key-3", "x" * 100)
+
+    assert "key-1" not in cache
+    assert "key-0" in cache
+    assert "key-3" in cache
+    assert cache.stats()["evictions"] == 1
+    assert cache.current_bytes <= cache.max_bytes
+
+
+def test_keeps_accepting_entries_when_full():
+    """Test cache keeps serving new keys after the budget is reached."""
+    cache = ResponseCache(max_bytes=2000)
+
+    for i in range(500):
+        cache.set(f"question {i}", f"answer {i}")
+
+    assert cache.get("question 499") == "answer 499"
+    assert cache.current_bytes <= 2000
+
+
+def test_oversized_entry_rejected():
+    """Test entry larger than the whole budget is not stored."""
+    cache = ResponseCache(max_bytes=100)
+
+    assert cache.set("key", "x" * 1000) is False
+    assert len(cache) == 0
+
+
+def test_ttl_expiry():
+    """Test entries expire after ttl seconds."""
+    cache = ResponseCache(ttl=0.05)
+    cache.set("key", "value")
+
+    assert cache.get("key") == "value"
+    time.sleep(0.06)
+    assert cache.get("key") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.current_bytes == 0
+
+
+def _write_from_other_process(path, key, value):
+    SQLiteCache(path).set(key, value)
+
+
+def test_sqlite_cache_survives_restart(tmp_path):
+    """Test persistent entries are visible to a new cache instance."""
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path)
+    cache.set("болит голова", "Обратитесь к неврологу.")
+    cache.close()
+
+    reopened = SQLiteCache(path)
+    assert reopened.get("болит голова") == "Обратитесь к неврологу."
+    assert reopened.get("кашель") is None
+
+
+def test_sqlite_cache_shared_between_processes(tmp_path):
+    """Test entry written by another process is readable."""
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path)
+
+    process = multiprocessing.Process(
+        target=_write_from_other_process, args=(path, "кашель", "Обратитесь к пульмонологу.")
+    )
+    process.start()
+    process.join(timeout=10)
+
+    assert process.exitcode == 0
+    assert cache.get("кашель") == "Обратитесь к пульмонологу."
+
+
+def test_sqlite_cache_prunes_oldest_over_budget(tmp_path):
+    """Test oldest entries are pruned when the byte budget is exceeded."""
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), max_bytes=1000)
+
+    for i in range(SQLiteCache._PRUNE_EVERY):
+        cache.set(f"key-{i:03d}", "x" * 50)
+
+    assert cache.stats()["bytes"] <= 1000
+    assert "key-000" not in cache
+    assert f"key-{SQLiteCache._PRUNE_EVERY - 1:03d}" in cache
+
+
+def test_tiered_cache_promotes_persistent_hits(tmp_path):
+    """Test persistent hit is copied into the in-process tier."""
+    persistent = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    persistent.set("болит зуб", "Обратитесь к стоматологу.")
+    cache = TieredCache(ResponseCache(), persistent)
+
+    assert cache.get("болит зуб") == "Обратитесь к стоматологу."
+    assert "болит зуб" in cache.memory
+    assert cache.stats()["persistent"]["hits"] == 1
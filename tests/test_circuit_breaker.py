@@ -0,0 +1,80 @@
+"""Tests for the model circuit breaker."""
+
+from src.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def _breaker(**kwargs) -> CircuitBreaker:
+    options = dict(failure_rate=0.5, slow_call_seconds=1.0, slow_call_rate=0.8,
+                   window=10, min_calls=4, open_seconds=5.0, half_open_calls=2)
+    options.update(kwargs)
+    return CircuitBreaker(**options)
+
+
+def test_opens_on_failure_rate():
+    """Test circuit opens once the failure share reaches the threshold."""
+    breaker = _breaker()
+
+    for failed in (False, True, False):
+        assert breaker.allow(now=0)
+        breaker.record(0.1, failed, now=0)
+    assert breaker.state == CLOSED
+
+    breaker.record(0.1, True, now=0)
+
+    assert breaker.state == OPEN
+    assert not breaker.allow(now=1)
+    assert breaker.status()["rejected"] == 1
+
+
+def test_opens_on_slow_calls():
+    """Test slow successful calls also open the circuit."""
+    breaker = _breaker()
+
+    for _ in range(4):
+        breaker.record(2.0, False, now=0)
+
+    assert breaker.state == OPEN
+
+
+def test_half_open_trials_close_circuit():
+    """Test after the open period limited trials run and success closes."""
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.record(0.1, True, now=0)
+
+    assert breaker.allow(now=5)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow(now=5)
+    assert not breaker.allow(now=5)
+
+    breaker.record(0.1, False, now=5)
+    breaker.record(0.1, False, now=5)
+
+    assert breaker.state == CLOSED
+    assert [t["to"] for t in breaker.status()["transitions"]] == [OPEN, HALF_OPEN, CLOSED]
+
+
+def test_half_open_failure_reopens():
+    """Test a failed trial opens the circuit again for a full period."""
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.record(0.1, True, now=0)
+
+    assert breaker.allow(now=5)
+    breaker.record(0.1, True, now=5)
+
+    assert breaker.state == OPEN
+    assert not breaker.allow(now=9)
+    assert breaker.allow(now=10)
+
+
+def test_cancel_returns_trial_permit():
+    """Test a cancelled trial does not leave the circuit stuck half-open."""
+    breaker = _breaker(half_open_calls=1)
+    for _ in range(4):
+        breaker.record(0.1, True, now=0)
+
+    assert breaker.allow(now=5)
+    breaker.cancel()
+
+    assert breaker.allow(now=5)
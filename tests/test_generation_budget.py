@@ -0,0 +1,141 @@
+"""Tests for per-request generation budgets."""
+
+import asyncio
+
+import pytest
+
+from benchmarks.stub_ollama import StubOllamaServer
+
+from src.services.generation_budget import BudgetPolicy, estimate_tokens, prompt_tokens, trim_to_tokens
+from src.services.model_client import ModelResponse, OllamaClient
+from src.services.scheduler import PriorityScheduler
+
+
+class RecordingModel:
+    """Model stand-in that records options and prompts of each call."""
+
+    def __init__(self, options=None, calls=None):
+        self.options = options or {}
+        self.calls = [] if calls is None else calls
+
+    def with_options(self, **options):
+        return RecordingModel({**self.options, **options}, self.calls)
+
+    def invoke(self, messages):
+        self.calls.append((self.options, messages))
+        return ModelResponse("Ответ")
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+    async def astream(self, messages):
+        yield self.invoke(messages)
+
+
+@pytest.fixture
+def model(service, monkeypatch):
+    """Recording model and a small context budget installed in the shared service fixture."""
+    recording = RecordingModel()
+    monkeypatch.setattr(service, "model", recording)
+    monkeypatch.setattr(service, "budget_policy", BudgetPolicy(
+        num_ctx=512, symptom_tokens=192, general_tokens=96, min_tokens=48, queue_high=10
+    ))
+    return recording
+
+
+def test_trim_to_tokens_fits_at_word_boundary():
+    """Test trimmed text fits the budget and ends on a whole word."""
+    text = "Болит голова и горло, температура держится третий день " * 10
+
+    trimmed = trim_to_tokens(text, 40)
+
+    assert estimate_tokens(trimmed) <= 40
+    assert trimmed.endswith("…")
+    assert text.startswith(trimmed[:-1])
+    assert text[len(trimmed) - 1] == " "
+    assert trim_to_tokens("Болит зуб", 40) == "Болит зуб"
+
+
+def test_budget_by_intent_and_load():
+    """Test symptom questions get longer answers and load shrinks both."""
+    policy = BudgetPolicy(symptom_tokens=192, general_tokens=96, min_tokens=48, queue_high=10,
+                          wait_high=10, latency_target=5)
+
+    assert policy.budget(True).num_predict == 192
+    assert policy.budget(False).num_predict == 96
+    assert policy.budget(True, 0.5).num_predict == 120
+    assert policy.budget(True, 1.0).num_predict == 48
+    assert policy.load(queue_depth=5) == 0.5
+    assert policy.load(estimated_wait=20) == 1.0
+    assert policy.load(call_seconds=7.5) == 0.5
+    assert policy.load(call_seconds=4) == 0.0
+    assert BudgetPolicy(adaptive=False, queue_high=1).load(queue_depth=10) == 0.0
+
+
+def test_service_budget_follows_intent_and_queue(service, model, monkeypatch):
+    """Test the service passes num_predict by intent and shrinks it while the queue is deep."""
+    service.analyze("Болит зуб")
+    service.analyze("Расскажи анекдот")
+    monkeypatch.setattr(service, "scheduler", PriorityScheduler(slots=1))
+    monkeypatch.setattr(service.scheduler, "queue_depth", lambda: 10)
+    service.analyze("Болит горло")
+
+    assert [options["num_predict"] for options, _ in model.calls] == [192, 96, 48]
+    assert service.budget_status()["symptoms"] == 48
+
+
+def test_long_input_trimmed_to_context(service, model):
+    """Test prompt plus answer budget stays within num_ctx for the longest input."""
+    text = ("Болит голова и горло, температура держится третий день. " * 20)[:1000]
+
+    result = asyncio.run(service.analyze_async(text))
+
+    options, messages = model.calls[0]
+    assert result.source == "llm"
+    assert prompt_tokens(messages) + options["num_predict"] <= 512
+    assert "…" in messages[1].content
+
+
+def test_load_reduced_answers_not_cached(service, model, monkeypatch):
+    """Test answers from a load-reduced budget are generated again, while trimmed full-budget ones are cached."""
+    long_text = ("Болит голова и горло, температура держится третий день. " * 20)[:1000]
+    monkeypatch.setattr(service, "_budget_load", lambda: 1.0)
+
+    service.analyze("Болит горло")
+    service.analyze("Болит горло")
+
+    async def stream():
+        return [chunk async for chunk in service.analyze_and_stream("Болит горло")]
+
+    asyncio.run(stream())
+    monkeypatch.setattr(service, "_budget_load", lambda: 0.0)
+    asyncio.run(service.analyze_async(long_text))
+    trimmed = asyncio.run(service.analyze_async(long_text))
+    service.analyze("Болит горло")
+    second = service.analyze("Болит горло")
+
+    assert len(model.calls) == 5
+    assert "…" in model.calls[3][1][1].content
+    assert trimmed.source == "cache"
+    assert second.source == "cache"
+
+
+def test_budgeted_calls_reuse_one_connection(service, monkeypatch):
+    """Test per-request option copies share the client's keep-alive connections."""
+    with StubOllamaServer() as stub:
+        monkeypatch.setattr(service, "model", OllamaClient(stub.url, "stub"))
+
+        for i in range(5):
+            service.analyze(f"Болит зуб уже {i} дней")
+        sync_connections = stub.connections
+
+        async def scenario():
+            for i in range(5):
+                await service.analyze_async(f"Болит горло уже {i} дней")
+
+        asyncio.run(scenario())
+        service.model.close()
+
+    assert stub.requests == 10
+    assert sync_connections == 1
+    assert stub.connections == 2
@@ -1,6 +1,12 @@
 """Tests for health check functionality."""
 
-from src.utils.health import health_check, quick_health_check, check_dependencies
+import asyncio
+
+import httpx
+
+from src.utils.health import (
+    HealthProber, PoolHealthProber, check_dependencies, create_health_prober, health_check, quick_health_check
+)
 
 
 def test_health_check():
@@ -62,4 +68,96 @@ def test_health_check_environment():
     assert "python_version" in environment
     assert "platform" in environment
     assert isinstance(environment["python_version"], str)
-    assert isinstance(environment["platform"], str)
\ No newline at end of file
+    assert isinstance(environment["platform"], str)
+
+
+def _probe(prober: HealthProber, handler) -> dict:
+    async def scenario():
+        transport = httpx.MockTransport(handler)
+        async with httpx.AsyncClient(transport=transport, base_url="http://ollama") as client:
+            return await prober.probe(client)
+    return asyncio.run(scenario())
+
+
+def test_prober_healthy_when_model_installed():
+    """Test probe finds the configured model among Ollama's tags."""
+    prober = HealthProber(model_name="llama3.2:3b", interval=10)
+
+    snapshot = _probe(prober, lambda request: httpx.Response(
+        200, json={"models": [{"name": "llama3.2:3b"}]}
+    ))
+
+    assert snapshot["status"] == "healthy"
+    assert snapshot["latency_ms"] is not None
+    assert prober.healthy()
+
+
+def test_prober_degraded_when_model_missing():
+    """Test reachable Ollama without the model is degraded."""
+    prober = HealthProber(model_name="llama3.2:3b", interval=10)
+
+    snapshot = _probe(prober, lambda request: httpx.Response(200, json={"models": []}))
+
+    assert snapshot["status"] == "degraded"
+    assert "not installed" in snapshot["error"]
+    assert not prober.healthy()
+
+
+def test_prober_unhealthy_and_counts_failures():
+    """Test unreachable Ollama is unhealthy and failures accumulate."""
+    prober = HealthProber(interval=10)
+
+    def refuse(request):
+        raise httpx.ConnectError("connection refused")
+
+    _probe(prober, refuse)
+    snapshot = _probe(prober, refuse)
+
+    assert snapshot["status"] == "unhealthy"
+    assert snapshot["consecutive_failures"] == 2
+    assert prober.latency_summary()["success_rate"] == 0.0
+
+
+def test_prober_disabled_or_stale():
+    """Test a disabled prober never blocks readiness and a stale one does."""
+    assert HealthProber(interval=0).healthy()
+
+    prober = HealthProber(model_name="m", interval=10)
+    _probe(prober, lambda request: httpx.Response(200, json={"models": [{"name": "m:latest"}]}))
+    prober._checked_at -= 60
+
+    assert not prober.healthy()
+
+
+def test_pool_prober_healthy_while_one_backend_is():
+    """Test a pool with one server down stays healthy overall and reports each server."""
+    def handler(request):
+        if request.url.host == "gpu-1":
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(200, json={"models": [{"name": "m:latest"}]})
+
+    prober = PoolHealthProber(["http://gpu-1:11434", "http://gpu-2:11434"], model_name="m", interval=10,
+                              transport=httpx.MockTransport(handler))
+
+    snapshot = asyncio.run(prober.probe())
+
+    assert prober.healthy()
+    assert snapshot["status"] == "degraded"
+    assert snapshot["healthy_backends"] == 1
+    assert [backend["status"] for backend in snapshot["backends"]] == ["unhealthy", "healthy"]
+    assert prober.latency_summary()["probes"] == 2
+
+
+def test_pool_prober_unhealthy_when_all_backends_down():
+    """Test a pool is not healthy once every server fails its probe."""
+    def refuse(request):
+        raise httpx.ConnectError("connection refused")
+
+    prober = PoolHealthProber(["http://gpu-1:11434", "http://gpu-2:11434"], interval=10,
+                              transport=httpx.MockTransport(refuse))
+
+    assert prober.snapshot()["status"] == "unknown"
+    assert asyncio.run(prober.probe())["status"] == "unhealthy"
+    assert not prober.healthy()
+    assert isinstance(create_health_prober(["http://gpu-1:11434", "http://gpu-2:11434"]), PoolHealthProber)
+    assert isinstance(create_health_prober(["http://gpu-1:11434"]), HealthProber)
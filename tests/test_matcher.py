@@ -0,0 +1,66 @@
+"""Tests for single-pass keyword matching."""
+
+import random
+
+from src.services.matcher import KeywordMatcher, prepare_input
+
+
+def _naive(text, keywords):
+    lowered = text.strip().lower()
+    return {keyword for keyword in keywords if keyword in lowered}
+
+
+def test_prepare_detects_everything_in_one_pass():
+    """Test language, symptoms, urgency and doctors come from one call."""
+    matcher = KeywordMatcher(
+        symptom_keywords=["болит", "голова"],
+        urgent_indicators=["кровь"],
+        doctor_map={"голова": ["невролог", "терапевт"], "кровь": ["хирург"]}
+    )
+
+    prepared = matcher.prepare("  Болит ГОЛОВА и кровь из носа ")
+
+    assert prepared.language == "ru"
+    assert set(prepared.symptom_keywords) == {"болит", "голова"}
+    assert prepared.is_urgent
+    assert prepared.doctors == ("невролог", "терапевт", "хирург")
+    assert prepared.normalized == "болит голова и кровь из носа"
+
+
+def test_overlapping_keywords():
+    """Test keywords that are substrings of each other are all found."""
+    matcher = KeywordMatcher(symptom_keywords=["боль", "больно", "оль", "головная боль"])
+
+    prepared = matcher.prepare("Головная боль, больно")
+
+    assert set(prepared.symptom_keywords) == {"боль", "больно", "оль", "головная боль"}
+
+
+def test_matches_naive_substring_search():
+    """Test automaton agrees with substring checks on random tables."""
+    rng = random.Random(7)
+    alphabet = "абвгде "
+    keywords = {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))).strip() or "а"
+                for _ in range(200)}
+    matcher = KeywordMatcher(symptom_keywords=keywords)
+
+    for _ in range(100):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 60)))
+        assert set(matcher.prepare(text).symptom_keywords) == _naive(text, keywords)
+
+
+def test_language_detection():
+    """Test language detection matches the cyrillic share rule."""
+    matcher = KeywordMatcher()
+
+    assert matcher.prepare("У меня болит голова").language == "ru"
+    assert matcher.prepare("thank you!").language == "en"
+    assert matcher.prepare("   ").language == "ru"
+
+
+def test_default_matcher_uses_settings():
+    """Test default tables from settings are compiled."""
+    prepared = prepare_input("Сильная боль в животе")
+
+    assert prepared.has_symptoms
+    assert prepared.is_urgent
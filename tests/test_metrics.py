@@ -0,0 +1,88 @@
+"""Tests for the Prometheus metrics registry."""
+
+import pytest
+
+from src.utils.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_counter_children_rendered_with_labels():
+    """Test pre-created children are exported before first use."""
+    registry = Registry()
+    counter = registry.register(Counter("hits_total", "Hits", ["result"], [("hit",), ("miss",)]))
+
+    counter.labels("hit").inc()
+    counter.labels("hit").inc(2)
+    text = registry.render()
+
+    assert "# TYPE hits_total counter" in text
+    assert 'hits_total{result="hit"} 3' in text
+    assert 'hits_total{result="miss"} 0' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test bucket counts, sum and count of a histogram."""
+    registry = Registry()
+    histogram = registry.register(Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)))
+
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    text = registry.render()
+
+    assert 'latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_sum 2.65" in text
+    assert "latency_seconds_count 4" in text
+
+
+def test_gauge_reads_callback_at_scrape_time():
+    """Test callback gauges report the current value."""
+    registry = Registry()
+    gauge = registry.register(Gauge("queue_depth", "Queue depth"))
+    depth = [3]
+    gauge.set_function(lambda: depth[0])
+
+    assert "queue_depth 3" in registry.render()
+    depth[0] = 7
+    assert "queue_depth 7" in registry.render()
+
+
+def test_merged_snapshots_sum_counters_and_keep_gauges_per_worker():
+    """Test counters and histograms of all workers add up and gauges of live workers are labelled."""
+    workers = {}
+    for name, requests in (("101", 2), ("102", 3), ("103", 5)):
+        registry = Registry()
+        counter = registry.register(Counter("requests_total", "Requests", ["result"], [("ok",)]))
+        histogram = registry.register(Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)))
+        gauge = registry.register(Gauge("in_flight", "In flight"))
+        counter.labels("ok").inc(requests)
+        histogram.observe(0.05 * requests)
+        gauge.set(requests)
+        workers[name] = registry.snapshot()
+
+    text = registry.render_merged(workers, live={"101", "102"})
+
+    assert 'requests_total{result="ok"} 10' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert 'in_flight{worker="101"} 2' in text
+    assert 'in_flight{worker="102"} 3' in text
+    assert 'worker="103"' not in text
+
+
+def test_wrong_label_count_rejected():
+    """Test labels must match the metric's label names."""
+    counter = Counter("errors_total", "Errors", ["path"])
+
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+
+
+def test_duplicate_registration_rejected():
+    """Test two metrics cannot share a name."""
+    registry = Registry()
+    registry.register(Counter("requests_total", "Requests"))
+
+    with pytest.raises(ValueError):
+        registry.register(Counter("requests_total", "Requests"))
@@ -0,0 +1,121 @@
+"""Tests for model clients."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.services.model_client import Message, ModelClientError, OllamaClient
+
+MESSAGES = [Message("system", "Ты медицинский помощник."), Message("user", "Болит голова")]
+
+
+def _ollama(handler) -> OllamaClient:
+    return OllamaClient("http://ollama", "test-model", options={"num_predict": 8},
+                        keep_alive="10m", transport=httpx.MockTransport(handler))
+
+
+def _chat_reply(request: httpx.Request) -> httpx.Response:
+    payload = json.loads(request.content)
+    if payload["stream"]:
+        lines = [{"message": {"content": token}, "done": False} for token in ("Обратитесь", " к врачу")]
+        lines.append({"message": {"content": ""}, "done": True})
+        body = "\n".join(json.dumps(line, ensure_ascii=False) for line in lines)
+        return httpx.Response(200, content=body.encode())
+    return httpx.Response(200, json={"message": {"role": "assistant", "content": "Обратитесь к врачу"},
+                                     "done": True})
+
+
+def test_invoke_sends_chat_payload():
+    """Test sync call posts model, messages, options and keep-alive."""
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return _chat_reply(request)
+
+    response = _ollama(handler).invoke(MESSAGES)
+
+    assert response.content == "Обратитесь к врачу"
+    assert requests == [{
+        "model": "test-model",
+        "messages": [{"role": "system", "content": "Ты медицинский помощник."},
+                     {"role": "user", "content": "Болит голова"}],
+        "stream": False,
+        "options": {"num_predict": 8},
+        "keep_alive": "10m"
+    }]
+
+
+def test_ainvoke_and_astream():
+    """Test async call and streaming return the model text."""
+    client = _ollama(_chat_reply)
+
+    async def scenario():
+        response = await client.ainvoke(MESSAGES)
+        chunks = [chunk.content async for chunk in client.astream(MESSAGES)]
+        return response, chunks
+
+    response, chunks = asyncio.run(scenario())
+
+    assert response.content == "Обратитесь к врачу"
+    assert chunks == ["Обратитесь", " к врачу"]
+
+
+def test_async_client_recreated_for_new_event_loop():
+    """Test the client keeps working across separate event loops and closes replaced clients."""
+    client = _ollama(_chat_reply)
+
+    first = asyncio.run(client.ainvoke(MESSAGES))
+    replaced = client._connections.async_client
+    second = asyncio.run(client.ainvoke(MESSAGES))
+    current = client._connections.async_client
+
+    assert first == second
+    assert replaced is not current
+    assert replaced.is_closed
+    assert not current.is_closed
+
+
+def test_aclose_closes_sync_and_async_clients():
+    """Test aclose releases both httpx clients and later calls open new ones."""
+    client = _ollama(_chat_reply)
+
+    async def scenario():
+        await client.ainvoke(MESSAGES)
+        async_client = client._connections.async_client
+        await client.aclose()
+        return async_client
+
+    sync_client = client.client
+    client.invoke(MESSAGES)
+    async_client = asyncio.run(scenario())
+
+    assert sync_client.is_closed
+    assert async_client.is_closed
+    assert client.invoke(MESSAGES).content == "Обратитесь к врачу"
+
+
+def test_errors_raised():
+    """Test HTTP errors and Ollama error payloads raise ModelClientError."""
+    missing = _ollama(lambda request: httpx.Response(404, json={"error": "model not found"}))
+    stream_error = _ollama(lambda request: httpx.Response(200, content=b'{"error": "out of memory"}\n'))
+
+    async def consume():
+        return [chunk async for chunk in stream_error.astream(MESSAGES)]
+
+    with pytest.raises(ModelClientError, match="404"):
+        missing.invoke(MESSAGES)
+    with pytest.raises(ModelClientError, match="out of memory"):
+        asyncio.run(consume())
+
+
+def test_with_options_overrides_and_keeps_original():
+    """Test option overrides apply to the copy only."""
+    client = _ollama(_chat_reply)
+    priming = client.with_options(num_predict=1)
+
+    assert priming.options == {"num_predict": 1}
+    assert client.options == {"num_predict": 8}
+    assert priming.model == client.model
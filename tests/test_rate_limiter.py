@@ -0,0 +1,124 @@
+"""Tests for per-client rate limiting."""
+
+import multiprocessing
+import sqlite3
+import time
+
+from src.services.rate_limiter import GCRARateLimiter, SQLiteRateLimiter
+
+
+def test_allows_burst_then_rejects():
+    """Test burst of rate requests is allowed and the next is rejected."""
+    limiter = GCRARateLimiter(rate=10, period=60)
+
+    decisions = [limiter.check("client", now=100.0) for _ in range(11)]
+
+    assert all(d.allowed for d in decisions[:10])
+    assert not decisions[10].allowed
+    assert decisions[10].retry_after == 6.0
+
+
+def test_refills_over_time():
+    """Test one request is allowed again after the emission interval."""
+    limiter = GCRARateLimiter(rate=10, period=60)
+    for _ in range(10):
+        limiter.check("client", now=100.0)
+
+    assert not limiter.check("client", now=105.0).allowed
+    assert limiter.check("client", now=106.0).allowed
+
+
+def test_clients_are_independent():
+    """Test one client's usage does not affect another."""
+    limiter = GCRARateLimiter(rate=1, period=60)
+
+    assert limiter.check("a", now=0.0).allowed
+    assert not limiter.check("a", now=0.0).allowed
+    assert limiter.check("b", now=0.0).allowed
+
+
+def test_idle_clients_evicted():
+    """Test clients with a full bucket are dropped from memory."""
+    limiter = GCRARateLimiter(rate=10, period=60)
+    for i in range(1000):
+        limiter.check(f"client-{i}", now=0.0)
+
+    limiter.check("late", now=1000.0)
+
+    assert len(limiter) == 1
+
+
+def test_max_clients_bound():
+    """Test tracked clients never exceed max_clients."""
+    limiter = GCRARateLimiter(rate=10, period=60, max_clients=100)
+    for i in range(1000):
+        limiter.check(f"client-{i}", now=0.0)
+
+    assert len(limiter) <= 100
+
+
+def _check_from_other_process(path, count, allowed):
+    limiter = SQLiteRateLimiter(path, rate=10, period=60)
+    allowed.put(sum(limiter.check("client", now=100.0).allowed for _ in range(count)))
+
+
+def test_sqlite_limiter_matches_in_memory_decisions(tmp_path):
+    """Test the shared limiter allows the same burst and refill as the in-memory one."""
+    limiter = SQLiteRateLimiter(str(tmp_path / "limits.sqlite3"), rate=10, period=60)
+
+    decisions = [limiter.check("client", now=100.0) for _ in range(11)]
+
+    assert all(d.allowed for d in decisions[:10])
+    assert decisions[10].retry_after == 6.0
+    assert not limiter.check("client", now=105.0).allowed
+    assert limiter.check("client", now=106.0).allowed
+    assert limiter.check("other", now=106.0).allowed
+
+
+def test_sqlite_limiter_shared_between_processes(tmp_path):
+    """Test processes hitting one client together get one burst in total."""
+    path = str(tmp_path / "limits.sqlite3")
+    SQLiteRateLimiter(path)
+    allowed = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_check_from_other_process, args=(path, 8, allowed))
+        for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=20)
+
+    assert [process.exitcode for process in processes] == [0] * 4
+    assert sum(allowed.get(timeout=5) for _ in processes) == 10
+
+
+def test_sqlite_limiter_prunes_idle_and_excess_clients(tmp_path):
+    """Test idle clients are dropped and tracked clients stay within max_clients."""
+    limiter = SQLiteRateLimiter(str(tmp_path / "limits.sqlite3"), rate=10, period=60, max_clients=100)
+    for i in range(SQLiteRateLimiter._PRUNE_EVERY):
+        limiter.check(f"client-{i}", now=0.0)
+
+    assert len(limiter) <= 100
+
+    for i in range(SQLiteRateLimiter._PRUNE_EVERY):
+        limiter.check(f"late-{i % 50}", now=1000.0)
+
+    assert len(limiter) == 50
+
+
+def test_sqlite_limiter_allows_when_database_locked(tmp_path):
+    """Test a check gives up after the short busy timeout and allows the request."""
+    path = str(tmp_path / "limits.sqlite3")
+    limiter = SQLiteRateLimiter(path, rate=1, period=60, busy_timeout=0.01)
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+
+    started = time.perf_counter()
+    decisions = [limiter.check("client").allowed for _ in range(3)]
+    elapsed = time.perf_counter() - started
+    other.execute("ROLLBACK")
+
+    assert decisions == [True, True, True]
+    assert elapsed < 1.0
+    assert [limiter.check("client").allowed for _ in range(2)] == [True, False]
@@ -0,0 +1,101 @@
+"""Tests for priority scheduling of model calls."""
+
+import asyncio
+
+from src.services.matcher import PreparedInput
+from src.services.scheduler import GENERAL, SYMPTOMS, URGENT, PriorityScheduler, priority_for
+
+
+def _prepared(symptoms=(), urgent=()):
+    return PreparedInput(text="", normalized="", language="ru",
+                         symptom_keywords=symptoms, urgent_indicators=urgent)
+
+
+def test_priority_for():
+    """Test priority class is chosen from analysed input."""
+    assert priority_for(_prepared(symptoms=("болит",), urgent=("кровь",))) == URGENT
+    assert priority_for(_prepared(symptoms=("болит",))) == SYMPTOMS
+    assert priority_for(_prepared()) == GENERAL
+
+
+async def _run_in_order(scheduler, arrivals, hold=0.01):
+    """Start requests in arrival order and record the order they run."""
+    order = []
+
+    async def request(name, priority):
+        async with scheduler.slot(priority):
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    blocker = asyncio.ensure_future(request("blocker", GENERAL))
+    await asyncio.sleep(0)
+    tasks = []
+    for name, priority, delay in arrivals:
+        await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(request(name, priority)))
+    await asyncio.gather(blocker, *tasks)
+    return order
+
+
+def test_urgent_jumps_queue():
+    """Test urgent request runs before earlier lower-priority requests."""
+    scheduler = PriorityScheduler(slots=1, aging_seconds=60)
+    arrivals = [("general", GENERAL, 0), ("symptoms", SYMPTOMS, 0), ("urgent", URGENT, 0)]
+
+    order = asyncio.run(_run_in_order(scheduler, arrivals))
+
+    assert order == ["blocker", "urgent", "symptoms", "general"]
+    assert scheduler.active == 0
+
+
+def test_aging_prevents_starvation():
+    """Test general request waiting longer than aging beats a new urgent one."""
+    scheduler = PriorityScheduler(slots=1, aging_seconds=0.01)
+    arrivals = [("general", GENERAL, 0), ("urgent", URGENT, 0.05)]
+
+    order = asyncio.run(_run_in_order(scheduler, arrivals, hold=0.1))
+
+    assert order == ["blocker", "general", "urgent"]
+
+
+def test_slots_bound_concurrency_and_stats():
+    """Test no more than slots requests run and waits are recorded per class."""
+    scheduler = PriorityScheduler(slots=2)
+    running = []
+    peak = []
+
+    async def request(priority):
+        async with scheduler.slot(priority):
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+
+    async def scenario():
+        await asyncio.gather(*(request(i % 3) for i in range(9)))
+
+    asyncio.run(scenario())
+
+    assert max(peak) == 2
+    stats = scheduler.stats()
+    assert stats["waiting"] == 0
+    assert sum(c["served"] for c in stats["classes"].values()) == 9
+    assert stats["classes"]["general"]["wait_max"] > 0
+
+
+def test_cancelled_waiter_leaves_queue():
+    """Test cancelling a waiting request frees its place."""
+    scheduler = PriorityScheduler(slots=1)
+
+    async def scenario():
+        await scheduler.acquire(GENERAL)
+        waiter = asyncio.ensure_future(scheduler.acquire(URGENT))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.queue_depth() == 0
+        scheduler.release()
+        assert scheduler.active == 0
+        await asyncio.wait_for(scheduler.acquire(SYMPTOMS), timeout=1)
+
+    asyncio.run(scenario())
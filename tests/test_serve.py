@@ -0,0 +1,90 @@
+"""Tests for the multi-process server against a stub Ollama."""
+
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from benchmarks.stub_ollama import StubOllamaServer
+
+WORKERS = 3
+RATE_LIMIT = 5
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _metric(text: str, sample: str) -> float:
+    match = re.search(rf"^{re.escape(sample)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Run the API with several workers on a free port, stopped after the test."""
+    with StubOllamaServer(model_name="stub") as stub:
+        port = _free_port()
+        env = dict(
+            os.environ,
+            OLLAMA_BASE_URL=stub.url, OLLAMA_BASE_URLS="", MODEL_NAME="stub", MODEL_WARMUP="False",
+            HEALTH_PROBE_INTERVAL="0", CATALOG_PATH="", CACHE_BACKEND="memory",
+            RATE_LIMIT_REQUESTS=str(RATE_LIMIT), RATE_LIMIT_PERIOD="60", RATE_LIMIT_BURST=str(RATE_LIMIT),
+            RATE_LIMIT_SQLITE_PATH=str(tmp_path / "limits.sqlite3"),
+            METRICS_SQLITE_PATH=str(tmp_path / "metrics.sqlite3"), METRICS_SYNC_INTERVAL="0.2",
+            LOG_LEVEL="WARNING"
+        )
+        process = subprocess.Popen(
+            [sys.executable, "-m", "src.api.serve", "--workers", str(WORKERS), "--port", str(port)],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        url = f"http://127.0.0.1:{port}"
+        try:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    metrics = httpx.get(f"{url}/metrics").text
+                    if metrics.count("medical_ai_http_requests_in_flight{worker=") == WORKERS:
+                        break
+                except httpx.HTTPError:
+                    pass
+                assert process.poll() is None and time.monotonic() < deadline, "workers did not start"
+                time.sleep(0.1)
+            yield url
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+def test_rate_limit_and_counters_shared_by_workers(server):
+    """Test a client gets one host-wide burst across workers and /metrics reports host totals."""
+    def analyze(i):
+        # A new connection per request, so requests are spread over the workers
+        return httpx.post(f"{server}/api/v1/analyze", json={"text": f"Болит зуб уже {i} дней"},
+                          headers={"X-API-Key": "client"}, timeout=30).status_code
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        statuses = list(pool.map(analyze, range(24)))
+
+    assert statuses.count(200) == RATE_LIMIT
+    assert statuses.count(429) == 24 - RATE_LIMIT
+
+    deadline = time.monotonic() + 5
+    while True:
+        metrics = httpx.get(f"{server}/metrics").text
+        allowed = _metric(metrics, 'medical_ai_rate_limit_decisions_total{decision="allowed"}')
+        rejected = _metric(metrics, 'medical_ai_rate_limit_decisions_total{decision="rejected"}')
+        if (allowed, rejected) == (RATE_LIMIT, 24 - RATE_LIMIT) or time.monotonic() > deadline:
+            break
+        time.sleep(0.1)
+
+    assert (allowed, rejected) == (RATE_LIMIT, 24 - RATE_LIMIT)
+    assert _metric(metrics, 'medical_ai_http_request_seconds_count{endpoint="/api/v1/analyze"}') == 24
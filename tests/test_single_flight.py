@@ -0,0 +1,114 @@
+"""Tests for coalescing of identical in-flight requests."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.services.single_flight import SingleFlight
+
+
+def test_sync_callers_share_one_call():
+    """Test concurrent threads with the same key run the function once."""
+    flight = SingleFlight()
+    calls = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.1)
+        return "ответ"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("key", generate)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["ответ"] * 5
+    assert flight.coalesced == 4
+    assert flight.in_flight() == 0
+
+
+def test_sync_error_reaches_every_waiter():
+    """Test exception of the leading call is raised for all callers."""
+    flight = SingleFlight()
+    errors = []
+
+    def generate():
+        time.sleep(0.1)
+        raise RuntimeError("model down")
+
+    def call():
+        try:
+            flight.do("key", generate)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == ["model down"] * 3
+
+
+def test_async_callers_share_one_call():
+    """Test concurrent coroutines with the same key await one call."""
+    flight = SingleFlight()
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "ответ"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do_async("key", generate) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["ответ"] * 5
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+
+def test_async_error_reaches_every_waiter():
+    """Test exception of the shared call is raised in every coroutine."""
+    flight = SingleFlight()
+
+    async def generate():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("model down")
+
+    async def scenario():
+        return await asyncio.gather(
+            *(flight.do_async("key", generate) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_async_cancelled_waiter_does_not_cancel_others():
+    """Test cancelling one caller leaves the shared call running."""
+    flight = SingleFlight()
+
+    async def generate():
+        await asyncio.sleep(0.05)
+        return "ответ"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do_async("key", generate))
+        second = asyncio.ensure_future(flight.do_async("key", generate))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "ответ"
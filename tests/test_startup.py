@@ -0,0 +1,46 @@
+"""Tests that startup stays cheap."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.bench_import_time import LAZY_MODULES, parse_importtime
+
+PROBE = """
+import json, sys
+import {target}
+from src.services.ai_service import AIService
+print(json.dumps({{
+    "loaded": [m for m in {lazy!r} if m in sys.modules],
+    "service_created": AIService._instance is not None
+}}))
+"""
+
+
+@pytest.mark.parametrize("target", ["src.api.app", "main"])
+def test_import_is_lazy(target):
+    """Test importing the app or CLI neither loads model clients nor builds the service."""
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE.format(target=target, lazy=LAZY_MODULES)],
+        capture_output=True, text=True, check=True
+    )
+    result = json.loads(completed.stdout)
+
+    assert result == {"loaded": [], "service_created": False}
+
+
+def test_parse_importtime():
+    """Test total counts top-level imports only."""
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |   child\n"
+        "import time:        50 |        150 | parent\n"
+        "import time:        30 |         30 | other\n"
+    )
+
+    result = parse_importtime(stderr)
+
+    assert result["total_us"] == 180
+    assert result["modules"] == {"child": 100, "parent": 50, "other": 30}
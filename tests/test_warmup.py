@@ -0,0 +1,73 @@
+"""Tests for model warm-up and keep-warm pings."""
+
+import asyncio
+
+from src.services.model_client import ModelResponse
+from src.services.warmup import ModelWarmer
+
+
+class RecordingModel:
+    """Model stand-in that records prompts and can fail the first calls."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.system_prompts = []
+
+    async def ainvoke(self, messages):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("model not loaded")
+        self.system_prompts.append(messages[0].content)
+        return ModelResponse("ok")
+
+
+def test_warm_up_primes_every_prompt():
+    """Test warm-up sends each system prompt and marks the warmer ready."""
+    model = RecordingModel()
+    warmer = ModelWarmer(model, ["symptoms prompt", "general prompt"])
+
+    assert asyncio.run(warmer.warm_up())
+
+    assert model.system_prompts == ["symptoms prompt", "general prompt"]
+    assert warmer.ready
+    assert warmer.status()["warmup_seconds"] is not None
+
+
+def test_failed_warm_up_not_ready():
+    """Test warmer stays not ready and records the error when the model fails."""
+    warmer = ModelWarmer(RecordingModel(failures=1), ["prompt"])
+
+    assert not asyncio.run(warmer.warm_up())
+
+    status = warmer.status()
+    assert not status["ready"]
+    assert status["failures"] == 1
+    assert "not loaded" in status["last_error"]
+
+
+def test_run_retries_then_pings(monkeypatch):
+    """Test run retries warm-up until it succeeds, then pings periodically."""
+    model = RecordingModel(failures=2)
+    warmer = ModelWarmer(model, ["prompt"], interval=0.01)
+    monkeypatch.setattr(ModelWarmer, "_RETRY_MIN", 0.001)
+
+    async def scenario():
+        task = asyncio.create_task(warmer.run())
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    asyncio.run(scenario())
+
+    assert warmer.ready
+    assert warmer.failures == 2
+    assert warmer.pings >= 2
+
+
+def test_run_without_interval_stops_after_warm_up():
+    """Test interval 0 disables keep-warm pings."""
+    warmer = ModelWarmer(RecordingModel(), ["prompt"], interval=0)
+
+    asyncio.run(asyncio.wait_for(warmer.run(), timeout=1))
+
+    assert warmer.ready
+    assert warmer.pings == 0